@@ -4,6 +4,8 @@ from celery.signals import setup_logging
 from logging.config import dictConfig
 from django.conf import settings
 
+from common.services import tenant_context  # noqa: F401, propagates the vendor of the publisher to the tasks
+
 # Set the default Django settings module
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 import os
 from pathlib import Path
+from celery.schedules import crontab
 from decouple import config
 
 
@@ -49,17 +50,22 @@ INSTALLED_APPS = [
     'drf_yasg',
 
     # Created Apps
+    'common',
     'users',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'common.middleware.compression.CompressionMiddleware',
+    'common.middleware.identity_map.IdentityMapMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'common.middleware.tenant_context.TenantContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.middleware.query_budget.QueryBudgetMiddleware',
 ]
 
 if DEBUG:
@@ -154,3 +160,37 @@ INTERNAL_IPS = ('127.0.0.1', '0.0.0.0', 'localhost',)
 # Celery Settings
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379')
+CELERY_BEAT_SCHEDULE = {
+    'archive-soft-deleted-rows': {
+        'task': 'common.tasks.archive_soft_deleted_rows',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
+
+
+# Cache Settings
+# Local memory by default, set CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and CACHE_LOCATION in
+# production so every process shares the cached responses and the model version counters
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Query Budget Settings
+# 'log' or 'raise' when a request exceeds its query budget or runs N+1 queries, empty to disable the counting.
+# Disabled by default outside of DEBUG, every query of every request would be run through the collector.
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='log' if DEBUG else '') or None
+# Budget of the requests not handled by a BaseViewSet or BaseAPIView, None for no limit
+QUERY_BUDGET_REQUEST_LIMIT = None
+
+# Response Compression Settings
+# Responses smaller than this number of bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+# Compression level per media type and encoding ('text/*' matches every text type), the other media types use
+# common.constants.COMPRESSION_LEVELS. Exports are compressed harder since they are large and downloaded once.
+COMPRESSION_LEVELS = {
+    'text/csv': {'br': 6, 'zstd': 6},
+    'application/x-ndjson': {'br': 6, 'zstd': 6},
+}
@@ -9,9 +9,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
-    'EXCEPTION_HANDLER': 'base.exceptions.custom_exception_handler'
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.rest_framework.renderers.FastJSONRenderer',
+        'common.rest_framework.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.rest_framework.parsers.FastJSONParser',
+        'common.rest_framework.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'EXCEPTION_HANDLER': 'common.rest_framework.exceptions.custom_exception_handler'
 }
 
+# Log the select_related/prefetch_related/only plan inferred for every view queryset
+QUERY_PLAN_DEBUG = config('QUERY_PLAN_DEBUG', default=False, cast=bool)
+
 # Simple JWT Settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=int(config('JWT_ACCESS_TOKEN_LIFETIME_IN_HOURS'))),
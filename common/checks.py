@@ -0,0 +1,26 @@
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from common.utils.urls import get_view_class, iter_url_patterns
+
+
+@checks.register(checks.Tags.urls)
+def check_query_filter_plans(app_configs, **kwargs):
+    """
+    Validates the query filter lookups of the views routed by ROOT_URLCONF, once the models are loaded.
+    Returns:
+        list: A common.E001 error per view with a lookup not resolving on its model.
+    """
+    errors = []
+    view_classes = set()
+    for route, name, callback in iter_url_patterns():
+        view_class = get_view_class(callback)
+        plan = getattr(view_class, 'query_filter_plan', None)
+        if plan is None or view_class in view_classes:
+            continue
+        view_classes.add(view_class)
+        try:
+            plan.validate()
+        except ImproperlyConfigured as e:
+            errors.append(checks.Error(str(e), obj=view_class, id='common.E001'))
+    return errors
@@ -11,6 +11,51 @@ FAILED = False
 
 DEFAULT_SINGLETON_INSTANCE_ID = 1
 
+# Maximum number of primary keys marked as deleted by a single UPDATE statement
+SOFT_DELETE_BATCH_SIZE = 1000
+# Maximum number of relation levels followed by a streaming soft delete
+SOFT_DELETE_MAX_DEPTH = 32
+# Transaction boundaries of a streaming soft delete
+SOFT_DELETE_ATOMIC_CASCADE = 'cascade'
+SOFT_DELETE_ATOMIC_BATCH = 'batch'
+# Rows moved per batch by the soft delete archival, and the pause in seconds between batches
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_BATCH_DELAY = 0.5
+# Pagination count strategies: cache timeout in seconds, cap of capped counts, the estimate below which
+# an exact count is run instead and the threads (and database connections) shared by the concurrent counts
+COUNT_CACHE_TIMEOUT = 60
+COUNT_CAP = 10000
+COUNT_ESTIMATE_EXACT_THRESHOLD = 1000
+COUNT_THREAD_POOL_SIZE = 4
+# Index types generated for the timestamp columns of TimestampModel subclasses
+TIMESTAMP_INDEX_BRIN = 'brin'
+TIMESTAMP_INDEX_BTREE = 'btree'
+# Celery state reported by an asynchronous soft delete while its cascade is running
+SOFT_DELETE_JOB_PROGRESS = 'PROGRESS'
+# Query budgets: what happens when a request exceeds its budget, and the number of executions of a statement
+# (differing only in its parameters) flagged as N+1 queries
+QUERY_BUDGET_LOG = 'log'
+QUERY_BUDGET_RAISE = 'raise'
+QUERY_BUDGET_DUPLICATE_THRESHOLD = 5
+# Response cache: the cache alias holding the per-model version counters and the default timeout in seconds
+MODEL_VERSION_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+# ArrayFilter: the maximum number of values of a filter, and the size of the IN lists the values are split into
+# on the databases without array parameters
+ARRAY_FILTER_MAX_ITEMS = 1000
+ARRAY_FILTER_CHUNK_SIZE = 500
+# Full-text search: the default PostgreSQL text search configuration of the models and the search_mode query
+# param value matching the terms as prefixes (typeahead)
+SEARCH_CONFIG = 'simple'
+SEARCH_MODE_PREFIX = 'prefix'
+# Response compression: the default level of each encoding and the media types which are already compressed
+COMPRESSION_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+COMPRESSED_MEDIA_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff', 'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/x-bzip2', 'application/x-xz', 'application/x-7z-compressed', 'application/x-rar-compressed',
+    'application/zstd', 'application/pdf', 'application/vnd.openxmlformats-officedocument.',
+)
+
 TRUE_VALUES = {
     't', 'T',
     'y', 'Y', 'yes', 'Yes', 'YES',
@@ -0,0 +1,244 @@
+import time
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.utils import timezone
+
+from common.constants import ARCHIVE_BATCH_SIZE, ARCHIVE_BATCH_DELAY
+from common.logging import LogInfo
+from common.utils import is_soft_delete_model
+
+
+def get_archive_table_name(model):
+    """
+    Returns the name of the archive table of a model.
+    """
+    return f'{model._meta.db_table}_archive'
+
+
+def get_archivable_models():
+    """
+    Returns the soft delete models declaring a retention window, ordered so that models referencing
+    another archivable model come before it. Archiving the referencing rows first frees their parents
+    within the same run.
+    Returns:
+        list: The model classes.
+    """
+    archivable = [
+        model for model in apps.get_models()
+        if is_soft_delete_model(model) and getattr(model, 'soft_delete_retention', None) is not None
+    ]
+    ordered = []
+
+    def visit(model, seen):
+        if model in ordered or model in seen:
+            return
+        seen.add(model)
+        for related in get_candidate_relations_to_delete(model._meta):
+            related_model = related.related_model._meta.concrete_model
+            if related_model in archivable:
+                visit(related_model, seen)
+        ordered.append(model)
+
+    for model in archivable:
+        visit(model, set())
+    return ordered
+
+
+def ensure_archive_table(model, using='default'):
+    """
+    Creates the archive table of a model, or adds the columns the live table gained since.
+    The archive table has the live table's columns without its constraints, so archived rows never block
+    writes to the tables they referenced.
+    Args:
+        model: The soft delete model class.
+        using (str): The database alias.
+    """
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    table_name = model._meta.db_table
+    archive_table_name = get_archive_table_name(model)
+
+    with connection.cursor() as cursor:
+        table_names = connection.introspection.table_names(cursor)
+        archive_columns = set()
+        if archive_table_name in table_names:
+            archive_columns = {
+                column.name for column in connection.introspection.get_table_description(cursor, archive_table_name)
+            }
+
+    with connection.schema_editor() as schema_editor:
+        if not archive_columns:
+            schema_editor.execute(
+                f'CREATE TABLE {quote_name(archive_table_name)} AS SELECT * FROM {quote_name(table_name)} WHERE 1 = 0'
+            )
+            deleted_at_column = model._meta.get_field('deleted_at').column
+            index_name = schema_editor._create_index_name(archive_table_name, [deleted_at_column], suffix='_idx')
+            schema_editor.execute(
+                f'CREATE INDEX {quote_name(index_name)} ON {quote_name(archive_table_name)} '
+                f'({quote_name(deleted_at_column)})'
+            )
+            return
+
+        for field in model._meta.concrete_fields:
+            if field.column not in archive_columns:
+                schema_editor.execute(
+                    f'ALTER TABLE {quote_name(archive_table_name)} '
+                    f'ADD COLUMN {quote_name(field.column)} {field.db_type(connection)} NULL'
+                )
+
+
+def get_archive_queryset(model, cutoff, using='default'):
+    """
+    Returns the queryset of the rows deleted before the cutoff which no live row references anymore.
+    Rows still referenced are left in place, deleting them would violate the referencing foreign keys.
+    Args:
+        model: The soft delete model class.
+        cutoff (datetime): The rows deleted before this timestamp are archived.
+        using (str): The database alias.
+    Returns:
+        QuerySet: The archivable rows.
+    """
+    queryset = model._base_manager.using(using).filter(deleted_at__lt=cutoff)
+    for related in get_candidate_relations_to_delete(model._meta):
+        field = related.field
+        related_model = related.related_model._meta.concrete_model
+        queryset = queryset.exclude(Exists(
+            related_model._base_manager.using(using).filter(**{field.attname: OuterRef(field.target_field.attname)})
+        ))
+    return queryset
+
+
+def archive_model(model, using='default', batch_size=ARCHIVE_BATCH_SIZE, delay=ARCHIVE_BATCH_DELAY, now=None):
+    """
+    Moves the rows of a model whose soft delete retention has passed into its archive table.
+    Rows are moved in keyset ordered batches, each copied and deleted in its own short transaction,
+    with a pause between batches so the live table is never locked for long. The rows of a batch are locked
+    and checked again in its transaction, those restored or referenced since the page was read are skipped.
+    Args:
+        model: The soft delete model class declaring soft_delete_retention.
+        using (str): The database alias.
+        batch_size (int): The maximum number of rows moved per batch.
+        delay (float): The number of seconds to wait between batches.
+        now (datetime): The reference time of the retention window (optional, defaults to now).
+    Returns:
+        int: The number of rows archived.
+    """
+    retention = getattr(model, 'soft_delete_retention', None)
+    if retention is None:
+        return 0
+    ensure_archive_table(model, using)
+
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    columns = ', '.join(quote_name(field.column) for field in model._meta.concrete_fields)
+    pk_column = quote_name(model._meta.pk.column)
+    cutoff = (now or timezone.now()) - retention
+    archive_queryset = get_archive_queryset(model, cutoff, using).order_by('pk').values_list('pk', flat=True)
+
+    archived = 0
+    last_pk = None
+    while True:
+        page = archive_queryset if last_pk is None else archive_queryset.filter(pk__gt=last_pk)
+        page_pks = list(page[:batch_size])
+        if not page_pks:
+            break
+        with transaction.atomic(using=using):
+            # The rows may have been restored or referenced since the page was read
+            pks = list(archive_queryset.filter(pk__in=page_pks).select_for_update())
+            if pks:
+                placeholders = ', '.join(['%s'] * len(pks))
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'INSERT INTO {quote_name(get_archive_table_name(model))} ({columns}) '
+                        f'SELECT {columns} FROM {quote_name(model._meta.db_table)} '
+                        f'WHERE {pk_column} IN ({placeholders})',
+                        pks,
+                    )
+                model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+        archived += len(pks)
+        last_pk = page_pks[-1]
+        if delay:
+            time.sleep(delay)
+
+    if archived:
+        LogInfo.info(f"Archived {archived} soft deleted {model._meta.label} rows")
+    return archived
+
+
+def purge_model_archive(model, using='default', batch_size=ARCHIVE_BATCH_SIZE, delay=ARCHIVE_BATCH_DELAY, now=None):
+    """
+    Hard deletes the archived rows of a model whose archive retention has passed.
+    Args:
+        model: The soft delete model class declaring archive_retention.
+        using (str): The database alias.
+        batch_size (int): The maximum number of rows deleted per batch.
+        delay (float): The number of seconds to wait between batches.
+        now (datetime): The reference time of the retention window (optional, defaults to now).
+    Returns:
+        int: The number of rows purged.
+    """
+    retention = getattr(model, 'archive_retention', None)
+    if retention is None:
+        return 0
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    archive_table_name = get_archive_table_name(model)
+    with connection.cursor() as cursor:
+        if archive_table_name not in connection.introspection.table_names(cursor):
+            return 0
+
+    pk_column = quote_name(model._meta.pk.column)
+    deleted_at_column = quote_name(model._meta.get_field('deleted_at').column)
+    cutoff = (now or timezone.now()) - retention
+    # Bind the cutoff the way the live table stores it, e.g. naive UTC on databases without time zone support
+    cutoff = connection.ops.adapt_datetimefield_value(cutoff)
+
+    purged = 0
+    while True:
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT {pk_column} FROM {quote_name(archive_table_name)} WHERE {deleted_at_column} < %s '
+                    f'ORDER BY {pk_column} LIMIT %s',
+                    [cutoff, batch_size],
+                )
+                pks = [row[0] for row in cursor.fetchall()]
+                if pks:
+                    placeholders = ', '.join(['%s'] * len(pks))
+                    cursor.execute(
+                        f'DELETE FROM {quote_name(archive_table_name)} WHERE {pk_column} IN ({placeholders})', pks
+                    )
+        if not pks:
+            break
+        purged += len(pks)
+        if delay:
+            time.sleep(delay)
+
+    if purged:
+        LogInfo.info(f"Purged {purged} archived {model._meta.label} rows")
+    return purged
+
+
+def archive_soft_deleted(models=None, using='default', batch_size=ARCHIVE_BATCH_SIZE, delay=ARCHIVE_BATCH_DELAY,
+                         purge=True):
+    """
+    Archives, then purges, the soft deleted rows of every model declaring a retention window.
+    Args:
+        models (list): The model classes to process (optional, defaults to every archivable model).
+        using (str): The database alias.
+        batch_size (int): The maximum number of rows per batch.
+        delay (float): The number of seconds to wait between batches.
+        purge (bool): If False, only archive rows and keep the archive tables untouched.
+    Returns:
+        dict: The number of rows archived and purged per model label.
+    """
+    now = timezone.now()
+    results = {}
+    for model in models or get_archivable_models():
+        results[model._meta.label] = {
+            'archived': archive_model(model, using, batch_size, delay, now),
+            'purged': purge_model_archive(model, using, batch_size, delay, now) if purge else 0,
+        }
+    return results
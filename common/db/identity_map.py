@@ -0,0 +1,268 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, router
+from django.db.backends.signals import connection_created
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor, ForwardOneToOneDescriptor
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
+
+from common.db.queries import context_execute_wrapper
+
+# The identity map of the current request (or block), None outside of one so nothing is memoized
+_identity_map = ContextVar('identity_map', default=None)
+
+# The table written by an INSERT, UPDATE or DELETE statement, quoted or not
+WRITTEN_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+[`"]?([\w$]+)[`"]?', re.IGNORECASE
+)
+# The statements never writing rows, every other statement (DDL, stored procedures, rollbacks to a savepoint...)
+# drops the entries of its database
+READ_STATEMENT_RE = re.compile(
+    r'^\s*(?:SELECT|EXPLAIN|SHOW|SET|SAVEPOINT|RELEASE|BEGIN|COMMIT|PRAGMA)\b', re.IGNORECASE
+)
+
+
+def get_model_tables(model):
+    """
+    Returns the tables holding the rows of a model, its parents' tables included (multi-table inheritance).
+    """
+    concrete_model = model._meta.concrete_model
+    return frozenset(parent._meta.db_table for parent in (concrete_model, *concrete_model._meta.get_parent_list()))
+
+
+class IdentityMap:
+    """
+    Request-scoped memo of the rows loaded by get_object_or_404, memoized_get and foreign key access.
+    Attributes:
+        objects (dict): The complete rows, by (database alias, model label, pk), each with the tables it was read
+            from. Served to the foreign key accesses.
+        queries (dict): The result of each memoized get, by (database alias, SQL, params), each with the tables the
+            query reads. The vendor and soft delete predicates are part of the SQL, so a lookup is only served the
+            row its own queryset returned.
+    It is the execute wrapper of its block: every entry reading a table is dropped when a statement writes rows of
+    that table, whatever the write path (save, delete, queryset and bulk updates, raw deletes, many-to-many
+    changes, raw SQL). The rows memoized in a transaction are dropped when it is rolled back, whether to a
+    savepoint (a ROLLBACK statement) or entirely (connection.rollback(), see install_rollback_hook).
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.queries = {}
+
+    @staticmethod
+    def get_object_key(model, pk, using):
+        return using, model._meta.concrete_model._meta.label_lower, pk
+
+    def get_object(self, model, pk, using):
+        entry = self.objects.get(self.get_object_key(model, pk, using))
+        return entry[1] if entry is not None else None
+
+    def add_object(self, instance, using):
+        # Rows loaded with only() or defer() would run a query per deferred field access
+        if instance.pk is not None and not instance.get_deferred_fields():
+            key = self.get_object_key(instance.__class__, instance.pk, using)
+            self.objects[key] = (get_model_tables(instance.__class__), instance)
+
+    def get_query(self, key):
+        entry = self.queries.get(key)
+        return entry[1] if entry is not None else None
+
+    def add_query(self, key, tables, instance, using):
+        self.queries[key] = (tables, instance)
+        self.add_object(instance, using)
+
+    def invalidate(self, tables):
+        """
+        Drops every entry reading one of the tables.
+        """
+        for entries in (self.objects, self.queries):
+            for key in [key for key, (entry_tables, _) in entries.items() if entry_tables & tables]:
+                del entries[key]
+
+    def invalidate_database(self, using):
+        """
+        Drops every entry read from a database.
+        """
+        for entries in (self.objects, self.queries):
+            for key in [key for key in entries if key[0] == using]:
+                del entries[key]
+
+    def clear(self):
+        self.objects.clear()
+        self.queries.clear()
+
+    def __call__(self, execute, sql, params, many, context):
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            # Failed statements may have written rows as well (e.g. part of an executemany)
+            self.invalidate_statement(sql, context['connection'].alias)
+
+    def invalidate_statement(self, sql, using):
+        """
+        Drops the entries reading the table written by a statement, every entry of its database for unknown
+        statements.
+        """
+        if not (self.objects or self.queries):
+            return
+        match = WRITTEN_TABLE_RE.match(sql)
+        if match is not None:
+            self.invalidate(frozenset([match.group(1)]))
+        elif READ_STATEMENT_RE.match(sql) is None:
+            self.invalidate_database(using)
+
+
+def install_rollback_hook(connection):
+    """
+    Wraps the rollback() of a connection, which ends the outermost atomic blocks without running a statement
+    through the execute wrappers, to drop the entries the identity map of the current context read from it.
+    """
+    if getattr(connection, 'identity_map_rollback_hook', False):
+        return
+    rollback = connection.rollback
+
+    def rollback_identity_map():
+        try:
+            return rollback()
+        finally:
+            current = get_identity_map()
+            if current is not None:
+                current.invalidate_database(connection.alias)
+
+    connection.rollback = rollback_identity_map
+    connection.identity_map_rollback_hook = True
+
+
+@receiver(connection_created)
+def add_rollback_hook(sender, connection, **kwargs):
+    install_rollback_hook(connection)
+
+
+def get_identity_map():
+    """
+    Returns the identity map of the current request, or None outside of an identity_map() block.
+    """
+    return _identity_map.get()
+
+
+@contextmanager
+def identity_map():
+    """
+    Context manager memoizing the rows loaded in the block (a request, a task...), discarded at its end.
+    Yields:
+        IdentityMap: The identity map of the block.
+    """
+    # The connections opened before the first block of the thread
+    for connection in connections.all(initialized_only=True):
+        install_rollback_hook(connection)
+    current = IdentityMap()
+    token = _identity_map.set(current)
+    try:
+        with context_execute_wrapper(current):
+            yield current
+    finally:
+        current.clear()
+        _identity_map.reset(token)
+
+
+def get_query_key(queryset):
+    """
+    Returns the memo key of a queryset and the tables it reads, (None, None) for the querysets always running
+    their query: locking, prefetching and combined (union...) querysets.
+    """
+    if queryset.query.select_for_update or queryset._prefetch_related_lookups or queryset.query.combinator:
+        return None, None
+    compiler = queryset.query.get_compiler(using=queryset.db)
+    try:
+        sql, params = compiler.as_sql()
+    except EmptyResultSet:
+        return None, None
+    # The tables of the joins of the query, known once compiled
+    tables = frozenset(join.table_name for join in compiler.query.alias_map.values())
+    return (queryset.db, sql, tuple(params)), tables | get_model_tables(queryset.model)
+
+
+def memoized_get(queryset, **kwargs):
+    """
+    Same as queryset.get(**kwargs), returning the instance already loaded by the same lookup in the current
+    identity map.
+    Raises:
+        DoesNotExist, MultipleObjectsReturned: Like queryset.get().
+    """
+    current = get_identity_map()
+    if current is None:
+        return queryset.get(**kwargs)
+    queryset = queryset.filter(**kwargs)
+    key, tables = get_query_key(queryset)
+    instance = current.get_query(key) if key is not None else None
+    if instance is None:
+        instance = queryset.get()
+        if key is not None:
+            current.add_query(key, tables, instance, queryset.db)
+    return instance
+
+
+async def amemoized_get(queryset, **kwargs):
+    """
+    Async version of memoized_get(), running queryset.aget() when the lookup is not memoized.
+    """
+    current = get_identity_map()
+    if current is None:
+        return await queryset.aget(**kwargs)
+    queryset = queryset.filter(**kwargs)
+    key, tables = get_query_key(queryset)
+    instance = current.get_query(key) if key is not None else None
+    if instance is None:
+        instance = await queryset.aget()
+        if key is not None:
+            current.add_query(key, tables, instance, queryset.db)
+    return instance
+
+
+class IdentityMapDescriptorMixin:
+    """
+    Foreign key descriptor serving the related object from the identity map of the current request when the key
+    targets its primary key, so rows already loaded by the request are not fetched again.
+    """
+
+    def get_object(self, instance):
+        current = get_identity_map()
+        if current is None or not self.field.target_field.primary_key:
+            return super().get_object(instance)
+        related_model = self.field.remote_field.model
+        pk = getattr(instance, self.field.attname)
+        using = router.db_for_read(related_model, instance=instance)
+        related_instance = current.get_object(related_model, pk, using)
+        if related_instance is None:
+            related_instance = super().get_object(instance)
+            current.add_object(related_instance, using)
+        return related_instance
+
+
+class IdentityMapForwardManyToOneDescriptor(IdentityMapDescriptorMixin, ForwardManyToOneDescriptor):
+    pass
+
+
+class IdentityMapForwardOneToOneDescriptor(IdentityMapDescriptorMixin, ForwardOneToOneDescriptor):
+    pass
+
+
+IDENTITY_MAP_DESCRIPTORS = {
+    ForwardManyToOneDescriptor: IdentityMapForwardManyToOneDescriptor,
+    ForwardOneToOneDescriptor: IdentityMapForwardOneToOneDescriptor,
+}
+
+
+@receiver(class_prepared)
+def add_identity_map_descriptors(sender, **kwargs):
+    """
+    Replaces the foreign key and one-to-one descriptors of the models with the identity map aware ones.
+    """
+    for field in sender._meta.local_fields:
+        if not (field.many_to_one or field.one_to_one):
+            continue
+        descriptor_class = IDENTITY_MAP_DESCRIPTORS.get(type(sender.__dict__.get(field.name)))
+        if descriptor_class is not None:
+            setattr(sender, field.name, descriptor_class(field))
@@ -0,0 +1,300 @@
+import datetime
+import json
+import re
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Index
+from django.db.models.constants import LOOKUP_SEP
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+
+from common.db.indexes import get_index_name
+from common.db.search import get_search_backend, get_search_index_fields
+from common.services.tenant_context import VENDOR_FIELD, is_vendor_model
+
+# Lookups a B-tree index serves, the contains and transformed lookups need full-text or expression indexes
+INDEXABLE_LOOKUPS = {'exact', 'in', 'in_array', 'isnull', 'gt', 'gte', 'lt', 'lte', 'range', 'startswith'}
+
+# Full scans of a table, the scans of virtual tables (FTS5, JSON_EACH) and the covering index scans are not
+SQLITE_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING| VIRTUAL TABLE)')
+SQLITE_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY|DISTINCT)')
+
+SEQ_SCAN = 'sequential scan'
+SORT = 'sort'
+SORT_SPILL = 'sort spilled to disk'
+MISSING_INDEX = 'missing composite index'
+
+
+class Scenario:
+    """
+    A representative queryset of a view, with the index that would serve it.
+    Attributes:
+        name (str): What the queryset exercises, e.g. "filter status" or "ordering -created_at".
+        queryset (QuerySet): The queryset, as built by the filter backends of the view.
+        index_fields (list): The local fields of the ideal composite index, in order (may be empty).
+        search_fields (list): The fields searched with icontains clauses, which no B-tree index serves.
+    """
+
+    def __init__(self, name, queryset, index_fields=(), search_fields=()):
+        self.name = name
+        self.queryset = queryset
+        self.index_fields = list(dict.fromkeys(index_fields))
+        self.search_fields = list(search_fields)
+
+
+def split_lookup(model, lookup):
+    """
+    Splits a lookup into its fields and its transforms and lookup.
+    Returns:
+        tuple: The field names, the last field (or None) and the remaining lookup names.
+    """
+    parts = lookup.split(LOOKUP_SEP)
+    fields, field = [], None
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return fields, field if fields else None, parts[index:]
+        fields.append(part)
+        if field.is_relation and field.related_model is not None and index < len(parts) - 1:
+            model = field.related_model
+    return fields, field, []
+
+
+def get_local_index_field(model, lookup):
+    """
+    Returns the local field a lookup filters (or orders) on, or None when a B-tree index of the model's table
+    can not serve it (relations, transforms, contains lookups...).
+    """
+    fields, field, rest = split_lookup(model, lookup)
+    if len(fields) != 1 or field is None or not field.concrete or len(rest) > 1:
+        return None
+    return fields[0] if (rest[0] if rest else 'exact') in INDEXABLE_LOOKUPS else None
+
+
+def get_sample_value(model, lookup, using):
+    """
+    Returns a value of the field a lookup filters on, read from the table so the plan is representative.
+    """
+    fields, field, rest = split_lookup(model, lookup)
+    if not fields:
+        return None
+    path = LOOKUP_SEP.join(fields)
+    return model._default_manager.using(using).exclude(**{f'{path}__isnull': True}).values_list(
+        path, flat=True).first()
+
+
+def get_sample_param(query_filter, model, using):
+    """
+    Returns a raw query param value the filter cleans successfully.
+    """
+    from common.rest_framework.filters import BooleanFilter, ChoiceFilter, DateTimeFilter, IntegerFilter
+
+    if isinstance(query_filter, ChoiceFilter):
+        choice = next(iter(query_filter.choices))
+        return str(choice[0] if isinstance(choice, (list, tuple)) else choice)
+    if isinstance(query_filter, BooleanFilter):
+        return 'true'
+    value = get_sample_value(model, query_filter.lookup, using)
+    if isinstance(query_filter, DateTimeFilter):
+        value = value if isinstance(value, (datetime.date, datetime.datetime)) else timezone.now()
+        return value.isoformat()[:19]
+    if value is None:
+        return '1' if isinstance(query_filter, IntegerFilter) else 'a'
+    return str(getattr(value, 'pk', value))
+
+
+def get_view_instance(view_class, params):
+    """
+    Returns a view instance handling a GET list request with the given query params.
+    """
+    request = Request(RequestFactory().get('/', params))
+    view = view_class()
+    view.request = request
+    view.args, view.kwargs = (), {}
+    view.format_kwarg = None
+    view.action = 'list'
+    return view
+
+
+def get_base_queryset(view_class, using):
+    """
+    Returns the queryset of a view with the predicates added to every request: the soft delete predicate of
+    SoftDeletionManager and the vendor scoping (with a vendor read from the table).
+    """
+    queryset = view_class.queryset
+    model = getattr(view_class, 'model', None) or queryset.model
+    queryset = (queryset.all() if queryset is not None else model._default_manager.all()).using(using)
+    if is_vendor_model(model):
+        queryset = queryset.filter(**{VENDOR_FIELD: get_sample_value(model, VENDOR_FIELD, using)})
+    return queryset
+
+
+def filter_queryset(view_class, queryset, params):
+    """
+    Runs the filter backends of a view on the queryset, for a request with the given query params.
+    """
+    view = get_view_instance(view_class, params)
+    for backend in list(view_class.filter_backends):
+        queryset = backend().filter_queryset(view.request, queryset, view)
+    return queryset
+
+
+def get_scenarios(view_class, using, page_size):
+    """
+    Builds the representative querysets of a view: one per query filter, per ordering field, and a search.
+    Every queryset is limited to a page, like the list action.
+    Returns:
+        list: The Scenario instances.
+    """
+    base = get_base_queryset(view_class, using)
+    model = base.model
+    base_fields = [VENDOR_FIELD] if is_vendor_model(model) else []
+    scenarios = [Scenario('list', base[:page_size], base_fields)]
+
+    plan = getattr(view_class, 'query_filter_plan', None)
+    for name, query_filter in (plan.filters.items() if plan is not None else ()):
+        queryset = filter_queryset(view_class, base, {name: get_sample_param(query_filter, model, using)})
+        field = get_local_index_field(model, query_filter.lookup)
+        scenarios.append(Scenario(f'filter {name}', queryset[:page_size],
+                                  [*base_fields, field] if field else base_fields))
+
+    for field in getattr(view_class, 'ordering_fields', None) or ():
+        if not isinstance(field, str) or field == '__all__':
+            continue
+        queryset = filter_queryset(view_class, base, {'ordering': field})
+        local_field = get_local_index_field(model, field)
+        scenarios.append(Scenario(f'ordering {field}', queryset[:page_size],
+                                  [*base_fields, local_field] if local_field else base_fields))
+
+    search_fields = [field.lstrip('^=@$') for field in getattr(view_class, 'search_fields', None) or ()]
+    if search_fields:
+        word = (str(get_sample_value(model, search_fields[0], using) or '').split() or ['a'])[0]
+        queryset = filter_queryset(view_class, base, {'search': word})
+        indexed = (get_search_backend(model, base.db) is not None
+                   and set(search_fields) <= set(get_search_index_fields(model)))
+        scenarios.append(Scenario('search', queryset[:page_size], base_fields,
+                                  search_fields=() if indexed else search_fields))
+    return scenarios
+
+
+def supports_analyze(using):
+    """
+    Checks if the plans of a database report the sorts spilling to disk when the queries run: EXPLAIN ANALYZE
+    on PostgreSQL and ANALYZE FORMAT=JSON on MariaDB. MySQL only runs EXPLAIN ANALYZE in the TREE format.
+    """
+    connection = connections[using]
+    return connection.vendor == 'postgresql' or (connection.vendor == 'mysql' and connection.mysql_is_mariadb)
+
+
+def explain(queryset, analyze=False):
+    """
+    Runs EXPLAIN on a queryset and extracts the sequential scans and sorts of its plan.
+    Args:
+        queryset (QuerySet): The queryset.
+        analyze (bool): If True, run the query to find the sorts spilling to disk, ignored by the databases
+            without supports_analyze.
+    Returns:
+        list: Tuples of (kind, table or None, detail).
+    """
+    vendor = connections[queryset.db].vendor
+    analyze = analyze and supports_analyze(queryset.db)
+    if vendor == 'postgresql':
+        plan = json.loads(queryset.explain(format='json', analyze=analyze))
+        return list(walk_postgresql_plan(plan[0]['Plan']))
+    if vendor == 'mysql':
+        return list(walk_mysql_plan(json.loads(queryset.explain(format='json', analyze=analyze))))
+    if vendor == 'sqlite':
+        # Each row of EXPLAIN QUERY PLAN is "id parent notused detail"
+        lines = [line.split(' ', 3)[-1] for line in queryset.explain().splitlines()]
+        findings = [(SEQ_SCAN, table, line) for line in lines for table in SQLITE_SCAN_RE.findall(line)]
+        findings += [(SORT, None, line) for line in lines if SQLITE_SORT_RE.search(line)]
+        return findings
+    return []
+
+
+def walk_postgresql_plan(node):
+    node_type = node.get('Node Type')
+    if node_type == 'Seq Scan':
+        yield SEQ_SCAN, node.get('Relation Name'), f"{node.get('Plan Rows')} estimated rows"
+    elif node_type in ('Sort', 'Incremental Sort'):
+        keys = ', '.join(node.get('Sort Key', ()))
+        if node.get('Sort Space Type') == 'Disk':
+            yield SORT_SPILL, None, f"{keys} ({node.get('Sort Space Used')} kB on disk)"
+        else:
+            yield SORT, None, keys
+    for child in node.get('Plans', ()):
+        yield from walk_postgresql_plan(child)
+
+
+def walk_mysql_plan(node):
+    # The r_* members are the measures of MariaDB's ANALYZE, a filesort with merge passes spilled to disk
+    if isinstance(node, dict):
+        table = node.get('table')
+        if isinstance(table, dict) and table.get('access_type') == 'ALL':
+            if 'r_rows' in table:
+                yield SEQ_SCAN, table.get('table_name'), f"{table['r_rows']} rows read"
+            else:
+                rows = table.get('rows_examined_per_scan', table.get('rows'))
+                yield SEQ_SCAN, table.get('table_name'), f"{rows} rows"
+        filesort = node.get('filesort')
+        if isinstance(filesort, dict) and filesort.get('r_sort_passes'):
+            yield SORT_SPILL, None, f"filesort ({filesort['r_sort_passes']} merge passes)"
+        elif node.get('using_filesort') or 'filesort' in node:
+            yield SORT, None, 'filesort'
+        for value in node.values():
+            yield from walk_mysql_plan(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from walk_mysql_plan(value)
+
+
+def index_exists(model, fields, using):
+    """
+    Checks if an index of the model's table starts with the columns of the fields.
+    """
+    columns = [model._meta.get_field(field).column for field in fields]
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return any(
+        (constraint['index'] or constraint['primary_key'] or constraint['unique'])
+        and constraint['columns'][:len(columns)] == columns
+        for constraint in constraints.values()
+    )
+
+
+def suggest_index(model, fields):
+    """
+    Returns the declaration adding a composite index on the fields, the way the model's indexes are declared.
+    """
+    from common.db.models import SoftDeleteModel
+
+    if issubclass(model, SoftDeleteModel):
+        return f"{model.__name__}.soft_delete_index_fields += ({tuple(fields)!r},)"
+    name = get_index_name(model, Index, fields)
+    return f"{model.__name__}.Meta.indexes: models.Index(fields={list(fields)!r}, name={name!r})"
+
+
+def advise(scenario, analyze=False):
+    """
+    Explains a scenario and suggests the index serving it.
+    Returns:
+        tuple: The findings, as tuples of (kind, table, detail), and the suggested declarations.
+    """
+    queryset = scenario.queryset
+    model = queryset.model
+    findings = explain(queryset, analyze)
+    suggestions = []
+    problems = [kind for kind, table, detail in findings
+                if kind in (SORT, SORT_SPILL) or table in (None, model._meta.db_table)]
+    if scenario.index_fields and not index_exists(model, scenario.index_fields, queryset.db):
+        findings.append((MISSING_INDEX, model._meta.db_table, ', '.join(scenario.index_fields)))
+        if problems or len(scenario.index_fields) > 1:
+            suggestions.append(suggest_index(model, scenario.index_fields))
+    if scenario.search_fields:
+        local = [field for field in scenario.search_fields if LOOKUP_SEP not in field]
+        suggestions.append(f"{model.__name__}.search_index_fields = {tuple(local)!r}  # icontains search on "
+                           f"{', '.join(scenario.search_fields)}")
+    return findings, suggestions
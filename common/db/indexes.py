@@ -0,0 +1,126 @@
+from django.db import connections, router
+from django.db.models import Index, Q
+
+from common.constants import TIMESTAMP_INDEX_BRIN, TIMESTAMP_INDEX_BTREE
+
+
+class SoftDeleteIndex(Index):
+    """
+    Partial index on the non-deleted rows of a soft delete model.
+    It matches the `deleted_at IS NULL` predicate added by SoftDeletionManager, so lookups through
+    `objects` only scan live rows. It is not generated for the models of databases without partial index
+    support (MySQL, MariaDB).
+    """
+    suffix = 'nd'
+
+    def __init__(self, *expressions, **kwargs):
+        kwargs.setdefault('condition', Q(deleted_at=None))
+        super().__init__(*expressions, **kwargs)
+
+
+class TimestampIndex(Index):
+    """
+    Index for the timestamp columns of a timestamp model.
+    On PostgreSQL it is created as a BRIN index when brin is True, which stays tiny for append-only
+    timestamp columns. Every other database gets a regular B-tree index.
+    """
+    suffix = 'ts'
+
+    def __init__(self, *expressions, brin=True, **kwargs):
+        self.brin = brin
+        super().__init__(*expressions, **kwargs)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if not self.brin:
+            kwargs['brin'] = False
+        return path, args, kwargs
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if self.brin and schema_editor.connection.vendor == 'postgresql':
+            using = ' USING brin'
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
+class FullTextIndex(Index):
+    """
+    Names the full-text index of a model. The index itself is created by common.db.search, since every
+    database builds it differently (GIN expression index, FULLTEXT index or FTS5 table).
+    """
+    suffix = 'fts'
+
+
+def get_local_field_names(model):
+    """
+    Returns the names of the fields stored in the model's own table.
+    """
+    return {field.name for field in model._meta.local_fields}
+
+
+def get_index_name(model, index_class, fields):
+    """
+    Generates the index name Django would give an index of index_class on the fields of the model.
+    Partial indexes must be named on creation, so the name is computed on an unconditioned copy.
+    """
+    index = index_class(fields=fields, condition=None)
+    index.set_name_with_model(model)
+    return index.name
+
+
+def supports_partial_indexes(model):
+    """
+    Checks if the database the model is written to supports partial indexes, without connecting to it.
+    """
+    return connections[router.db_for_write(model)].features.supports_partial_indexes
+
+
+def get_base_model_indexes(model):
+    """
+    Builds the indexes a concrete soft delete or timestamp model should declare.
+    Args:
+        model: The concrete model class.
+    Returns:
+        list: The SoftDeleteIndex and TimestampIndex instances, named for the model.
+    Note:
+        The indexes are driven by the following model attributes:
+        - soft_delete_index_fields: Field names (or tuples of field names) looked up on non-deleted rows,
+          skipped on databases without partial indexes.
+        - timestamp_index_types: The index type of each timestamp field, TIMESTAMP_INDEX_BRIN,
+          TIMESTAMP_INDEX_BTREE or None to opt out.
+        - auto_indexes: Set to False to opt the model out of all generated indexes.
+    """
+    if not getattr(model, 'auto_indexes', True):
+        return []
+
+    indexes = []
+    local_fields = get_local_field_names(model)
+
+    if 'deleted_at' in local_fields and supports_partial_indexes(model):
+        for fields in getattr(model, 'soft_delete_index_fields', ()):
+            fields = (fields,) if isinstance(fields, str) else tuple(fields)
+            indexes.append(SoftDeleteIndex(fields=fields, name=get_index_name(model, SoftDeleteIndex, fields)))
+
+    for field, index_type in getattr(model, 'timestamp_index_types', {}).items():
+        if field in local_fields and index_type in (TIMESTAMP_INDEX_BRIN, TIMESTAMP_INDEX_BTREE):
+            indexes.append(TimestampIndex(fields=[field], brin=index_type == TIMESTAMP_INDEX_BRIN,
+                                          name=get_index_name(model, TimestampIndex, [field])))
+    return indexes
+
+
+def add_base_model_indexes(model):
+    """
+    Adds the generated indexes to the model's Meta.indexes, skipping the ones it already declares.
+    Args:
+        model: The concrete model class.
+    """
+    opts = model._meta
+    if opts.abstract or opts.proxy or not opts.managed:
+        return
+    declared = {(tuple(index.fields), index.condition) for index in opts.indexes}
+    generated = [
+        index for index in get_base_model_indexes(model)
+        if (tuple(index.fields), index.condition) not in declared
+    ]
+    if generated:
+        # Assign a new list, Meta.indexes may be shared with an abstract parent's Meta
+        opts.indexes = [*opts.indexes, *generated]
@@ -0,0 +1,114 @@
+from celery import uuid
+from celery.result import AsyncResult
+from django.db import transaction
+
+from backend.celery import app
+from common.constants import SOFT_DELETE_BATCH_SIZE, SOFT_DELETE_ATOMIC_CASCADE, SOFT_DELETE_JOB_PROGRESS
+from common.tasks import soft_delete_cascade
+from common.utils import get_delete_attributes, soft_delete_pks
+
+
+class SoftDeleteJob:
+    """
+    Handle of an asynchronous soft delete, used to poll the progress of its cascade.
+    The handle only needs the job id, so it can be rebuilt in a later request with SoftDeleteJob(job_id).
+    Attributes:
+        id (str): The id of the Celery task running the cascade.
+        root_counts (dict): The number of root objects marked before dispatch, per model label.
+    """
+
+    def __init__(self, job_id, root_counts=None):
+        self.id = job_id
+        self.root_counts = root_counts or {}
+
+    @property
+    def result(self):
+        """
+        Returns the Celery result of the cascade task.
+        """
+        return AsyncResult(self.id, app=app)
+
+    @property
+    def status(self):
+        """
+        Returns the Celery state of the cascade task (PENDING, PROGRESS, SUCCESS or FAILURE).
+        """
+        return self.result.state
+
+    @property
+    def counts(self):
+        """
+        Returns the number of rows marked as deleted so far, per model label.
+        """
+        result = self.result
+        if result.state in (SOFT_DELETE_JOB_PROGRESS, 'SUCCESS') and isinstance(result.info, dict):
+            return result.info.get('counts', {})
+        return self.root_counts
+
+    def ready(self):
+        """
+        Returns True once the cascade task has finished, successfully or not.
+        """
+        return self.result.ready()
+
+    def as_dict(self):
+        """
+        Returns the job state as a dictionary suitable for an API response.
+        """
+        counts = self.counts
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'total': sum(counts.values()),
+            'counts': counts,
+        }
+
+
+def dispatch_soft_delete(queryset, user=None, batch_size=SOFT_DELETE_BATCH_SIZE, atomic=SOFT_DELETE_ATOMIC_CASCADE):
+    """
+    Marks the objects of the queryset as deleted right away and hands their cascade to a Celery task.
+    The roots are marked in keyset ordered batches of primary keys, and the task finds them again by their
+    deletion timestamp, deleting user and primary key range, so neither the request nor the task message holds
+    every primary key. The task stamps the rows of the cascade with its own timestamp, so they never match the
+    roots of the job, even on self-referencing models.
+    The task is only sent once the current transaction commits, so the worker always sees the marked roots.
+    Args:
+        queryset: The queryset of the root objects.
+        user: The user initiating the deletion (optional).
+        batch_size (int): The maximum number of primary keys per batch.
+        atomic (str): The transaction boundaries of the cascade, per cascade or per batch.
+    Returns:
+        SoftDeleteJob: The handle of the dispatched job.
+    """
+    model = queryset.model
+    using = queryset.db
+    attributes = get_delete_attributes(user)
+    batch_queryset = queryset.filter(deleted_at=None).order_by('pk').values_list('pk', flat=True)
+    count = 0
+    first_pk = last_pk = None
+    with transaction.atomic(using=using):
+        while True:
+            page = batch_queryset if last_pk is None else batch_queryset.filter(pk__gt=last_pk)
+            pks = list(page[:batch_size])
+            if not pks:
+                break
+            count += soft_delete_pks(model, pks, attributes, using, batch_size)
+            if first_pk is None:
+                first_pk = pks[0]
+            last_pk = pks[-1]
+
+    root_counts = {model._meta.label: count} if count else {}
+    job = SoftDeleteJob(uuid(), root_counts)
+    task_kwargs = {
+        'model_label': model._meta.label,
+        'deleted_at': attributes['deleted_at'].isoformat(),
+        'first_pk': first_pk,
+        'last_pk': last_pk,
+        'user_id': user.pk if user is not None else None,
+        'root_counts': root_counts,
+        'using': using,
+        'batch_size': batch_size,
+        'atomic': atomic,
+    }
+    transaction.on_commit(lambda: soft_delete_cascade.apply_async(kwargs=task_kwargs, task_id=job.id), using=using)
+    return job
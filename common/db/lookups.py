@@ -0,0 +1,58 @@
+import json
+from django.db.models import Field
+from django.db.models.lookups import In
+
+from common.constants import ARRAY_FILTER_CHUNK_SIZE
+
+
+@Field.register_lookup
+class ArrayIn(In):
+    """
+    `in` lookup sending large value lists efficiently:
+    - PostgreSQL: `column = ANY(%s)` with the values as a single array parameter, so every list length shares
+      the same statement and plan.
+    - SQLite: `column IN (SELECT value FROM JSON_EACH(%s))` with the values as a single JSON parameter,
+      keeping far below the bound parameter limit.
+    - Other databases: OR-ed IN lists of at most ARRAY_FILTER_CHUNK_SIZE values.
+    Usage: queryset.filter(id__in_array=[1, 2, 3])
+    """
+    lookup_name = 'in_array'
+
+    def sends_values(self):
+        """
+        Returns True when the right hand side is a list of values, not a subquery or transformed values.
+        """
+        return self.rhs_is_direct_value() and not self.bilateral_transforms
+
+    def as_sql(self, compiler, connection):
+        if self.sends_values() and len(self.rhs) > ARRAY_FILTER_CHUNK_SIZE:
+            return self.split_in_chunks(compiler, connection)
+        return super().as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        if not self.sends_values():
+            return super().as_sql(compiler, connection)
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        # Raises EmptyResultSet for an empty list, like the in lookup
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        db_type = self.lhs.output_field.cast_db_type(connection)
+        return f'{lhs} = ANY(%s::{db_type}[])', (*lhs_params, list(rhs_params))
+
+    def as_sqlite(self, compiler, connection):
+        if not self.sends_values() or not connection.features.supports_json_field:
+            return self.as_sql(compiler, connection)
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (f'{lhs} IN (SELECT value FROM JSON_EACH(%s))',
+                (*lhs_params, json.dumps(list(rhs_params), default=str)))
+
+    def split_in_chunks(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        sql, params = [], []
+        for offset in range(0, len(rhs_params), ARRAY_FILTER_CHUNK_SIZE):
+            chunk = rhs_params[offset:offset + ARRAY_FILTER_CHUNK_SIZE]
+            sql.append(f"{lhs} IN ({', '.join(['%s'] * len(chunk))})")
+            params.extend(lhs_params)
+            params.extend(chunk)
+        return f"({' OR '.join(sql)})", params
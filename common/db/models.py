@@ -1,9 +1,18 @@
-from datetime import datetime
 from django.db import models
 from django.db.models.deletion import Collector
-
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
+
+from common.constants import (SOFT_DELETE_BATCH_SIZE, SOFT_DELETE_ATOMIC_CASCADE, TIMESTAMP_INDEX_BRIN,
+                              TIMESTAMP_INDEX_BTREE)
+from common.db import identity_map  # noqa: F401, connects the identity map receivers and descriptors
+from common.db import lookups  # noqa: F401, registers the in_array lookup
+from common.db import search  # noqa: F401, creates the full-text indexes after migrate
+from common.db import versions  # noqa: F401, connects the model version receivers
+from common.db.indexes import add_base_model_indexes
+from common.db.jobs import dispatch_soft_delete
 from common.db.managers import SoftDeletionManager
-from common.utils import manage_delete_dependency
+from common.utils import manage_delete_dependency, stream_soft_delete
 from users.models import User
 
 
@@ -12,6 +21,10 @@ class TimestampModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Index generated per timestamp column: TIMESTAMP_INDEX_BRIN, TIMESTAMP_INDEX_BTREE or None to opt out.
+    # BRIN only suits append-only columns following the physical row order, updated_at is rewritten on every save
+    timestamp_index_types = {'created_at': TIMESTAMP_INDEX_BRIN, 'updated_at': TIMESTAMP_INDEX_BTREE}
+
     class Meta:
         abstract = True
 
@@ -35,29 +48,77 @@ class SoftDeleteModel(models.Model):
     objects = SoftDeletionManager()
     all_objects = SoftDeletionManager(non_deleted_only=False)
 
+    # Fields (or tuples of fields) looked up on non-deleted rows, each gets a partial `deleted_at IS NULL` index
+    soft_delete_index_fields = ()
+
+    # Time (timedelta) deleted rows stay in the live table before being moved to the archive table, None keeps them
+    soft_delete_retention = None
+    # Time (timedelta) after the deletion before archived rows are hard deleted, None keeps them forever
+    archive_retention = None
+
     class Meta:
         abstract = True
 
-    def delete(self, user=None):
+    def delete(self, user=None, stream=False, batch_size=SOFT_DELETE_BATCH_SIZE, atomic=SOFT_DELETE_ATOMIC_CASCADE,
+               async_=False):
         """
         Soft deletes the object and its dependencies.
 
         Args:
             user: The user initiating the deletion (optional).
+            stream (bool): If True, walk the cascade in keyset ordered batches instead of collecting every
+                related object in memory.
+            batch_size (int): The maximum number of primary keys per batch.
+            atomic (str): The transaction boundaries of a streaming delete, per cascade or per batch.
+            async_ (bool): If True, mark the object right away and stream its cascade in a Celery task.
+        Returns:
+            tuple: The total number of objects soft deleted and a dictionary with the count per model label,
+                or a SoftDeleteJob handle when async_ is True.
         """
-        # Use a collector to gather related objects for deletion
-        collector = Collector(using='default')
-        collector.collect([self], keep_parents=False)
-
-        # Manage dependencies and mark objects for deletion
-        manage_delete_dependency(collector, user)
-
-        # Set 'deleted_at' attribute to mark soft deletion
-        self.deleted_at = datetime.utcnow()
-        self.save()
+        using = self._state.db or 'default'
+        if async_:
+            # Mark the object now and hand its cascade to a Celery task
+            queryset = self.__class__._base_manager.using(using).filter(pk=self.pk)
+            deleted = dispatch_soft_delete(queryset, user, batch_size=batch_size, atomic=atomic)
+        elif stream:
+            # Stream the cascade starting from a queryset of this object only
+            queryset = self.__class__._base_manager.using(using).filter(pk=self.pk, deleted_at=None)
+            deleted = stream_soft_delete(queryset, user, batch_size=batch_size, atomic=atomic)
+        else:
+            # Use a collector to gather related objects for deletion
+            collector = Collector(using=using)
+            collector.collect([self], keep_parents=False)
+
+            # Manage dependencies and mark objects (including this one) as deleted in bulk
+            deleted = manage_delete_dependency(collector, user, batch_size=batch_size)
+
+        # Reflect the soft deletion on this instance without another write
+        self.refresh_from_db(fields=['is_deleted', 'deleted_at', 'deleted_by'])
+        return deleted
 
     def hard_delete(self):
         """
         Hard deletes (permanently removes) the object.
         """
         super(SoftDeleteModel, self).delete()
+
+
+@receiver(class_prepared)
+def add_generated_indexes(sender, **kwargs):
+    """
+    Adds the generated soft delete and timestamp indexes to every concrete subclass of the base models.
+    Set `auto_indexes = False` on a model to opt it out.
+    """
+    if issubclass(sender, (SoftDeleteModel, TimestampModel)):
+        add_base_model_indexes(sender)
+
+
+@receiver(class_prepared)
+def register_timestamp_model_version(sender, **kwargs):
+    """
+    Registers the version counter of every concrete timestamp model, read by the ETags of conditional GET
+    (see ConditionalGetMixin). Registering the model class keeps the bumps working in processes that never
+    import the views, such as the Celery workers.
+    """
+    if issubclass(sender, TimestampModel) and not sender._meta.abstract:
+        versions.register_versioned_models([sender])
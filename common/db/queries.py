@@ -0,0 +1,172 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from common.constants import QUERY_BUDGET_DUPLICATE_THRESHOLD, QUERY_BUDGET_LOG, QUERY_BUDGET_RAISE
+from common.logging import LogInfo
+
+# Literals and placeholder lists, replaced to group statements differing only in their parameters
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST_RE = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+
+# The execute wrappers of the current context. Unlike the execute wrappers of a connection, which only see the
+# queries of its thread, they are copied into sync_to_async calls and so see the queries of the async ORM
+_context_execute_wrappers = ContextVar('context_execute_wrappers', default=())
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a request runs more queries than its budget, or repeats a statement (N+1).
+    """
+    pass
+
+
+def normalize_sql(sql):
+    """
+    Returns the SQL with its literals and IN lists replaced, so statements differing only in their
+    parameters share the same signature.
+    """
+    sql = STRING_LITERAL_RE.sub('?', sql)
+    sql = NUMBER_LITERAL_RE.sub('?', sql)
+    return PLACEHOLDER_LIST_RE.sub('(...)', sql)
+
+
+class QueryCollector:
+    """
+    Database execute wrapper recording the statements run while it is installed.
+    Attributes:
+        queries (list): Tuples of (alias, sql, duration in seconds).
+        aliases (list): The database aliases whose statements are recorded, None for every alias.
+    """
+
+    def __init__(self, aliases=None):
+        self.queries = []
+        self.aliases = aliases
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.aliases is not None and context['connection'].alias not in self.aliases:
+            return execute(sql, params, many, context)
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((context['connection'].alias, sql, time.monotonic() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def get_duplicates(self, threshold=QUERY_BUDGET_DUPLICATE_THRESHOLD):
+        """
+        Returns the normalized statements run at least `threshold` times, the signature of N+1 queries.
+        Returns:
+            dict: The number of executions per normalized statement.
+        """
+        counter = Counter(normalize_sql(sql) for alias, sql, duration in self.queries)
+        return {sql: count for sql, count in counter.most_common() if count >= threshold}
+
+    def get_violations(self, budget=None, threshold=QUERY_BUDGET_DUPLICATE_THRESHOLD):
+        """
+        Returns the messages describing how the recorded queries break the budget.
+        Args:
+            budget (int): The maximum number of queries (optional).
+            threshold (int): The number of executions of a statement flagged as N+1 (optional, None to skip).
+        Returns:
+            list: The violation messages, empty when the budget is respected.
+        """
+        violations = []
+        if budget is not None and self.count > budget:
+            violations.append(f"{self.count} queries run, the budget is {budget}")
+        if threshold:
+            for sql, count in self.get_duplicates(threshold).items():
+                violations.append(f"Possible N+1, {count} similar queries: {sql}")
+        return violations
+
+
+def run_context_execute_wrappers(execute, sql, params, many, context):
+    """
+    Execute wrapper of every connection, running the query through the execute wrappers of the current context.
+    """
+    for wrapper in reversed(_context_execute_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_context_execute_wrappers(connection):
+    # Inserted first so it never breaks the last-in first-out pops of connection.execute_wrapper()
+    if run_context_execute_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, run_context_execute_wrappers)
+
+
+@receiver(connection_created)
+def add_context_execute_wrappers(sender, connection, **kwargs):
+    install_context_execute_wrappers(connection)
+
+
+@contextmanager
+def context_execute_wrapper(wrapper):
+    """
+    Context manager running the queries of the block through an execute wrapper, on every database and in every
+    thread running the block's context: the sync_to_async threads of the async ORM included.
+    Args:
+        wrapper: The execute wrapper, called like the ones of connection.execute_wrapper().
+    """
+    # The connections opened before the first block of the thread
+    for connection in connections.all(initialized_only=True):
+        install_context_execute_wrappers(connection)
+    token = _context_execute_wrappers.set((*_context_execute_wrappers.get(), wrapper))
+    try:
+        yield wrapper
+    finally:
+        _context_execute_wrappers.reset(token)
+
+
+@contextmanager
+def collect_queries(using=None):
+    """
+    Context manager recording the queries run on the given database aliases, every alias by default.
+    The queries of the async ORM run by the block are recorded as well.
+    Yields:
+        QueryCollector: The collector, filled as queries run.
+    """
+    collector = QueryCollector([using] if isinstance(using, str) else using)
+    with context_execute_wrapper(collector):
+        yield collector
+
+
+def get_query_budget_mode():
+    """
+    Returns the QUERY_BUDGET_MODE setting: QUERY_BUDGET_LOG, QUERY_BUDGET_RAISE, or None when disabled.
+    """
+    return getattr(settings, 'QUERY_BUDGET_MODE', None)
+
+
+def report_query_budget(collector, name, budget=None, threshold=QUERY_BUDGET_DUPLICATE_THRESHOLD, mode=None):
+    """
+    Logs or raises the budget violations of the queries recorded by a collector.
+    Args:
+        collector (QueryCollector): The collector of the request.
+        name (str): The name of the checked view or request, used in the messages.
+        budget (int): The maximum number of queries (optional).
+        threshold (int): The number of executions of a statement flagged as N+1.
+        mode (str): QUERY_BUDGET_LOG or QUERY_BUDGET_RAISE, defaults to the QUERY_BUDGET_MODE setting.
+    Returns:
+        list: The violation messages.
+    """
+    mode = mode or get_query_budget_mode()
+    violations = collector.get_violations(budget, threshold)
+    if violations:
+        message = f"Query budget exceeded by {name}: " + '; '.join(violations)
+        if mode == QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        if mode == QUERY_BUDGET_LOG:
+            LogInfo.error(message)
+    return violations
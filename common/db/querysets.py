@@ -1,8 +1,11 @@
-from datetime import datetime
+from django.apps import apps
 from django.db.models import QuerySet
 from django.db.models.deletion import Collector
 
-from common.utils import manage_delete_dependency
+from common.constants import SOFT_DELETE_BATCH_SIZE, SOFT_DELETE_ATOMIC_CASCADE
+from common.db.jobs import dispatch_soft_delete
+from common.db.signals import send_rows_changed
+from common.utils import manage_delete_dependency, stream_soft_delete
 
 
 class SoftDeletionQuerySet(QuerySet):
@@ -10,13 +13,21 @@ class SoftDeletionQuerySet(QuerySet):
     Custom Queryset to handle Soft Delete
     """
 
-    def delete(self, user=None):
+    def delete(self, user=None, stream=False, batch_size=SOFT_DELETE_BATCH_SIZE, atomic=SOFT_DELETE_ATOMIC_CASCADE,
+               async_=False):
         """
         Soft deletes objects in the queryset and manages dependencies.
         Args:
             user: The user initiating the deletion (optional).
+            stream (bool): If True, walk the cascade in keyset ordered batches instead of collecting every
+                related object in memory (see stream_soft_delete).
+            batch_size (int): The maximum number of primary keys per batch.
+            atomic (str): The transaction boundaries of a streaming delete, per cascade or per batch.
+            async_ (bool): If True, mark the objects of the queryset right away and stream their cascade in a
+                Celery task.
         Returns:
-            int: The number of objects updated (soft deleted).
+            tuple: The total number of objects soft deleted and a dictionary with the count per model label,
+                or a SoftDeleteJob handle when async_ is True.
         """
         # Create a query for deletion
         del_query = self._chain()
@@ -27,24 +38,55 @@ class SoftDeletionQuerySet(QuerySet):
         del_query.query.select_related = False
         del_query.query.clear_ordering()
 
+        # Hand the cascade to a Celery task so the caller does not wait for it
+        if async_:
+            return dispatch_soft_delete(del_query, user, batch_size=batch_size, atomic=atomic)
+
+        # Stream the cascade level by level for object graphs too large to collect
+        if stream:
+            return stream_soft_delete(del_query, user, batch_size=batch_size, atomic=atomic)
+
         # Use a collector to gather related objects for deletion
-        collector = Collector(using='default')
+        collector = Collector(using=del_query.db)
         collector.collect(del_query)
 
-        # Manage dependencies and mark objects for deletion
-        manage_delete_dependency(collector, user)
-
-        # Set 'deleted_at' attribute to mark soft deletion
-        update = {'deleted_at': datetime.utcnow()}
-        return super(SoftDeletionQuerySet, self).update(**update)
+        # Manage dependencies and mark the objects (including this queryset) as deleted in bulk
+        return manage_delete_dependency(collector, user, batch_size=batch_size)
 
     def hard_delete(self):
         """
         Hard deletes (permanently removes) objects in the queryset.
         Returns:
-            int: The number of objects deleted.
+            tuple: The number of objects deleted and a dictionary with the count per model label.
+        """
+        deleted, counts = super(SoftDeletionQuerySet, self).delete()
+        # Fast deletes of the cascade do not send post_delete, report every model with deleted rows
+        for label, count in counts.items():
+            if count:
+                send_rows_changed(apps.get_model(label), self.db)
+        return deleted, counts
+
+    def update(self, **kwargs):
+        """
+        Updates the rows of the queryset and notifies the rows_changed receivers (e.g. the response cache).
+        Returns:
+            int: The number of rows updated.
+        """
+        count = super().update(**kwargs)
+        if count:
+            send_rows_changed(self.model, self.db)
+        return count
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Inserts the objects in bulk and notifies the rows_changed receivers.
+        Returns:
+            list: The created objects.
         """
-        return super(SoftDeletionQuerySet, self).delete()
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            send_rows_changed(self.model, self.db)
+        return objs
 
     def non_deleted(self):
         """
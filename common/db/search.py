@@ -0,0 +1,336 @@
+import re
+from django.apps import apps
+from django.db import connections
+from django.db.models import F, FloatField, Func
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+from common.constants import SEARCH_CONFIG
+from common.db.indexes import FullTextIndex, get_index_name
+from common.logging import LogInfo
+
+# Words of the search terms, operators and punctuation are dropped so no term breaks the query syntax
+SEARCH_WORD_RE = re.compile(r'\w+')
+# The insert, update and delete triggers syncing an SQLite FTS5 table
+SQLITE_TRIGGER_SUFFIXES = ('_ai', '_au', '_ad')
+
+
+def get_search_index_fields(model):
+    """
+    Returns the `search_index_fields` of a model, the local text fields of its full-text index.
+    """
+    return tuple(getattr(model, 'search_index_fields', ()))
+
+
+def get_search_models(app_config=None):
+    """
+    Returns the concrete models declaring `search_index_fields`, of an app or of every app.
+    """
+    models = app_config.get_models() if app_config is not None else apps.get_models()
+    return [
+        model for model in models
+        if get_search_index_fields(model) and not model._meta.proxy and model._meta.managed
+    ]
+
+
+class BaseSearchBackend:
+    """
+    Builds the full-text index of a model and searches it, for one database vendor.
+    """
+
+    def supports(self, model):
+        return True
+
+    def index_exists(self, model, connection):
+        raise NotImplementedError('index_exists() must be implemented')
+
+    def create_index(self, model, connection):
+        raise NotImplementedError('create_index() must be implemented')
+
+    def drop_index(self, model, connection):
+        raise NotImplementedError('drop_index() must be implemented')
+
+    def search(self, queryset, words, prefix=False):
+        """
+        Filters the queryset on the words and annotates the relevance of each row as `search_rank`.
+        Args:
+            queryset (QuerySet): The queryset of a model supported by the backend.
+            words (list): The words to search, every word must match.
+            prefix (bool): If True, the words match as prefixes (typeahead).
+        Returns:
+            QuerySet: The matching rows, most relevant first.
+        """
+        raise NotImplementedError('search() must be implemented')
+
+    @staticmethod
+    def get_index_name(model):
+        return get_index_name(model, FullTextIndex, list(get_search_index_fields(model)))
+
+    @staticmethod
+    def get_constraints(model, connection):
+        with connection.cursor() as cursor:
+            return connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+    Searches a tsvector of the indexed fields, backed by a GIN expression index on that same tsvector, which
+    PostgreSQL keeps up to date on every write. The text search configuration is the `search_config` of the
+    model (SEARCH_CONFIG by default).
+    """
+
+    @staticmethod
+    def get_config(model):
+        return getattr(model, 'search_config', SEARCH_CONFIG)
+
+    def get_vector(self, model):
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector(*get_search_index_fields(model), config=self.get_config(model))
+
+    def get_index(self, model):
+        from django.contrib.postgres.indexes import GinIndex
+        return GinIndex(self.get_vector(model), name=self.get_index_name(model))
+
+    def index_exists(self, model, connection):
+        return self.get_index_name(model) in self.get_constraints(model, connection)
+
+    def create_index(self, model, connection):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.add_index(model, self.get_index(model))
+
+    def drop_index(self, model, connection):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.remove_index(model, self.get_index(model))
+
+    def search(self, queryset, words, prefix=False):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        config = self.get_config(queryset.model)
+        if prefix:
+            query = SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=config)
+        else:
+            query = SearchQuery(' '.join(words), search_type='plain', config=config)
+        vector = self.get_vector(queryset.model)
+        # The vector is aliased, not selected, and matches the indexed expression
+        return queryset.alias(search_vector=vector).filter(search_vector=query).annotate(
+            search_rank=SearchRank(vector, query)
+        ).order_by('-search_rank', 'pk')
+
+
+class MatchAgainst(Func):
+    """
+    MySQL MATCH (...) AGAINST (... IN BOOLEAN MODE), the relevance of a row, 0 when it does not match.
+    """
+    template = 'MATCH (%(expressions)s) AGAINST (%(query)s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *fields, query):
+        super().__init__(*[F(field) for field in fields])
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, query='%s', **extra_context)
+        return sql, (*params, self.query)
+
+
+class MySQLSearchBackend(BaseSearchBackend):
+    """
+    Searches a FULLTEXT index of the indexed fields in boolean mode.
+    """
+
+    def index_exists(self, model, connection):
+        return self.get_index_name(model) in self.get_constraints(model, connection)
+
+    def create_index(self, model, connection):
+        columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column)
+                            for field in get_search_index_fields(model))
+        with connection.schema_editor() as schema_editor:
+            schema_editor.execute(f'CREATE FULLTEXT INDEX {connection.ops.quote_name(self.get_index_name(model))} '
+                                  f'ON {connection.ops.quote_name(model._meta.db_table)} ({columns})')
+
+    def drop_index(self, model, connection):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.execute(f'DROP INDEX {connection.ops.quote_name(self.get_index_name(model))} '
+                                  f'ON {connection.ops.quote_name(model._meta.db_table)}')
+
+    def search(self, queryset, words, prefix=False):
+        query = ' '.join(f"+{word}{'*' if prefix else ''}" for word in words)
+        return queryset.annotate(
+            search_rank=MatchAgainst(*get_search_index_fields(queryset.model), query=query)
+        ).filter(search_rank__gt=0).order_by('-search_rank', 'pk')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Searches an FTS5 shadow table named `<table>_fts`, whose rowid is the primary key of the model.
+    Triggers keep it in sync with the table on every insert, update and delete, including the soft deletes
+    (rows with a deleted_at are removed from it) and the queryset updates which bypass save().
+    """
+
+    def supports(self, model):
+        return model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'SmallAutoField',
+                                                       'IntegerField', 'BigIntegerField')
+
+    @staticmethod
+    def get_table_name(model):
+        return f'{model._meta.db_table}_fts'
+
+    def index_exists(self, model, connection):
+        with connection.cursor() as cursor:
+            table_names = connection.introspection.table_names(cursor)
+        if self.get_table_name(model) not in table_names:
+            return False
+        # Migrations rebuilding the table of the model drop its triggers
+        triggers = [self.get_table_name(model) + suffix for suffix in SQLITE_TRIGGER_SUFFIXES]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+                           triggers)
+            return cursor.fetchone()[0] == len(triggers)
+
+    @staticmethod
+    def get_live_column(model, connection):
+        """
+        Returns the quoted deleted_at column of a soft delete model, None for the other models.
+        """
+        if 'deleted_at' not in {field.name for field in model._meta.local_fields}:
+            return None
+        return connection.ops.quote_name(model._meta.get_field('deleted_at').column)
+
+    def get_trigger_statements(self, model, connection):
+        quote = connection.ops.quote_name
+        name = self.get_table_name(model)
+        table, fts = quote(model._meta.db_table), quote(name)
+        pk = quote(model._meta.pk.column)
+        columns = [quote(model._meta.get_field(field).column) for field in get_search_index_fields(model)]
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        deleted_at = self.get_live_column(model, connection)
+        live = f'new.{deleted_at} IS NULL' if deleted_at else '1'
+        watched = ', '.join([*columns, pk, *([deleted_at] if deleted_at else [])])
+        return [
+            f'CREATE TRIGGER IF NOT EXISTS {quote(name + "_ai")} AFTER INSERT ON {table} WHEN {live} BEGIN '
+            f'INSERT INTO {fts}(rowid, {column_list}) VALUES (new.{pk}, {new_values}); END',
+            f'CREATE TRIGGER IF NOT EXISTS {quote(name + "_au")} AFTER UPDATE OF {watched} ON {table} BEGIN '
+            f'DELETE FROM {fts} WHERE rowid = old.{pk}; '
+            f'INSERT INTO {fts}(rowid, {column_list}) SELECT new.{pk}, {new_values} WHERE {live}; END',
+            f'CREATE TRIGGER IF NOT EXISTS {quote(name + "_ad")} AFTER DELETE ON {table} BEGIN '
+            f'DELETE FROM {fts} WHERE rowid = old.{pk}; END',
+        ]
+
+    def create_index(self, model, connection):
+        quote = connection.ops.quote_name
+        table, fts = quote(model._meta.db_table), quote(self.get_table_name(model))
+        columns = ', '.join(quote(model._meta.get_field(field).column) for field in get_search_index_fields(model))
+        deleted_at = self.get_live_column(model, connection)
+        live = f' WHERE {deleted_at} IS NULL' if deleted_at else ''
+        with connection.cursor() as cursor:
+            table_names = connection.introspection.table_names(cursor)
+            if self.get_table_name(model) in table_names:
+                # The triggers were dropped with a rebuilt table, the rows changed since then are reindexed
+                cursor.execute(f'DELETE FROM {fts}')
+            else:
+                cursor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, "
+                               f"tokenize='unicode61 remove_diacritics 2')")
+            cursor.execute(f'INSERT INTO {fts}(rowid, {columns}) '
+                           f'SELECT {quote(model._meta.pk.column)}, {columns} FROM {table}{live}')
+            for statement in self.get_trigger_statements(model, connection):
+                cursor.execute(statement)
+
+    def drop_index(self, model, connection):
+        quote = connection.ops.quote_name
+        name = self.get_table_name(model)
+        with connection.cursor() as cursor:
+            for suffix in SQLITE_TRIGGER_SUFFIXES:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {quote(name + suffix)}')
+            cursor.execute(f'DROP TABLE IF EXISTS {quote(name)}')
+
+    def search(self, queryset, words, prefix=False):
+        connection = connections[queryset.db]
+        quote = connection.ops.quote_name
+        fts = quote(self.get_table_name(queryset.model))
+        pk = f'{quote(queryset.model._meta.db_table)}.{quote(queryset.model._meta.pk.column)}'
+        # Quoted FTS5 strings, every one must match
+        match = ' '.join(f'"{word}"' + ('*' if prefix else '') for word in words)
+        return queryset.extra(
+            select={'search_rank': f'-bm25({fts})'},
+            tables=[self.get_table_name(queryset.model)],
+            where=[f'{fts} MATCH %s', f'{fts}.rowid = {pk}'],
+            params=[match],
+        ).order_by('-search_rank', 'pk')
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgreSQLSearchBackend(),
+    'mysql': MySQLSearchBackend(),
+    'sqlite': SQLiteSearchBackend(),
+}
+
+
+def get_search_backend(model, using):
+    """
+    Returns the search backend of a model on a database, or None when it has no full-text index there.
+    """
+    backend = SEARCH_BACKENDS.get(connections[using].vendor)
+    if backend is None or not get_search_index_fields(model) or not backend.supports(model):
+        return None
+    return backend
+
+
+def get_search_words(terms):
+    """
+    Splits the search terms into the words searched in the full-text index.
+    """
+    return [word for term in terms for word in SEARCH_WORD_RE.findall(term)]
+
+
+def full_text_search(queryset, fields, terms, prefix=False):
+    """
+    Searches the full-text index of the queryset model.
+    Args:
+        queryset (QuerySet): The queryset to filter.
+        fields (list): The searched fields, which must all be in the `search_index_fields` of the model.
+        terms (list): The search terms.
+        prefix (bool): If True, the terms match as prefixes (typeahead).
+    Returns:
+        QuerySet: The matching rows annotated with `search_rank`, most relevant first, or None when the model has
+        no full-text index for these fields on the queryset database.
+    """
+    backend = get_search_backend(queryset.model, queryset.db)
+    words = get_search_words(terms)
+    if backend is None or not words or not set(fields) <= set(get_search_index_fields(queryset.model)):
+        return None
+    return backend.search(queryset, words, prefix)
+
+
+def sync_search_indexes(models, using, rebuild=False):
+    """
+    Creates the missing full-text indexes of the models.
+    Args:
+        models (list): The models declaring `search_index_fields`.
+        using (str): The database alias.
+        rebuild (bool): If True, drop and recreate the existing indexes (after changing search_index_fields).
+    Returns:
+        list: The labels of the models whose index was created.
+    """
+    connection = connections[using]
+    created = []
+    for model in models:
+        backend = get_search_backend(model, using)
+        if backend is None or model._meta.db_table not in connection.introspection.table_names():
+            continue
+        if rebuild:
+            backend.drop_index(model, connection)
+        elif backend.index_exists(model, connection):
+            continue
+        backend.create_index(model, connection)
+        created.append(model._meta.label)
+    return created
+
+
+@receiver(post_migrate)
+def create_search_indexes(sender, using, **kwargs):
+    """
+    Creates the full-text indexes of the migrated app once its tables exist.
+    """
+    created = sync_search_indexes(get_search_models(sender), using)
+    if created:
+        LogInfo.info(f"Full-text indexes created for {', '.join(created)}")
@@ -0,0 +1,12 @@
+from django.dispatch import Signal
+
+# Sent with the model class as sender when rows are written in bulk, bypassing post_save/post_delete:
+# queryset updates, soft deletes, hard deletes and bulk creates. Receivers get the `using` database alias.
+rows_changed = Signal()
+
+
+def send_rows_changed(model, using='default'):
+    """
+    Notifies the receivers of rows_changed that rows of the model were written.
+    """
+    rows_changed.send(sender=model._meta.concrete_model, using=using)
@@ -1,7 +1,45 @@
-from datetime import datetime
+from collections import Counter, defaultdict
+from contextlib import nullcontext
 from django.db import transaction
+from django.db.models import Q, QuerySet, CASCADE, PROTECT, RESTRICT
+from django.db.models.deletion import ProtectedError, RestrictedError, get_candidate_relations_to_delete
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
 
-from common.logging import LogInfo
+from common.constants import (SOFT_DELETE_BATCH_SIZE, SOFT_DELETE_MAX_DEPTH, SOFT_DELETE_ATOMIC_CASCADE,
+                              SOFT_DELETE_ATOMIC_BATCH)
+from common.db.signals import send_rows_changed
+
+
+def is_soft_delete_model(model):
+    """
+    Helper function to check if a model supports soft deletion.
+    Args:
+        model: The model class to be checked.
+    Returns:
+        bool: True if the model has the soft delete fields, False otherwise.
+    """
+    try:
+        model._meta.get_field('deleted_at')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def get_delete_attributes(user, deleted_at=None):
+    """
+    Helper function to build the delete attributes for a soft deletion.
+    Args:
+        user: The user initiating the deletion.
+        deleted_at: The deletion timestamp (optional, defaults to now).
+    Returns:
+        dict: The field values marking a row as deleted.
+    """
+    return {
+        'is_deleted': True,
+        'deleted_at': deleted_at or timezone.now(),
+        'deleted_by': user,
+    }
 
 
 def set_delete_attributes(obj, user):
@@ -13,36 +51,238 @@ def set_delete_attributes(obj, user):
     Returns:
         None
     """
-    obj.is_deleted = True
-    obj.deleted_at = datetime.utcnow()
-    obj.deleted_by = user
+    for attribute, value in get_delete_attributes(user).items():
+        setattr(obj, attribute, value)
     obj.save()
 
 
-def manage_delete_dependency(collector, user=None):
+def soft_delete_queryset(queryset, attributes):
+    """
+    Marks every non-deleted row of the queryset as deleted with a single UPDATE.
+    Args:
+        queryset: The queryset to be marked as deleted.
+        attributes (dict): The delete attributes built by get_delete_attributes.
+    Returns:
+        int: The number of rows marked as deleted.
+    """
+    if not is_soft_delete_model(queryset.model):
+        return 0
+    # The plain update does not notify, so the rows are reported once whatever the queryset class
+    count = QuerySet.update(queryset.filter(deleted_at=None), **attributes)
+    if count:
+        send_rows_changed(queryset.model, queryset.db)
+    return count
+
+
+def soft_delete_pks(model, pks, attributes, using='default', batch_size=SOFT_DELETE_BATCH_SIZE):
+    """
+    Marks the rows with the given primary keys as deleted, one UPDATE per chunk of primary keys.
+    Args:
+        model: The model class of the rows.
+        pks (list): The primary keys of the rows to be marked as deleted.
+        attributes (dict): The delete attributes built by get_delete_attributes.
+        using (str): The database alias to write to.
+        batch_size (int): The maximum number of primary keys per UPDATE statement.
+    Returns:
+        int: The number of rows marked as deleted.
+    """
+    if not is_soft_delete_model(model):
+        return 0
+    count = 0
+    queryset = model._base_manager.using(using)
+    for start in range(0, len(pks), batch_size):
+        count += soft_delete_queryset(queryset.filter(pk__in=pks[start:start + batch_size]), attributes)
+    return count
+
+
+def manage_delete_dependency(collector, user=None, batch_size=SOFT_DELETE_BATCH_SIZE):
     """
     Main function to manage the deletion of objects and their dependencies.
     Args:
         collector: An object collector containing fast_deletes and data.
         user: The user initiating the deletion (optional).
+        batch_size (int): The maximum number of primary keys per UPDATE statement.
+    Returns:
+        tuple: The total number of rows marked as deleted and a dictionary with the count per model label.
+    Raises:
+        DatabaseError: If an UPDATE fails, the whole deletion is rolled back.
     Note:
         The collector parameter is assumed to have the following structure:
-        - collector.fast_deletes: A list of sets, each containing objects for fast deletion.
+        - collector.fast_deletes: A list of querysets (or lists of objects) for fast deletion.
         - collector.data: A dictionary where keys are model classes and values are lists of objects to be deleted.
     """
-    try:
-        with transaction.atomic():
-            # Fast deletes: Efficiently mark objects for deletion
-            # Fast deletes are usually used for cases where you can bypass certain Django signals and optimizations,
-            # making the deletion process faster.
-            for fast_deletes_set in collector.fast_deletes:
-                if len(fast_deletes_set):
-                    for delete_obj in fast_deletes_set:
-                        set_delete_attributes(delete_obj, user)
-
-            # Standard deletes: Mark objects for deletion that couldn't be handled with fast deletes
-            for model, data_objects in collector.data.items():
-                for obj in data_objects:
-                    set_delete_attributes(obj, user)
-    except Exception as e:
-        LogInfo.exception(e)
+    deleted_counter = Counter()
+    attributes = get_delete_attributes(user)
+    with transaction.atomic(using=collector.using):
+        # Fast deletes: Mark the whole queryset as deleted with a single UPDATE
+        # Fast deletes are usually used for cases where you can bypass certain Django signals and optimizations,
+        # making the deletion process faster.
+        for fast_deletes in collector.fast_deletes:
+            if isinstance(fast_deletes, QuerySet):
+                count = soft_delete_queryset(fast_deletes, attributes)
+                if count:
+                    deleted_counter[fast_deletes.model._meta.label] += count
+            else:
+                # One UPDATE per model and batch of primary keys, instead of one per object
+                pks_by_model = defaultdict(list)
+                for obj in fast_deletes:
+                    pks_by_model[type(obj)].append(obj.pk)
+                for model, pks in pks_by_model.items():
+                    count = soft_delete_pks(model, pks, attributes, collector.using, batch_size)
+                    if count:
+                        deleted_counter[model._meta.label] += count
+
+        # Standard deletes: Mark objects that couldn't be handled with fast deletes, in chunks of primary keys
+        for model, data_objects in collector.data.items():
+            pks = [obj.pk for obj in data_objects]
+            count = soft_delete_pks(model, pks, attributes, collector.using, batch_size)
+            if count:
+                deleted_counter[model._meta.label] += count
+    return sum(deleted_counter.values()), dict(deleted_counter)
+
+
+def iter_pk_batches(queryset, batch_size=SOFT_DELETE_BATCH_SIZE):
+    """
+    Yields the primary keys of the queryset in keyset ordered batches.
+    Args:
+        queryset: The queryset to read.
+        batch_size (int): The maximum number of primary keys per batch.
+    Yields:
+        list: The primary keys of each batch.
+    """
+    pk_queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = pk_queryset if last_pk is None else pk_queryset.filter(pk__gt=last_pk)
+        pks = list(page[:batch_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def get_cascade_relations(model):
+    """
+    Returns the foreign keys referencing a model with on_delete CASCADE, PROTECT or RESTRICT.
+    Returns:
+        list: Tuples of (foreign key field, concrete referencing model).
+    """
+    return [
+        (related.field, related.related_model._meta.concrete_model)
+        for related in get_candidate_relations_to_delete(model._meta)
+        if related.field.remote_field.on_delete in (CASCADE, PROTECT, RESTRICT)
+    ]
+
+
+def get_referencing_queryset(model, pks, field, related_model, using):
+    """
+    Returns the rows of related_model referencing the rows of model with the given primary keys through field.
+    """
+    if field.target_field.primary_key:
+        values = pks
+    else:
+        values = model._base_manager.using(using).filter(pk__in=pks).values(field.target_field.attname)
+    return related_model._base_manager.using(using).filter(**{f'{field.attname}__in': values})
+
+
+def check_restricted_relations(queryset, restricted, deleted_at):
+    """
+    Applies the RESTRICT rule of Django's Collector once a cascade is marked: a row referencing a deleted row
+    through a RESTRICT foreign key is only allowed if the cascade deleted it as well.
+    Args:
+        queryset: The queryset of the root objects of the cascade.
+        restricted (set): The (model, foreign key field, referencing model) RESTRICT relations met by the cascade.
+        deleted_at: The deletion timestamp of the cascade.
+    Raises:
+        RestrictedError: If a live row references a row deleted by the cascade through a RESTRICT foreign key.
+    """
+    using = queryset.db
+    for model, field, related_model in restricted:
+        deleted = Q(deleted_at=deleted_at)
+        if model is queryset.model:
+            # The roots of an asynchronous soft delete were marked beforehand, with the timestamp of the dispatch
+            deleted |= Q(pk__in=queryset.values('pk'))
+        parents = model._base_manager.using(using).filter(deleted).values(field.target_field.attname)
+        restricted_queryset = related_model._base_manager.using(using).filter(**{f'{field.attname}__in': parents})
+        if is_soft_delete_model(related_model):
+            restricted_queryset = restricted_queryset.filter(deleted_at=None)
+        if restricted_queryset.exists():
+            raise RestrictedError(
+                f"Cannot delete some instances of model '{model.__name__}' because they are referenced through "
+                f"restricted foreign keys: '{related_model.__name__}.{field.name}'",
+                restricted_queryset,
+            )
+
+
+def stream_soft_delete(queryset, user=None, batch_size=SOFT_DELETE_BATCH_SIZE, atomic=SOFT_DELETE_ATOMIC_CASCADE,
+                       max_depth=SOFT_DELETE_MAX_DEPTH, deleted_at=None, on_batch=None):
+    """
+    Soft deletes the queryset and its dependencies in bounded memory.
+    The roots are read in keyset ordered batches of primary keys, and the rows referencing every batch through an
+    on_delete=CASCADE foreign key are read the same way, depth first, with a plain `IN` list of the batch. The
+    rows of a batch are only marked once all of their dependencies are, and at most batch_size primary keys per
+    level are held in memory at any time.
+    Rows referenced through a PROTECT foreign key abort the cascade. Rows referenced through a RESTRICT foreign
+    key abort it unless the cascade deletes the referencing rows as well, as Django's Collector does. With
+    SOFT_DELETE_ATOMIC_BATCH the batches marked before the error stay committed.
+    Args:
+        queryset: The queryset of the root objects.
+        user: The user initiating the deletion (optional).
+        batch_size (int): The maximum number of primary keys read and marked per batch.
+        atomic (str): SOFT_DELETE_ATOMIC_CASCADE to run the whole cascade in one transaction,
+            SOFT_DELETE_ATOMIC_BATCH to commit every batch on its own.
+        max_depth (int): The maximum number of levels to follow, guards against self-referencing models.
+        deleted_at: The deletion timestamp (optional, defaults to now).
+        on_batch (callable): Called with the model label and the number of rows marked after every batch (optional).
+    Returns:
+        tuple: The total number of rows marked as deleted and a dictionary with the count per model label.
+    Raises:
+        ProtectedError: If a related row is referenced through a PROTECT foreign key.
+        RestrictedError: If a live row not deleted by the cascade is referenced through a RESTRICT foreign key.
+    """
+    if atomic not in (SOFT_DELETE_ATOMIC_CASCADE, SOFT_DELETE_ATOMIC_BATCH):
+        raise ValueError(f"Invalid soft delete transaction mode: {atomic}")
+
+    using = queryset.db
+    deleted_counter = Counter()
+    attributes = get_delete_attributes(user, deleted_at)
+    restricted = set()
+
+    def delete_batch(model, pks, depth):
+        if depth > max_depth:
+            raise ValueError(f"Soft delete cascade of {queryset.model._meta.label} is deeper than {max_depth} levels")
+        for field, related_model in get_cascade_relations(model):
+            on_delete = field.remote_field.on_delete
+            if on_delete is RESTRICT:
+                # Checked once the cascade is marked, the referencing rows may be deleted by another path
+                if is_soft_delete_model(model):
+                    restricted.add((model, field, related_model))
+                continue
+            related_queryset = get_referencing_queryset(model, pks, field, related_model, using)
+            if on_delete is PROTECT:
+                if related_queryset.exists():
+                    raise ProtectedError(
+                        f"Cannot delete some instances of model '{model.__name__}' because they are referenced "
+                        f"through a protected foreign key: '{related_model.__name__}.{field.name}'",
+                        related_queryset,
+                    )
+                continue
+            for related_pks in iter_pk_batches(related_queryset, batch_size):
+                delete_batch(related_model, related_pks, depth + 1)
+
+        if not is_soft_delete_model(model):
+            return
+        batch_block = transaction.atomic(using=using) if atomic == SOFT_DELETE_ATOMIC_BATCH else nullcontext()
+        with batch_block:
+            count = soft_delete_pks(model, pks, attributes, using, batch_size)
+        if count:
+            deleted_counter[model._meta.label] += count
+            if on_batch is not None:
+                on_batch(model._meta.label, count)
+
+    cascade_block = transaction.atomic(using=using) if atomic == SOFT_DELETE_ATOMIC_CASCADE else nullcontext()
+    with cascade_block:
+        for pks in iter_pk_batches(queryset, batch_size):
+            delete_batch(queryset.model, pks, 1)
+        check_restricted_relations(queryset, restricted, attributes['deleted_at'])
+    return sum(deleted_counter.values()), dict(deleted_counter)
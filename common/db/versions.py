@@ -0,0 +1,89 @@
+import time
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from common.constants import MODEL_VERSION_CACHE_ALIAS
+from common.db.signals import rows_changed
+
+# Concrete models whose writes bump their version counter, the other models have no cached response to invalidate
+versioned_models = set()
+
+
+def get_model_version_key(model):
+    return f'model-version:{model._meta.concrete_model._meta.label_lower}'
+
+
+def get_initial_version():
+    # Counters lost by the cache restart from the current time, never from a version already used
+    return int(time.time() * 1000)
+
+
+def register_versioned_models(models):
+    """
+    Registers models whose writes bump their version counter.
+    Args:
+        models (iterable): The model classes.
+    """
+    versioned_models.update(model._meta.concrete_model for model in models)
+
+
+def is_versioned_model(model):
+    return model._meta.concrete_model in versioned_models
+
+
+def get_model_versions(models, alias=MODEL_VERSION_CACHE_ALIAS):
+    """
+    Returns the current version counter of each model, with a single cache round trip when they all exist.
+    Args:
+        models (iterable): The model classes.
+        alias (str): The cache alias storing the counters.
+    Returns:
+        list: The versions, in the order of the models.
+    """
+    models = list(models)
+    # Registering on read covers the views resolving their model at request time
+    register_versioned_models(models)
+    cache = caches[alias]
+    keys = [get_model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, get_initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model, alias=MODEL_VERSION_CACHE_ALIAS):
+    """
+    Increments the version counter of a model, invalidating every response cached for its previous version.
+    """
+    cache = caches[alias]
+    key = get_model_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, get_initial_version(), timeout=None)
+
+
+def bump_model_version_on_commit(model, using='default'):
+    """
+    Bumps the version of the model once the current transaction commits, right away outside of one.
+    Bumping earlier would let a concurrent request cache the rows as they were before the commit under
+    the new version.
+    """
+    transaction.on_commit(lambda: bump_model_version(model), using=using)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_instance_model_version(sender, using='default', **kwargs):
+    if is_versioned_model(sender):
+        bump_model_version_on_commit(sender, using)
+
+
+@receiver(rows_changed)
+def bump_rows_model_version(sender, using='default', **kwargs):
+    if is_versioned_model(sender):
+        bump_model_version_on_commit(sender, using)
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from common.db.index_advisor import advise, get_scenarios, supports_analyze
+from common.rest_framework.generics import BaseListAPIView
+from common.rest_framework.viewsets import BaseViewSet
+from common.utils.urls import get_view_class, iter_url_patterns
+
+
+class Command(BaseCommand):
+    """
+    Explains the list querysets of the BaseViewSet and BaseListAPIView views of a URLconf, one per query filter,
+    ordering field and search, with the soft delete and vendor predicates every request adds. Reports the
+    sequential scans, sorts and missing composite indexes, with the index declarations serving them.
+    """
+    help = 'Suggests the indexes serving the filters, search and ordering fields of the list views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf', default=None,
+                            help='The URLconf to walk. Defaults to ROOT_URLCONF.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='The database to explain the queries on. Defaults to the "default" database.')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run the queries (EXPLAIN ANALYZE on PostgreSQL, ANALYZE on MariaDB) to detect '
+                                 'the sorts spilling to disk.')
+        parser.add_argument('--page-size', type=int, default=None,
+                            help="The LIMIT of the queries. Defaults to the page size of each view's pagination.")
+        parser.add_argument('--fail', action='store_true',
+                            help='Exit with an error when an index is suggested.')
+
+    def handle(self, *args, **options):
+        if options['database'] not in connections:
+            raise CommandError(f"Unknown database {options['database']}.")
+        if options['page_size'] is not None and options['page_size'] < 1:
+            raise CommandError('--page-size must be a positive integer.')
+        if options['analyze'] and not supports_analyze(options['database']):
+            vendor = connections[options['database']].display_name
+            self.stdout.write(self.style.WARNING(f'--analyze has no effect on {vendor}, the sorts spilling to disk '
+                                                 f'are not reported.'))
+
+        suggestion_count = 0
+        for view_class in self.get_view_classes(options['urlconf']):
+            label = f'{view_class.__module__}.{view_class.__name__}'
+            page_size = options['page_size'] or getattr(view_class.pagination_class, 'page_size', None) or 10
+            try:
+                scenarios = get_scenarios(view_class, options['database'], page_size)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'{label}: skipped, {e.__class__.__name__}: {e}'))
+                continue
+
+            suggestions = []
+            for scenario in scenarios:
+                try:
+                    findings, scenario_suggestions = advise(scenario, options['analyze'])
+                except DatabaseError as e:
+                    self.stdout.write(self.style.WARNING(f'{label} [{scenario.name}]: skipped, {e}'))
+                    continue
+                for kind, table, detail in findings:
+                    on_table = f' on {table}' if table else ''
+                    self.stdout.write(f'{label} [{scenario.name}]: {kind}{on_table}: {detail}')
+                suggestions.extend(scenario_suggestions)
+
+            for suggestion in dict.fromkeys(suggestions):
+                self.stdout.write(self.style.ERROR(f'{label}: suggested {suggestion}'))
+            suggestion_count += len(dict.fromkeys(suggestions))
+
+        if suggestion_count:
+            message = f'{suggestion_count} index(es) suggested.'
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No index suggested.'))
+
+    @staticmethod
+    def get_view_classes(urlconf):
+        """
+        Returns the BaseViewSet and BaseListAPIView subclasses routed by the URLconf, once each.
+        """
+        view_classes = []
+        for route, name, callback in iter_url_patterns(urlconf):
+            view_class = get_view_class(callback)
+            if (view_class is not None and issubclass(view_class, (BaseViewSet, BaseListAPIView))
+                    and view_class not in view_classes):
+                view_classes.append(view_class)
+        return view_classes
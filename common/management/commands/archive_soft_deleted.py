@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from common.constants import ARCHIVE_BATCH_SIZE, ARCHIVE_BATCH_DELAY
+from common.db.archive import archive_soft_deleted, get_archivable_models
+
+
+class Command(BaseCommand):
+    """
+    Moves soft deleted rows past their retention window to the archive tables and purges
+    the archived rows past their archive retention.
+    """
+    help = 'Archives and purges soft deleted rows past their retention window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.ModelName',
+                            help='Restricts the archival to the given models.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='The database to archive. Defaults to the "default" database.')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+                            help='The maximum number of rows moved per batch.')
+        parser.add_argument('--delay', type=float, default=ARCHIVE_BATCH_DELAY,
+                            help='The number of seconds to wait between batches.')
+        parser.add_argument('--no-purge', action='store_true',
+                            help='Only archive rows, keep the archive tables untouched.')
+
+    def handle(self, *args, **options):
+        archivable_models = get_archivable_models()
+        models = archivable_models
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            not_archivable = [model._meta.label for model in models if model not in archivable_models]
+            if not_archivable:
+                raise CommandError(f"{', '.join(not_archivable)} do not declare a soft_delete_retention.")
+            # Keep the referencing models first
+            models = [model for model in archivable_models if model in models]
+
+        results = archive_soft_deleted(models, using=options['database'], batch_size=options['batch_size'],
+                                       delay=options['delay'], purge=not options['no_purge'])
+        for label, counts in results.items():
+            self.stdout.write(f"{label}: {counts['archived']} archived, {counts['purged']} purged")
+        if not results:
+            self.stdout.write('No model declares a soft_delete_retention.')
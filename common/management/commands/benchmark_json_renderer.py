@@ -0,0 +1,108 @@
+import timeit
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from common.constants import SUCCESS, FAILED
+from common.messages import INVALID_REQUEST
+from common.rest_framework.messages import RETRIEVE_FAILURE_MESSAGE
+from common.rest_framework.parsers import FastJSONParser
+from common.rest_framework.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    """
+    Compares DRF's stdlib JSON renderer and parser with the fast ones on API envelopes shaped like the
+    list, retrieve and failure responses, after checking both produce the same documents.
+    """
+    help = 'Benchmarks the fast JSON renderer and parser against the DRF ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100,
+                            help='The number of objects of the list envelope.')
+        parser.add_argument('--number', type=int, default=200,
+                            help='The number of renders per measure.')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='The number of measures, the best one is reported.')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, the fast renderer falls back to the '
+                                                 'stdlib one.'))
+
+        envelopes = self.get_envelopes(options['rows'])
+        for name, data in envelopes.items():
+            stdlib_ret = JSONRenderer().render(data)
+            fast_ret = FastJSONRenderer().render(data)
+            if fast_ret != stdlib_ret:
+                self.stdout.write(self.style.ERROR(f'{name}: the fast renderer output differs from the DRF one.'))
+
+            self.report(f'{name} render ({len(stdlib_ret)} bytes)',
+                        lambda: JSONRenderer().render(data),
+                        lambda: FastJSONRenderer().render(data), options)
+            self.report(f'{name} parse',
+                        lambda: JSONParser().parse(BytesIO(stdlib_ret)),
+                        lambda: FastJSONParser().parse(BytesIO(stdlib_ret)), options)
+
+    def report(self, name, stdlib_function, fast_function, options):
+        stdlib_time = self.measure(stdlib_function, options)
+        fast_time = self.measure(fast_function, options)
+        self.stdout.write(f'{name}: stdlib {stdlib_time * 1000:.3f} ms, fast {fast_time * 1000:.3f} ms, '
+                          f'{stdlib_time / fast_time:.1f}x')
+
+    @staticmethod
+    def measure(function, options):
+        """
+        Returns the best time of a single call, in seconds.
+        """
+        return min(timeit.repeat(function, number=options['number'], repeat=options['repeat'])) / options['number']
+
+    @staticmethod
+    def get_envelopes(rows):
+        """
+        Builds envelopes shaped like the ones returned by APIViewResponseMixin, holding the types the
+        serializers produce: lazy messages, Decimals, aware datetimes, dates, UUIDs and nested objects.
+        """
+        now = timezone.now()
+        results = [
+            {
+                'id': index,
+                'uuid': uuid.uuid4(),
+                'name': f'Object {index}',
+                'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 2,
+                'price': Decimal('1234.50') + index,
+                'ratio': index / 7,
+                'is_active': index % 2 == 0,
+                'created_at': now - timedelta(minutes=index),
+                'updated_at': now,
+                'date_of_birth': (now - timedelta(days=index)).date(),
+                'created_by': {'id': 1, 'name': 'Admin', 'email': 'admin@example.com'},
+                'tags': [{'id': tag, 'name': f'Tag {tag}'} for tag in range(3)],
+            }
+            for index in range(rows)
+        ]
+        return {
+            'list': {
+                'status': SUCCESS,
+                'status_code': 200,
+                'data': {'count': rows, 'next': None, 'previous': None, 'results': results},
+            },
+            'retrieve': {
+                'status': SUCCESS,
+                'status_code': 200,
+                'data': results[0] if results else {},
+            },
+            'failure': {
+                'status': FAILED,
+                'status_code': 400,
+                'data': {
+                    'message': INVALID_REQUEST,
+                    'errors': {'name': [RETRIEVE_FAILURE_MESSAGE], 'non_field_errors': [INVALID_REQUEST]},
+                },
+            },
+        }
@@ -0,0 +1,78 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from common.db.indexes import get_base_model_indexes
+from common.db.models import SoftDeleteModel, TimestampModel
+
+
+class Command(BaseCommand):
+    """
+    Reports the concrete SoftDeleteModel and TimestampModel subclasses whose generated indexes
+    are missing from the database.
+    """
+    help = 'Reports the soft delete and timestamp models missing their generated indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='The database to inspect. Defaults to the "default" database.')
+        parser.add_argument('--fail', action='store_true',
+                            help='Exit with an error when an index is missing.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        missing_count = 0
+
+        with connection.cursor() as cursor:
+            table_names = set(connection.introspection.table_names(cursor))
+            for model in apps.get_models():
+                if not issubclass(model, (SoftDeleteModel, TimestampModel)):
+                    continue
+                expected_indexes = get_base_model_indexes(model)
+                if not expected_indexes:
+                    continue
+
+                label = model._meta.label
+                table_name = model._meta.db_table
+                if table_name not in table_names:
+                    missing_count += len(expected_indexes)
+                    self.stdout.write(self.style.WARNING(f'{label}: table {table_name} does not exist, '
+                                                         f'run migrate first.'))
+                    continue
+
+                constraints = connection.introspection.get_constraints(cursor, table_name)
+                for index in expected_indexes:
+                    columns = [model._meta.get_field(field_name).column for field_name, _ in index.fields_orders]
+                    if index.condition is not None and not connection.features.supports_partial_indexes:
+                        self.stdout.write(f'{label}: {index.name} skipped, {connection.display_name} does not '
+                                          f'support partial indexes.')
+                        continue
+                    if self.index_exists(index.name, columns, constraints):
+                        continue
+                    missing_count += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'{label}: missing {index.__class__.__name__} {index.name} on ({", ".join(columns)})'
+                    ))
+
+        if missing_count:
+            message = f'{missing_count} generated index(es) missing, run makemigrations and migrate.'
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('All generated indexes exist.'))
+
+    @staticmethod
+    def index_exists(name, columns, constraints):
+        """
+        Checks if an index exists, by name or by an index on the same columns.
+        Args:
+            name (str): The generated index name.
+            columns (list): The indexed column names.
+            constraints (dict): The table constraints returned by the database introspection.
+        Returns:
+            bool: True if the index exists, False otherwise.
+        """
+        if name in constraints:
+            return True
+        return any(constraint['index'] and constraint['columns'] == columns for constraint in constraints.values())
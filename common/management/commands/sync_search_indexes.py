@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from common.db.search import get_search_models, sync_search_indexes
+
+
+class Command(BaseCommand):
+    """
+    Creates the full-text indexes of the models declaring `search_index_fields`. They are created after every
+    migrate, this command rebuilds them after a change of `search_index_fields`.
+    """
+    help = 'Creates or rebuilds the full-text search indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.ModelName',
+                            help='Restricts the indexes to the given models.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='The database to index. Defaults to the "default" database.')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop and recreate the existing indexes.')
+
+    def handle(self, *args, **options):
+        models = get_search_models()
+        if options['models']:
+            try:
+                selected = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+            not_searchable = [model._meta.label for model in selected if model not in models]
+            if not_searchable:
+                raise CommandError(f"{', '.join(not_searchable)} do not declare search_index_fields.")
+            models = selected
+
+        created = sync_search_indexes(models, options['database'], rebuild=options['rebuild'])
+        for label in created:
+            self.stdout.write(f'{label}: full-text index created')
+        if not created:
+            self.stdout.write('All full-text indexes exist.')
@@ -0,0 +1,227 @@
+import zlib
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from common.constants import COMPRESSED_MEDIA_TYPES, COMPRESSION_LEVELS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        # wbits=31 writes the gzip header, with a zero mtime so equal bodies compress to equal bytes
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdCompressor:
+    encoding = 'zstd'
+
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+def get_available_compressors():
+    """
+    Returns the compressor classes whose library is installed, by encoding, in order of preference.
+    """
+    compressors = {}
+    if brotli is not None:
+        compressors[BrotliCompressor.encoding] = BrotliCompressor
+    if zstandard is not None:
+        compressors[ZstdCompressor.encoding] = ZstdCompressor
+    compressors[GzipCompressor.encoding] = GzipCompressor
+    return compressors
+
+
+def parse_accept_encoding(header):
+    """
+    Parses an Accept-Encoding header.
+    Returns:
+        dict: The quality value of each listed encoding (lowercase), '*' included.
+    """
+    qualities = {}
+    for item in header.split(','):
+        encoding, *params = [part.strip() for part in item.split(';')]
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[encoding.lower()] = quality
+    return qualities
+
+
+class CompressionMiddleware:
+    """
+    Middleware compressing the responses with the best encoding accepted by the client, brotli or zstd when
+    their library is installed, gzip otherwise.
+    Bodies smaller than COMPRESSION_MIN_SIZE, already compressed media types and responses marked no-transform
+    are sent as is. Streaming responses are compressed chunk by chunk, each chunk being flushed so clients
+    receive the export rows as they are produced. Under ASGI the async streaming responses are compressed
+    with async iteration, never consumed in a thread.
+    The COMPRESSION_LEVELS setting tunes the level per media type, e.g. {'text/csv': {'gzip': 9, 'br': 6}},
+    the media types missing from it use the defaults of common.constants.COMPRESSION_LEVELS.
+    BREACH: the length of a compressed body reflecting both a secret and attacker controlled input leaks the
+    secret. The responses rendering the CSRF token (admin and browsable API forms) are never compressed, and the
+    API authenticates with the Authorization header which no response reflects. Views returning a secret in
+    their body (e.g. tokens) must mark their response with `Cache-Control: no-transform`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.compressors = get_available_compressors()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not self.is_compressible(response):
+            return response
+        # The body holds the CSRF token, compressing it would expose the token to BREACH
+        if request.META.get('CSRF_COOKIE_USED'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        # The response varies on Accept-Encoding whether or not this request gets it compressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor_class = self.select_compressor(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if compressor_class is None:
+            return response
+        level = self.get_level(response, compressor_class.encoding)
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async_sequence(response.streaming_content,
+                                                                          compressor_class(level))
+            else:
+                response.streaming_content = self.compress_sequence(response.streaming_content,
+                                                                    compressor_class(level))
+            del response.headers['Content-Length']
+        else:
+            compressor = compressor_class(level)
+            content = compressor.compress(response.content) + compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # The compressed body is not byte for byte equal to the one the strong ETag was computed for
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor_class.encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if 'no-transform' in response.get('Cache-Control', '').lower():
+            return False
+        # SVG images are XML text
+        return content_type == 'image/svg+xml' or not content_type.startswith(COMPRESSED_MEDIA_TYPES)
+
+    def select_compressor(self, accept_encoding):
+        """
+        Returns the compressor class of the encoding with the highest quality value in the Accept-Encoding
+        header, ties being broken by the order of preference of the available compressors.
+        Returns:
+            The compressor class, or None when the client accepts none of the available encodings.
+        """
+        qualities = parse_accept_encoding(accept_encoding)
+        default_quality = qualities.get('*', 0.0)
+        best_class, best_quality = None, 0.0
+        for encoding, compressor_class in self.compressors.items():
+            quality = qualities.get(encoding, default_quality)
+            if quality > best_quality:
+                best_class, best_quality = compressor_class, quality
+        return best_class
+
+    @staticmethod
+    def get_level(response, encoding):
+        """
+        Returns the compression level of an encoding for the media type of the response.
+        """
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        levels = getattr(settings, 'COMPRESSION_LEVELS', {})
+        for media_type in (content_type, content_type.split('/')[0] + '/*'):
+            if encoding in levels.get(media_type, {}):
+                return levels[media_type][encoding]
+        return COMPRESSION_LEVELS[encoding]
+
+    @staticmethod
+    def compress_sequence(sequence, compressor):
+        for chunk in sequence:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def compress_async_sequence(sequence, compressor):
+        async for chunk in sequence:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
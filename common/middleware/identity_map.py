@@ -0,0 +1,27 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from common.db.identity_map import identity_map
+
+
+class IdentityMapMiddleware:
+    """
+    Middleware giving every request its own identity map: the rows loaded by get_object_or_404, memoized_get and
+    foreign key access are fetched once per request, until rows of their tables are written.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with identity_map():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_map():
+            return await self.get_response(request)
@@ -0,0 +1,50 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from common.db.queries import collect_queries, get_query_budget_mode, report_query_budget
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware counting the queries of every request and flagging repeated statements (N+1 queries).
+    Views built on BaseViewSet or BaseAPIView check their own per-action budgets, other requests are checked
+    against the QUERY_BUDGET_REQUEST_LIMIT setting. Violations are logged or raised according to the
+    QUERY_BUDGET_MODE setting, and in DEBUG mode the query count is sent in the X-Query-Count header.
+    Under ASGI the queries run by the async ORM and sync_to_async threads of the request are counted as well.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = get_query_budget_mode()
+        if not mode:
+            return self.get_response(request)
+
+        with collect_queries() as collector:
+            response = self.get_response(request)
+        return self.process_response(request, response, collector, mode)
+
+    async def __acall__(self, request):
+        mode = get_query_budget_mode()
+        if not mode:
+            return await self.get_response(request)
+
+        with collect_queries() as collector:
+            response = await self.get_response(request)
+        return self.process_response(request, response, collector, mode)
+
+    @staticmethod
+    def process_response(request, response, collector, mode):
+        if not getattr(request, 'query_budget_checked', False):
+            report_query_budget(collector, f'{request.method} {request.path}',
+                                budget=getattr(settings, 'QUERY_BUDGET_REQUEST_LIMIT', None), mode=mode)
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(collector.count)
+        return response
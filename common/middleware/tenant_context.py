@@ -0,0 +1,32 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from common.services.tenant_context import get_user_vendor, vendor_context
+
+
+class TenantContextMiddleware:
+    """
+    Middleware scoping every request to the vendor of its session user (see get_user_vendor) and restoring the
+    context at its end, so the vendor of a request never leaks into the next request served by the same thread.
+    It must come after AuthenticationMiddleware. The DRF views scope the request again once DRF authenticated
+    the user (e.g. JWT). Under ASGI each request runs in its own asyncio task and copy of the context, sync views
+    included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with vendor_context(get_user_vendor(getattr(request, 'user', None))):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Loading the session user queries the database
+        vendor = await sync_to_async(get_user_vendor)(getattr(request, 'user', None))
+        with vendor_context(vendor):
+            return await self.get_response(request)
@@ -0,0 +1,169 @@
+from django.db.models import Q
+from rest_framework.serializers import ModelSerializer, ValidationError, as_serializer_error
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
+
+
+def bulk_create_compatible(create):
+    """
+    Decorator marking the create() of a model serializer which saves the validated data like
+    ModelSerializer.create() does, apart from the created_by user bulk_create stamps as well.
+    """
+    create.bulk_create_compatible = True
+    return create
+
+
+def is_bulk_create_compatible(serializer):
+    """
+    Checks if the objects of a serializer can be bulk inserted: its create() is the ModelSerializer one or is
+    marked with bulk_create_compatible, so the inserted rows are the ones it would create one by one.
+    """
+    create = type(serializer).create
+    return create is ModelSerializer.create or getattr(create, 'bulk_create_compatible', False)
+
+
+class UniqueConstraintCheck:
+    """
+    A unique field (or unique together fields) of a serializer, checked for a whole batch with one query.
+    Attributes:
+        fields (tuple): The source names of the fields.
+        queryset (QuerySet): The queryset the values must be unique in.
+        message (str): The error message of the validator it replaces.
+        error_field (str): The field the error is reported on, non_field_errors for unique together fields.
+    """
+
+    def __init__(self, fields, queryset, message, error_field):
+        self.fields = fields
+        self.queryset = queryset
+        self.message = message
+        self.error_field = error_field
+
+    def get_value(self, validated_data, instance=None):
+        values = []
+        for field in self.fields:
+            if field in validated_data:
+                value = validated_data[field]
+            elif instance is not None:
+                value = getattr(instance, field)
+            else:
+                return None
+            if value is None:
+                return None
+            values.append(getattr(value, 'pk', value))
+        return tuple(values)
+
+    def get_existing(self, values):
+        """
+        Returns the primary key of the rows already holding each of the values, with a single query.
+        """
+        if len(self.fields) == 1:
+            condition = Q(**{f'{self.fields[0]}__in': [value[0] for value in values]})
+        else:
+            condition = Q()
+            for value in values:
+                condition |= Q(**dict(zip(self.fields, value)))
+        existing = {}
+        for pk, *row in self.queryset.filter(condition).values_list('pk', *self.fields):
+            existing.setdefault(tuple(row), set()).add(pk)
+        return existing
+
+    def check(self, items, errors):
+        """
+        Adds an error to the items whose values already exist, in the database or earlier in the batch.
+        Args:
+            items (list): Tuples of (index, validated data, instance or None) of the valid items.
+            errors (list): The errors of every item, updated in place.
+        """
+        values = {index: self.get_value(validated_data, instance) for index, validated_data, instance in items}
+        instances = {index: instance for index, validated_data, instance in items}
+        present = [value for value in values.values() if value is not None]
+        if not present:
+            return
+        existing = self.get_existing(present)
+        seen = set()
+        for index, value in values.items():
+            if value is None:
+                continue
+            instance = instances[index]
+            # The row being updated does not conflict with itself
+            conflicts = existing.get(value, set()) - ({instance.pk} if instance is not None else set())
+            if conflicts or value in seen:
+                errors[index].setdefault(self.error_field, []).append(self.message)
+            seen.add(value)
+
+
+def pop_unique_validators(serializer):
+    """
+    Removes the unique validators of a model serializer, returning the batched checks replacing them.
+    Args:
+        serializer (ModelSerializer): The item serializer, reused for every item of the batch.
+    Returns:
+        list: The UniqueConstraintCheck instances.
+    """
+    checks = []
+    for field in serializer.fields.values():
+        validators = []
+        for validator in field.validators:
+            if isinstance(validator, UniqueValidator) and not field.read_only:
+                checks.append(UniqueConstraintCheck((field.source,), validator.queryset, validator.message,
+                                                    field.field_name))
+            else:
+                validators.append(validator)
+        field.validators = validators
+
+    validators = []
+    for validator in serializer.validators:
+        if isinstance(validator, UniqueTogetherValidator):
+            message = validator.message.format(field_names=', '.join(validator.fields))
+            sources = tuple(serializer.fields[name].source for name in validator.fields)
+            checks.append(UniqueConstraintCheck(sources, validator.queryset, message, 'non_field_errors'))
+        else:
+            validators.append(validator)
+    serializer.validators = validators
+    return checks
+
+
+def validate_items(serializer, items, instances=None):
+    """
+    Validates every item with the same serializer instance, then runs the batched unique checks.
+    Args:
+        serializer (ModelSerializer): The item serializer.
+        items (list): The item payloads.
+        instances (list): The objects updated by each item, None when creating.
+    Returns:
+        tuple: The validated data of each item and the errors of each item (empty dicts for valid items).
+    """
+    checks = pop_unique_validators(serializer)
+    validated, errors = [], []
+    for index, item in enumerate(items):
+        serializer.instance = instances[index] if instances else None
+        serializer.initial_data = item
+        try:
+            validated.append(serializer.run_validation(item))
+            errors.append({})
+        except ValidationError as exc:
+            validated.append(None)
+            errors.append(dict(as_serializer_error(exc)))
+    serializer.instance = None
+
+    valid_items = [
+        (index, validated_data, instances[index] if instances else None)
+        for index, validated_data in enumerate(validated) if validated_data is not None
+    ]
+    for check in checks:
+        check.check(valid_items, errors)
+    return validated, errors
+
+
+def split_many_to_many(model, validated_data):
+    """
+    Pops the to-many relations of the validated data, which are set once the objects are saved.
+    Returns:
+        dict: The to-many values by field name.
+    """
+    info = model_meta.get_field_info(model)
+    return {
+        field_name: validated_data.pop(field_name)
+        for field_name, relation in info.relations.items()
+        if relation.to_many and field_name in validated_data
+    }
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import threading
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.db import connections
+
+from common.constants import (COUNT_CACHE_TIMEOUT, COUNT_CAP, COUNT_ESTIMATE_EXACT_THRESHOLD,
+                              COUNT_THREAD_POOL_SIZE)
+from common.logging import LogInfo
+from common.services.tenant_context import submit_with_context
+
+# The threads running the concurrent counts of every request, and their free slots so a count never waits in
+# the queue of the pool behind the counts of other requests
+_count_executor = ThreadPoolExecutor(max_workers=COUNT_THREAD_POOL_SIZE, thread_name_prefix='pagination-count')
+_count_slots = threading.BoundedSemaphore(COUNT_THREAD_POOL_SIZE)
+
+
+class BaseCountStrategy:
+    """
+    Base class for the strategies counting the rows of a paginated queryset.
+    Attributes:
+        exact (bool): True if the returned count is exact, the page number is then validated against it.
+        concurrent (bool): True if the count can run in a thread while the page is fetched.
+    """
+    exact = True
+    concurrent = False
+
+    def count(self, queryset):
+        """
+        Returns the number of rows of the queryset, or None when it is not known.
+        """
+        raise NotImplementedError("Count Method should be Implemented")
+
+    async def acount(self, queryset):
+        """
+        Async version of count(), for the async views. Runs count() in a thread unless overridden.
+        """
+        return await sync_to_async(self.count)(queryset)
+
+    def get_display_count(self, count):
+        """
+        Returns the value of the `count` key of the paginated response.
+        """
+        return count
+
+
+class ExactCount(BaseCountStrategy):
+    """
+    Runs a full COUNT(*) of the queryset.
+    With concurrent=True the count runs in a separate thread (and database connection) while the page is
+    fetched. It falls back to a sequential count inside a transaction, whose rows another connection cannot see.
+    """
+
+    def __init__(self, concurrent=False):
+        self.concurrent = concurrent
+
+    def count(self, queryset):
+        return queryset.count()
+
+    async def acount(self, queryset):
+        return await queryset.acount()
+
+
+class CachedCount(BaseCountStrategy):
+    """
+    Caches the exact count of the queryset for `timeout` seconds.
+    The cache key is derived from the model and the SQL of the filtered queryset, so every distinct filter set
+    (including search and vendor scoping) has its own entry, whatever the order of the query params.
+    """
+
+    def __init__(self, timeout=COUNT_CACHE_TIMEOUT):
+        self.timeout = timeout
+
+    def get_cache_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}:{params!r}'.encode('utf-8')).hexdigest()
+        return f'pagination-count:{queryset.model._meta.label_lower}:{digest}'
+
+    def count(self, queryset):
+        key = self.get_cache_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.timeout)
+        return count
+
+
+class EstimatedCount(BaseCountStrategy):
+    """
+    Returns the row estimate of the PostgreSQL planner instead of counting.
+    Unfiltered querysets read `reltuples` from pg_class, filtered ones the row estimate of EXPLAIN.
+    Estimates below `exact_threshold` are replaced by an exact count, as are estimates on other databases.
+    """
+    exact = False
+
+    def __init__(self, exact_threshold=COUNT_ESTIMATE_EXACT_THRESHOLD):
+        self.exact_threshold = exact_threshold
+
+    def estimate(self, queryset):
+        """
+        Returns the planner estimate of the number of rows of the queryset, or None when it is not available.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            if not queryset.query.where and not queryset.query.distinct:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+                # reltuples is -1 (or 0) until the table has been vacuumed or analyzed
+                return row[0] if row and row[0] > 0 else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+
+    def count(self, queryset):
+        try:
+            estimate = self.estimate(queryset)
+        except Exception as e:
+            LogInfo.exception(e)
+            estimate = None
+        if estimate is None or estimate < self.exact_threshold:
+            return queryset.count()
+        return estimate
+
+
+class CappedCount(BaseCountStrategy):
+    """
+    Counts at most `cap` rows, larger results are reported as "<cap>+".
+    """
+    exact = False
+
+    def __init__(self, cap=COUNT_CAP):
+        self.cap = cap
+
+    def count(self, queryset):
+        count = queryset.order_by()[:self.cap + 1].count()
+        return count if count <= self.cap else None
+
+    async def acount(self, queryset):
+        count = await queryset.order_by()[:self.cap + 1].acount()
+        return count if count <= self.cap else None
+
+    def get_display_count(self, count):
+        return f'{self.cap}+' if count is None else count
+
+
+class OmittedCount(BaseCountStrategy):
+    """
+    Skips the count altogether, `count` and `total_pages` are returned as null.
+    """
+    exact = False
+
+    def count(self, queryset):
+        return None
+
+    async def acount(self, queryset):
+        return None
+
+
+def count_in_thread(strategy, queryset):
+    """
+    Starts the count of the queryset in a thread of the shared count pool, using its own database connection.
+    Args:
+        strategy (BaseCountStrategy): The count strategy.
+        queryset (QuerySet): The queryset to count.
+    Returns:
+        Future: The future of the count, or None when every thread of the pool is busy and the caller should
+            count sequentially.
+    """
+    if not _count_slots.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            return strategy.count(queryset)
+        finally:
+            connections[queryset.db].close()
+            _count_slots.release()
+
+    try:
+        return submit_with_context(_count_executor, run)
+    except RuntimeError:
+        # The pool is shut down at interpreter exit
+        _count_slots.release()
+        return None
@@ -48,11 +48,14 @@ def custom_exception_handler(exc, context):
         # Extract information from the original response
         status_code = response.status_code
         # Use gettext_lazy for localization and translation
-        message = response.data.get('detail', INTERNAL_SERVER_ERROR_MESSAGE)
+        message = INTERNAL_SERVER_ERROR_MESSAGE
+        if isinstance(response.data, dict):
+            message = response.data.get('detail', message)
         if status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
             LogInfo.exception(exc)
 
         # Utilize gettext_lazy for localization and translation in the response
+        # The response is rendered by the renderer negotiated for the request (JSON or MessagePack)
         return APIViewResponseMixin.failure_response(status_code=status_code, message=message, data=response.data)
 
     LogInfo.exception(exc)
@@ -0,0 +1,105 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import FileField, ForeignKey, OneToOneField
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField, RelatedField, ManyRelatedField
+
+
+class ValuesSerializationPlan:
+    """
+    Compiled form of a read-only serializer, building its output straight from `values()` rows.
+    Attributes:
+        columns (list): The `values()` lookups fetched from the database.
+        entries (list): Tuples of (output key, values() key, serializer field, wraps the value in a PKOnlyObject).
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.columns = list(dict.fromkeys(entry[1] for entry in entries))
+
+    def get_queryset(self, queryset, extra_columns=()):
+        """
+        Returns the values() projection of the queryset, prefetches are dropped as no object is built.
+        Args:
+            queryset (QuerySet): The filtered queryset.
+            extra_columns (iterable): Additional lookups to fetch, e.g. the ordering used by cursor pagination.
+        Returns:
+            QuerySet: The queryset yielding dicts.
+        """
+        columns = list(dict.fromkeys([*self.columns, *extra_columns]))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def to_representation(self, row):
+        """
+        Builds the serializer output of a single values() row, as Serializer.to_representation does.
+        """
+        ret = {}
+        for key, column, field, pk_only in self.entries:
+            value = row[column]
+            if value is None:
+                ret[key] = None
+            else:
+                ret[key] = field.to_representation(PKOnlyObject(pk=value) if pk_only else value)
+        return ret
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+def get_model_field_path(model, source_attrs):
+    """
+    Resolves a serializer source on a model, following only non-nullable forward foreign keys so that
+    every intermediate object exists, as the regular serializer expects.
+    Returns:
+        Field: The model field at the end of the path, or None if the source cannot be fetched by values().
+    """
+    for index, attr in enumerate(source_attrs):
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        if index == len(source_attrs) - 1:
+            return model_field
+        if not isinstance(model_field, (ForeignKey, OneToOneField)) or model_field.null:
+            return None
+        model = model_field.related_model
+    return None
+
+
+def compile_serializer(serializer):
+    """
+    Compiles a model serializer made only of plain fields into a ValuesSerializationPlan.
+    Args:
+        serializer (ModelSerializer): The serializer instance used for the list action.
+    Returns:
+        ValuesSerializationPlan: The compiled plan, or None when the serializer has fields needing model
+        instances (method fields, nested serializers, many related fields, file fields, properties, ...).
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None or type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+
+    entries = []
+    for field in serializer._readable_fields:
+        if isinstance(field, (serializers.BaseSerializer, ManyRelatedField, serializers.SerializerMethodField)):
+            return None
+        if field.source == '*' or not field.source_attrs:
+            return None
+        pk_only = isinstance(field, PrimaryKeyRelatedField)
+        if isinstance(field, RelatedField) and not pk_only:
+            return None
+        if not pk_only and type(field).get_attribute is not serializers.Field.get_attribute:
+            return None
+
+        model_field = get_model_field_path(model, field.source_attrs)
+        if model_field is None or isinstance(model_field, FileField):
+            return None
+        # A relation is fetched as its raw key, by a primary key field or through its attname, e.g. 'parent_id'
+        if model_field.is_relation and not pk_only and field.source_attrs[-1] != model_field.attname:
+            return None
+        if pk_only and not model_field.is_relation:
+            return None
+        entries.append((field.field_name, LOOKUP_SEP.join(field.source_attrs), field, pk_only))
+    return ValuesSerializationPlan(entries)
@@ -0,0 +1,87 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def parse_fieldset(values):
+    """
+    Parses comma separated, dotted field paths into a tree.
+    Example: ['id,brand.name,brand.id'] -> {'id': {}, 'brand': {'name': {}, 'id': {}}}
+    Args:
+        values (list): The values of the query param.
+    Returns:
+        dict: The tree of field names, leaves map to empty dicts.
+    """
+    tree = {}
+    for value in values:
+        for path in value.split(','):
+            path = path.strip()
+            if not path:
+                continue
+            node = tree
+            for name in path.split('.'):
+                node = node.setdefault(name, {})
+    return tree
+
+
+def get_nested_serializer(field):
+    """
+    Returns the serializer holding the fields of a nested serializer field, or None for other fields.
+    """
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.Serializer):
+        return field
+    return None
+
+
+def prune_fields(serializer, tree, exclude=False, prefix=''):
+    """
+    Removes fields from a serializer instance (and its nested serializers) according to a fieldset tree.
+    With exclude=False only the fields of the tree are kept, a field without sub-paths keeping all of its
+    nested fields. With exclude=True the leaves of the tree are removed.
+    Args:
+        serializer (Serializer): The serializer instance, its bound fields are pruned in place.
+        tree (dict): The fieldset tree built by parse_fieldset.
+        exclude (bool): True to remove the fields of the tree instead of keeping them.
+        prefix (str): The dotted path of the serializer, used in the errors.
+    Returns:
+        list: The dotted paths of the tree which are not fields of the serializer.
+    """
+    fields = serializer.fields
+    unknown = []
+    for name, subtree in tree.items():
+        path = f'{prefix}{name}'
+        if name not in fields:
+            unknown.append(path)
+            continue
+        if subtree:
+            nested = get_nested_serializer(fields[name])
+            if nested is None:
+                unknown.extend(f'{path}.{child}' for child in subtree)
+                continue
+            unknown.extend(prune_fields(nested, subtree, exclude, prefix=f'{path}.'))
+        elif exclude:
+            fields.pop(name)
+    if not exclude:
+        for name in list(fields):
+            if name not in tree:
+                fields.pop(name)
+    return unknown
+
+
+def get_deferrable_fields(serializer, tree, model):
+    """
+    Returns the model fields read by the top-level fields of an exclude tree, before they are pruned.
+    """
+    deferrable = []
+    for name, subtree in tree.items():
+        field = serializer.fields[name] if name in serializer.fields else None
+        if subtree or field is None or len(field.source_attrs) != 1:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            continue
+        if model_field.concrete and not model_field.is_relation and not model_field.primary_key:
+            deferrable.append(model_field.name)
+    return deferrable
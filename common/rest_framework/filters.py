@@ -1,29 +1,129 @@
 import datetime
+from types import MappingProxyType
 from rest_framework import filters
 from rest_framework.compat import coreapi
 from rest_framework import status
-from django.core.exceptions import FieldError, ValidationError
+from django.apps import apps
+from django.core.exceptions import FieldError, ImproperlyConfigured, ValidationError
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql import Query
+from common.constants import ARRAY_FILTER_MAX_ITEMS, SEARCH_MODE_PREFIX
+from common.db.lookups import ArrayIn
+from common.db.search import full_text_search
 from common.rest_framework.exceptions import InvalidFilterValue
 from common.utils.conversions import string_to_bool, int_or_zero
 
 
+class QueryFilterPlan:
+    """
+    Immutable plan of the query filters of a view, compiled once when the view class is created.
+    Cleaning the query params of a request only reads the plan, so it is safe with threaded workers.
+    Attributes:
+        filters (MappingProxyType): The filters by query param name.
+        model: The model filtered by the view, or None.
+    """
+    __slots__ = ('filters', 'model')
+
+    def __init__(self, query_filters, model=None):
+        """
+        Compiles the query filters.
+        Args:
+            query_filters (list): The BaseFilter instances of the view.
+            model: The model filtered by the view (optional), its lookups are validated when given. The lookups
+                of the views created while the models load are validated by the common.E001 system check.
+        Raises:
+            ImproperlyConfigured: If a filter is not a BaseFilter, a name is declared twice, or a lookup does
+                not resolve on the model.
+        """
+        compiled = {}
+        for query_filter in query_filters or ():
+            if not isinstance(query_filter, BaseFilter):
+                raise ImproperlyConfigured(f"{query_filter!r} is not a BaseFilter instance.")
+            if query_filter.name in compiled:
+                raise ImproperlyConfigured(f"The query filter {query_filter.name} is declared twice.")
+            compiled[query_filter.name] = query_filter
+        object.__setattr__(self, 'filters', MappingProxyType(compiled))
+        object.__setattr__(self, 'model', model)
+        # Relations to models not loaded yet can not be resolved
+        if apps.models_ready:
+            self.validate()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def validate(self):
+        """
+        Checks that the lookup of every filter resolves on the model of the plan.
+        Raises:
+            ImproperlyConfigured: If a lookup does not resolve.
+        """
+        if self.model is None:
+            return
+        for query_filter in self.filters.values():
+            validate_lookup(self.model, query_filter.lookup)
+
+    def clean(self, query_params):
+        """
+        Cleans the values of the filters present in the query params.
+        Args:
+            query_params (dict): The query params of the request.
+        Returns:
+            dict: The cleaned values by lookup, to pass to queryset.filter().
+        Raises:
+            ValidationError: If a value is invalid.
+        """
+        return {
+            query_filter.lookup: query_filter.clean(query_params[name])
+            for name, query_filter in self.filters.items() if name in query_params
+        }
+
+
+class QueryFilterPlanMixin:
+    """
+    Mixin class compiling the query filters of a view into its immutable `query_filter_plan` when the class is
+    created (see QueryFilterBackend). An invalid filter raises ImproperlyConfigured, the lookups of the views
+    imported before the models are loaded are validated by the common.E001 system check.
+    Attributes:
+        query_filters (list): The BaseFilter instances applied by QueryFilterBackend.
+    """
+    query_filters = []
+    query_filter_plan = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        queryset = getattr(cls, 'queryset', None)
+        model = getattr(cls, 'model', None) or (queryset.model if queryset is not None else None)
+        cls.query_filter_plan = QueryFilterPlan(cls.query_filters, model)
+
+
+def validate_lookup(model, lookup):
+    """
+    Checks that a filter lookup (fields, transforms and lookup) resolves on a model.
+    Raises:
+        ImproperlyConfigured: If it does not.
+    """
+    try:
+        Query(model).build_filter((lookup, None))
+    except FieldError as e:
+        raise ImproperlyConfigured(f"Invalid query filter lookup {lookup} on {model._meta.label}: {e}")
+    except (ValueError, TypeError, ValidationError):
+        # The names resolved, only the placeholder value was rejected
+        pass
+
+
 class QueryFilterBackend(filters.BaseFilterBackend):
     """Custom Backend for Query Filters"""
-    def get_filtering(self,query_params, query_filters):
-        """Validate and create filterset from the query params"""
-        all_filters = {}
-        for filter in query_filters:
-            if filter.name in query_params:
-                filter.value = query_params.get(filter.name)
-                all_filters[filter.lookup] = filter.value
-        return all_filters
+    def get_filter_plan(self, view):
+        """Returns the filter plan compiled for the view class, or compiles one for views without it"""
+        plan = getattr(view, 'query_filter_plan', None)
+        if plan is None:
+            plan = QueryFilterPlan(getattr(view, 'query_filters', None))
+        return plan
 
     def filter_queryset(self, request, queryset, view):
         """Returns filtered queryset"""
-        query_params = request.query_params.dict()
-        query_filter_fields = getattr(view, 'query_filters', None)
         try:
-            filters_dict = self.get_filtering(query_params, query_filter_fields)
+            filters_dict = self.get_filter_plan(view).clean(request.query_params)
             if filters_dict:
                 return queryset.filter(**filters_dict)
         except FieldError as e:
@@ -56,6 +156,31 @@ class QueryFilterBackend(filters.BaseFilterBackend):
         ]
 
 
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter using the full-text index of the model (see common.db.search) instead of icontains clauses.
+    When every field of the view's `search_fields` is in the model's `search_index_fields`, the rows matching
+    all the search terms are returned ranked, most relevant first, unless an ordering is requested.
+    `?search_mode=prefix` matches the terms as prefixes, for typeahead. Other views and databases fall back to
+    the icontains search.
+    """
+    search_mode_param = 'search_mode'
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        prefix = request.query_params.get(self.search_mode_param) == SEARCH_MODE_PREFIX
+        # DRF's ^, =, @ and $ prefixes select the icontains lookups, the full-text index ignores them
+        fields = [field.lstrip('^=@$') for field in search_fields]
+        results = full_text_search(queryset, fields, search_terms, prefix)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+
 class BaseFilter:
     """Base Filter class for  validations"""
     def __init__(self, description='', *, name, lookup, cast=str):
@@ -65,20 +190,9 @@ class BaseFilter:
         self.cast = cast
 
     def clean(self, value):
-        """ Validation logic goes here"""
+        """ Validation logic goes here, it must not store anything on the filter shared by every request"""
         raise NotImplementedError("Clean Method should be Implemented")
 
-    @property
-    def value(self):
-        clean_value = self.clean(self._value)
-
-        # assert clean_value, "Clean Method Should return a Value"
-        return clean_value
-
-    @value.setter
-    def value(self, value):
-        self._value = value
-
 
 class IntegerFilter(BaseFilter):
     def __init__(self, **kwargs):
@@ -140,8 +254,23 @@ class BooleanFilter(BaseFilter):
 
 
 class ArrayFilter(BaseFilter):
-    def __init__(self, **kwargs):
+    """
+    Filters on a comma separated list of values, cast, deduplicated and capped to `max_items`.
+    An `__in` lookup is replaced by `__in_array`, which sends the values as a single parameter where the
+    database supports it (see common.db.lookups.ArrayIn).
+    """
+    def __init__(self, *, max_items=ARRAY_FILTER_MAX_ITEMS, **kwargs):
         super().__init__(**kwargs)
+        self.max_items = max_items
+        if self.lookup.endswith(LOOKUP_SEP + 'in'):
+            self.lookup = self.lookup[:-len('in')] + ArrayIn.lookup_name
 
     def clean(self, value):
-        return map(self.cast, value.split(','))
+        try:
+            values = [self.cast(item.strip()) for item in value.split(',') if item.strip()]
+        except (ValueError, TypeError):
+            raise ValidationError(f"{self.name} should be a comma separated list of {self.cast.__name__} values")
+        values = list(dict.fromkeys(values))
+        if len(values) > self.max_items:
+            raise ValidationError(f"{self.name} accepts at most {self.max_items} values")
+        return values
@@ -1,13 +1,18 @@
 from rest_framework.generics import GenericAPIView, ListAPIView
 from rest_framework import status
 
-from common.rest_framework.mixins import APIViewResponseMixin
+from common.rest_framework.filters import QueryFilterPlanMixin
+from common.rest_framework.mixins import (APIViewResponseMixin, AsyncAPIViewMixin, PaginationSelectionMixin,
+                                         FastListSerializationMixin, QueryPlanMixin, QueryBudgetMixin,
+                                         TenantContextMixin)
 from common.rest_framework.pagination import StandardResultsSetPagination
 
 
-class BaseAPIView(GenericAPIView, APIViewResponseMixin):
+class BaseAPIView(QueryBudgetMixin, TenantContextMixin, GenericAPIView, APIViewResponseMixin):
     """
     Base API view that inherits from GenericAPIView and includes custom response mixins.
+    The queries of each request are checked against `query_budgets`, keyed by lowercase method, and the request
+    is scoped to the vendor of the authenticated user.
     """
 
     def get_serializer_context(self):
@@ -19,10 +24,15 @@ class BaseAPIView(GenericAPIView, APIViewResponseMixin):
         return context
 
 
-class BaseListAPIView(BaseAPIView, ListAPIView):
+class BaseListAPIView(QueryFilterPlanMixin, PaginationSelectionMixin, FastListSerializationMixin, QueryPlanMixin,
+                      BaseAPIView, ListAPIView):
     """
     Base List API view that inherits from BaseAPIView and ListAPIView.
-    Includes standard pagination using StandardResultsSetPagination.
+    Includes standard pagination using StandardResultsSetPagination, keyset pagination
+    (StandardCursorPagination) can be selected per view or per request with `?pagination=cursor`.
+    Set `fast_list_serialization = True` to serialize pages from values() rows when possible. The
+    select_related/prefetch_related/only paths of the queryset are inferred from the serializer. The
+    `query_filters` are compiled when the class is created, like the BaseViewSet ones.
     """
     pagination_class = StandardResultsSetPagination
 
@@ -37,8 +47,23 @@ class BaseListAPIView(BaseAPIView, ListAPIView):
             Response: Customized response object.
         """
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
+        data = self.get_paginated_response(self.serialize_list(queryset))
+        return self.success_response(data=data, status_code=status.HTTP_200_OK)
+
+
+class AsyncBaseListAPIView(AsyncAPIViewMixin, BaseListAPIView):
+    """
+    BaseListAPIView running natively under ASGI: the page is counted with acount() and fetched with async
+    iteration, the serializer runs in a thread with sync_to_async.
+    """
 
-        serializer = self.get_serializer(page, many=True)
-        data = self.get_paginated_response(serializer.data)
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+    async def list(self, request, *args, **kwargs):
+        """
+        Async version of BaseListAPIView.list.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        data = self.get_paginated_response(await self.aserialize_list(queryset))
         return self.success_response(data=data, status_code=status.HTTP_200_OK)
@@ -14,6 +14,12 @@ PROCESS_OPERATION_NOT_IMPLEMENTED = _('Process operation is not implemented.')
 PERMISSION_DENIED = _('You do not have permission to perform this action.')
 INVALID_OPERATION = _("{value} is not a valid operation.")
 INVALID_EXTENSION = _("{value} is not a valid extension.")
+UNKNOWN_FIELD = _("{value} is not a valid field.")
 FILE_EMAIL_SENT = _('You will receive the requested file on your email shortly.')
 EMAIL_NOT_FOUND = _("Email Not Found.")
-
+BULK_CREATE_SUCCESS_MESSAGE = _('{model} objects created successfully.')
+BULK_UPDATE_SUCCESS_MESSAGE = _('{model} objects updated successfully.')
+BULK_DESTROY_SUCCESS_MESSAGE = _('{model} objects deleted successfully.')
+BULK_INVALID_DATA = _('Invalid data provided for some {model} objects.')
+BULK_INVALID_PAYLOAD = _('Expected a list of at most {max_items} items.')
+BULK_OBJECT_NOT_FOUND = _('Object not found.')
@@ -1,7 +1,26 @@
-from rest_framework import status
+import hashlib
+import json
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from common.constants import SUCCESS, FAILED
+from common.constants import SUCCESS, FAILED, QUERY_BUDGET_DUPLICATE_THRESHOLD, RESPONSE_CACHE_TIMEOUT
+from common.db.queries import collect_queries, get_query_budget_mode, report_query_budget
+from common.db.versions import get_model_versions, register_versioned_models
+from common.logging import LogInfo
+from common.rest_framework.counts import ExactCount
+from common.rest_framework.fast_serialization import compile_serializer
+from common.rest_framework.fieldsets import get_deferrable_fields, get_nested_serializer, parse_fieldset, prune_fields
+from common.rest_framework.messages import UNKNOWN_FIELD
+from common.rest_framework.query_plan import QueryPlan, infer_query_plan
+from common.services.tenant_context import get_user_vendor, get_vendor_id, set_vendor
+from common.rest_framework.pagination import StandardResultsSetPagination, StandardCursorPagination, alist
 
 
 class APIViewResponseMixin:
@@ -50,3 +69,588 @@ class APIViewResponseMixin:
             }
         }
         return Response(response_data, status=status_code)
+
+
+class PaginationSelectionMixin:
+    """
+    Mixin class letting a view pick its pagination class per request.
+    The `pagination` query param selects one of `pagination_classes` by name, falling back to
+    `pagination_class` when it is missing or unknown.
+    Attributes:
+        pagination_classes (dict): A dictionary mapping names to pagination classes.
+        pagination_query_param (str): Query parameter selecting the pagination class.
+    """
+    pagination_classes = {
+        'page': StandardResultsSetPagination,
+        'cursor': StandardCursorPagination,
+    }
+    pagination_query_param = 'pagination'
+
+    def get_pagination_class(self):
+        """
+        Returns the pagination class requested through the query params, or the default one.
+        """
+        request = getattr(self, 'request', None)
+        if request is not None and hasattr(request, 'query_params'):
+            requested = request.query_params.get(self.pagination_query_param)
+            if requested in self.pagination_classes:
+                return self.pagination_classes[requested]
+        return self.pagination_class
+
+    @property
+    def paginator(self):
+        """
+        The paginator instance associated with the view, or `None`.
+        """
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.get_pagination_class()
+            self._paginator = None if pagination_class is None else pagination_class()
+        return self._paginator
+
+
+class FastListSerializationMixin:
+    """
+    Mixin class adding an opt-in fast path to list views.
+    With `fast_list_serialization = True` the list serializer is compiled into a values() projection when it
+    only has plain fields, and the page is serialized straight from the database rows without building model
+    instances. The output is the same as the regular serializer, which is used whenever it cannot be compiled.
+    The plan is compiled once per view class and serializer class, requests selecting their fields (see
+    SparseFieldsetMixin) compile their own.
+    Attributes:
+        fast_list_serialization (bool): True to enable the fast path.
+    """
+    fast_list_serialization = False
+    # The compiled plans (or None when the serializer cannot be compiled) by serializer class, per view class
+    values_plans = None
+
+    def get_values_plan(self):
+        """
+        Returns the compiled plan of the list serializer, or None when the fast path does not apply.
+        """
+        if not self.fast_list_serialization:
+            return None
+        view_class = type(self)
+        if 'values_plans' not in view_class.__dict__:
+            view_class.values_plans = {}
+        cacheable = self.is_values_plan_cacheable()
+        serializer_class = self.get_serializer_class()
+        if cacheable and serializer_class in view_class.values_plans:
+            return view_class.values_plans[serializer_class]
+
+        plan = compile_serializer(self.get_serializer())
+        if plan is None:
+            LogInfo.debug(f"{view_class.__name__}: the list serializer cannot be compiled, "
+                          f"using the regular serialization")
+        if cacheable:
+            view_class.values_plans[serializer_class] = plan
+        return plan
+
+    def is_values_plan_cacheable(self):
+        """
+        Returns False when the request prunes the fields of the serializer, its plan is only valid for it.
+        """
+        request = getattr(self, 'request', None)
+        params = (getattr(self, 'fields_query_param', None), getattr(self, 'exclude_query_param', None))
+        return request is None or not any(param in request.query_params for param in params if param)
+
+    @staticmethod
+    def get_ordering_columns(queryset):
+        """
+        Returns the lookups of the queryset ordering, fetched along the projection for keyset pagination.
+        """
+        ordering = queryset.query.order_by or (queryset.model._meta.ordering if queryset.query.default_ordering
+                                               else ())
+        columns = [field.lstrip('-') for field in ordering if isinstance(field, str) and field != '?']
+        return [*columns, 'pk']
+
+    def serialize_list(self, queryset):
+        """
+        Paginates the queryset and serializes the page, through the values() plan when available.
+        Args:
+            queryset (QuerySet): The filtered queryset.
+        Returns:
+            list: The serialized objects of the page.
+        """
+        plan = self.get_values_plan()
+        if plan is not None:
+            queryset = plan.get_queryset(queryset, extra_columns=self.get_ordering_columns(queryset))
+        page = self.paginate_queryset(queryset)
+        objects = queryset if page is None else page
+        if plan is not None:
+            return plan.serialize(objects)
+        return self.get_serializer(objects, many=True).data
+
+    async def aserialize_list(self, queryset):
+        """
+        Async version of serialize_list: the page is fetched with the async ORM, the serializer runs in a thread
+        as its fields may query the database (e.g. method fields).
+        """
+        plan = self.get_values_plan()
+        if plan is not None:
+            queryset = plan.get_queryset(queryset, extra_columns=self.get_ordering_columns(queryset))
+        page = await self.apaginate_queryset(queryset)
+        objects = await alist(queryset) if page is None else page
+        if plan is not None:
+            return plan.serialize(objects)
+        serializer = self.get_serializer(objects, many=True)
+        return await sync_to_async(lambda: serializer.data)()
+
+
+class QueryPlanMixin:
+    """
+    Mixin class applying select_related, prefetch_related and only() to the view queryset, inferred from
+    the serializer of the current action so nested serializers and dotted sources do not cause N+1 queries.
+    Attributes:
+        infer_query_plan (bool): False to leave the queryset untouched.
+        query_plans (dict): Explicit plans per action, e.g. {'list': {'select_related': ['brand']}}. Every
+            key given (select_related, prefetch_related, only, defer) replaces the inferred one.
+        query_plan_only_actions (tuple): The read-only actions which load only the serialized fields.
+        query_plan_debug (bool): True to log the plan of every request, defaults to the QUERY_PLAN_DEBUG setting.
+    """
+    infer_query_plan = True
+    query_plans = {}
+    query_plan_only_actions = ('list', 'retrieve', 'export')
+    query_plan_debug = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'swagger_fake_view', False) or getattr(self, 'request', None) is None:
+            return queryset
+        return self.get_query_plan(queryset).apply(queryset)
+
+    def get_query_plan_serializer(self):
+        """
+        Returns the serializer instance the plan is inferred from.
+        """
+        return self.get_serializer()
+
+    def get_deferred_fields(self):
+        """
+        Returns the fields deferred when the plan has no only() list, e.g. the fields excluded by the request.
+        """
+        return []
+
+    def get_query_plan(self, queryset):
+        """
+        Returns the query plan of the current action, the explicit one overriding the inferred one.
+        Args:
+            queryset (QuerySet): The queryset of the view.
+        Returns:
+            QueryPlan: The plan to apply.
+        """
+        action = getattr(self, 'action', None)
+        overrides = self.query_plans.get(action, {})
+        read_only = action in self.query_plan_only_actions
+        plan = QueryPlan()
+        if self.infer_query_plan:
+            plan = infer_query_plan(self.get_query_plan_serializer(), queryset.model, include_only=read_only)
+        plan = QueryPlan(select_related=overrides.get('select_related', plan.select_related),
+                         prefetch_related=overrides.get('prefetch_related', plan.prefetch_related),
+                         only=overrides.get('only', plan.only),
+                         defer=overrides.get('defer', self.get_deferred_fields() if read_only else []))
+
+        debug = self.query_plan_debug
+        if debug is None:
+            debug = getattr(settings, 'QUERY_PLAN_DEBUG', False)
+        if debug:
+            LogInfo.debug(f"{self.__class__.__name__}.{action} query plan: {plan.as_dict()}")
+        return plan
+
+
+class QueryBudgetMixin:
+    """
+    Mixin class counting the queries run by each request of a view and checking them against a budget.
+    Violations (too many queries, or a statement repeated with different parameters) are logged or raised
+    according to the QUERY_BUDGET_MODE setting, nothing is counted when it is not set.
+    Attributes:
+        query_budgets (dict): The maximum number of queries per action (or lowercase method for API views).
+        query_budget (int): The budget of the actions missing from query_budgets (optional).
+        query_budget_duplicate_threshold (int): Executions of a statement flagged as N+1, None to disable.
+    """
+    query_budgets = {}
+    query_budget = None
+    query_budget_duplicate_threshold = QUERY_BUDGET_DUPLICATE_THRESHOLD
+
+    @classmethod
+    def get_action_query_budget(cls, action):
+        return cls.query_budgets.get(action, cls.query_budget)
+
+    def get_query_budget(self):
+        """
+        Returns the query budget of the current action, or None when it has no budget.
+        """
+        action = getattr(self, 'action', None) or self.request.method.lower()
+        return self.get_action_query_budget(action)
+
+    def dispatch(self, request, *args, **kwargs):
+        mode = get_query_budget_mode()
+        if not mode:
+            return super().dispatch(request, *args, **kwargs)
+
+        with collect_queries() as collector:
+            response = super().dispatch(request, *args, **kwargs)
+        self.check_query_budget(request, collector, mode)
+        return response
+
+    def check_query_budget(self, request, collector, mode):
+        """
+        Reports the budget violations of the queries run by the request.
+        Args:
+            request (HttpRequest): The request.
+            collector (QueryCollector): The collector of the request.
+            mode (str): QUERY_BUDGET_LOG or QUERY_BUDGET_RAISE.
+        """
+        # The QueryBudgetMiddleware leaves the requests checked by their view alone
+        request.query_budget_checked = True
+        action = getattr(self, 'action', None) or request.method.lower()
+        report_query_budget(collector, f'{self.__class__.__name__}.{action}', budget=self.get_query_budget(),
+                            threshold=self.query_budget_duplicate_threshold, mode=mode)
+
+
+class TenantContextMixin:
+    """
+    Mixin class scoping the request to the vendor of the user authenticated by DRF, before the permission checks
+    and the handler run. TenantContextMiddleware only sees the session user, not the token authenticated ones,
+    and restores the vendor of the context at the end of the request.
+    """
+
+    def get_request_vendor(self, request):
+        """
+        Returns the vendor (instance or primary key) of the request. Override it to resolve the vendor another
+        way, e.g. from a header or the URL.
+        """
+        return get_user_vendor(request.user)
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        set_vendor(self.get_request_vendor(request))
+
+
+class AsyncAPIViewMixin:
+    """
+    Mixin class running a view natively under ASGI: dispatch is a coroutine awaiting the async handlers, so the
+    request does not hold a thread while it waits on the database. Authentication, permissions and throttling
+    (the `initial` checks) and the sync handlers (e.g. extra actions) run in a thread with sync_to_async.
+    Under WSGI the view is run with async_to_sync. The query budgets of the views with QueryBudgetMixin are
+    checked like in sync views, the queries run by the async ORM threads included.
+    """
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # The viewset views built by the router are plain functions returning the dispatch coroutine
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Async version of QueryBudgetMixin.dispatch.
+        """
+        mode = get_query_budget_mode() if isinstance(self, QueryBudgetMixin) else None
+        if not mode:
+            return await self.adispatch(request, *args, **kwargs)
+
+        with collect_queries() as collector:
+            response = await self.adispatch(request, *args, **kwargs)
+        self.check_query_budget(request, collector, mode)
+        return response
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Async version of APIView.dispatch.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Async version of paginate_queryset, the pagination classes without apaginate_queryset run in a thread.
+        """
+        if self.paginator is None:
+            return None
+        apaginate_queryset = getattr(self.paginator, 'apaginate_queryset', None)
+        if apaginate_queryset is None:
+            return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+        return await apaginate_queryset(queryset, self.request, view=self)
+
+
+class ResponseCacheMixin:
+    """
+    Mixin class caching the successful responses of read actions, opt-in per action.
+    Cache keys are built from the view, the action, the URL kwargs, the normalized query params, the vendor,
+    the user's permission scope and the version counters of the cached models. Any write to those models bumps
+    their counter (see common.db.versions), so stale entries are never read again and simply expire. The models
+    are registered for the bumps when the view class is created, writes to other models bump nothing.
+    Attributes:
+        cache_actions (tuple): The actions whose responses are cached, e.g. ('list', 'retrieve').
+        cache_timeout (int): The lifetime of a cached response in seconds.
+        cache_dependencies (tuple): Other models read by the serializers, whose writes also invalidate the cache.
+        cache_alias (str): The cache alias storing the responses.
+    """
+    cache_actions = ()
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+    cache_dependencies = ()
+    cache_alias = 'default'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Views resolving their model in get_queryset() are registered by their first read of the versions
+        queryset = getattr(cls, 'queryset', None)
+        model = getattr(cls, 'model', None) or getattr(queryset, 'model', None)
+        register_versioned_models([model, *cls.cache_dependencies] if model else cls.cache_dependencies)
+
+    def get_cache_models(self):
+        """
+        Returns the models whose version counters are part of the cache key.
+        """
+        model = getattr(self, 'model', None) or self.queryset.model
+        return [model, *self.cache_dependencies]
+
+    def get_cache_scope(self, request):
+        """
+        Returns the part of the key shared by the users allowed to see the same responses: anonymous users, or
+        users with the same set of permissions. Override it for views whose responses depend on the user.
+        """
+        user = request.user
+        if not user or not user.is_authenticated:
+            return 'anonymous'
+        permissions = sorted(user.get_all_permissions())
+        return hashlib.md5(json.dumps([user.is_superuser, permissions]).encode('utf-8')).hexdigest()
+
+    def get_cache_key(self, request):
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        parts = [
+            f'{self.__class__.__module__}.{self.__class__.__qualname__}',
+            self.action,
+            sorted((key, str(value)) for key, value in self.kwargs.items()),
+            params,
+            str(get_vendor_id()),
+            self.get_cache_scope(request),
+            get_model_versions(self.get_cache_models()),
+        ]
+        digest = hashlib.md5(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+        return f'response:{self.__class__.__name__}:{self.action}:{digest}'
+
+    def get_cached_response(self, request):
+        """
+        Returns the cached response of the request, or None when the action is not cached or the entry is missing.
+        """
+        if self.action not in self.cache_actions:
+            return None
+        self._cache_key = self.get_cache_key(request)
+        cached = caches[self.cache_alias].get(self._cache_key)
+        if cached is None:
+            return None
+        data, status_code, self._validators = cached
+        return Response(data, status=status_code)
+
+    def cache_response(self, response):
+        """
+        Stores the data of a successful response under the key computed by get_cached_response, along with
+        the conditional GET validators of the response (see ConditionalGetMixin) so cache hits answer
+        conditional requests without any query.
+        Returns:
+            Response: The response, unchanged.
+        """
+        cache_key = getattr(self, '_cache_key', None)
+        if cache_key is not None and response.status_code == status.HTTP_200_OK:
+            cached = (response.data, response.status_code, getattr(self, '_validators', None))
+            caches[self.cache_alias].set(cache_key, cached, self.cache_timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin class answering conditional GET requests (If-None-Match / If-Modified-Since) of timestamp models.
+    The validators are computed before any serialization: from the `updated_at` of the fetched object for
+    retrieve, and for list from MAX(`updated_at`) and the row count of the filtered queryset, in one query whose
+    count is reused by the paginator. Lists whose paginator does not run a plain sequential COUNT (estimated,
+    capped, cached, concurrent or omitted counts, cursor pagination) get an ETag derived from the model version
+    instead, without Last-Modified, so answering them never scans the queryset. The version counter of the model
+    and the vendor are part of every ETag, so queryset updates not touching `updated_at` still change it.
+    Attributes:
+        conditional_actions (tuple): The actions answering conditional requests.
+        last_modified_field (str): The timestamp field of the model.
+    """
+    conditional_actions = ('list', 'retrieve')
+    last_modified_field = 'updated_at'
+    conditional_count = None
+
+    def supports_conditional_get(self, model):
+        if self.action not in self.conditional_actions:
+            return False
+        return any(field.name == self.last_modified_field for field in model._meta.concrete_fields)
+
+    def get_validators(self, model, identity, last_modified):
+        """
+        Returns the ETag and the last modification time of the response.
+        Args:
+            model: The model class of the response.
+            identity: The primary key of the object, the row count of the list, or None.
+            last_modified (datetime): The last modification time of the object or of the list, or None.
+        """
+        params = sorted((key, sorted(values)) for key, values in self.request.query_params.lists())
+        parts = [
+            model._meta.label_lower, self.action, str(identity), params, str(get_vendor_id()),
+            last_modified.isoformat() if last_modified else None, get_model_versions([model]),
+        ]
+        etag = quote_etag(hashlib.md5(json.dumps(parts, default=str).encode('utf-8')).hexdigest())
+        return etag, last_modified
+
+    def compute_validators(self, queryset=None, instance=None):
+        """
+        Computes the validators of the response, kept for evaluate_preconditions and set_validators.
+        Args:
+            queryset (QuerySet): The filtered queryset of a list.
+            instance: The object of a retrieve.
+        """
+        self._validators = None
+        model = type(instance) if instance is not None else queryset.model
+        if not self.supports_conditional_get(model):
+            return
+        if instance is not None:
+            # A timestamp deferred by the query plan would be fetched with a query of its own
+            deferred = self.last_modified_field in instance.get_deferred_fields()
+            last_modified = None if deferred else getattr(instance, self.last_modified_field)
+            self._validators = self.get_validators(model, instance.pk, last_modified)
+        elif self.aggregates_list_count():
+            aggregates = queryset.order_by().aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+            self.conditional_count = aggregates['count']
+            self._validators = self.get_validators(model, aggregates['count'], aggregates['last_modified'])
+        else:
+            self._validators = self.get_validators(model, None, None)
+
+    def aggregates_list_count(self):
+        """
+        Returns True when the paginator of the list runs a plain sequential COUNT of the queryset, which the
+        aggregate of the validators replaces at no extra cost.
+        """
+        paginator = self.paginator
+        if getattr(paginator, 'get_count_strategy', None) is None or not paginator.get_page_size(self.request):
+            return False
+        count_strategy = paginator.get_count_strategy(self)
+        return isinstance(count_strategy, ExactCount) and not count_strategy.concurrent
+
+    async def acompute_validators(self, queryset=None, instance=None):
+        """
+        Async version of compute_validators, aggregating the list with aaggregate().
+        """
+        # The model versions of the validators are read from the cache, with blocking calls
+        if (instance is not None or not self.supports_conditional_get(queryset.model)
+                or not self.aggregates_list_count()):
+            return await sync_to_async(self.compute_validators)(queryset=queryset, instance=instance)
+        aggregates = await queryset.order_by().aaggregate(last_modified=Max(self.last_modified_field),
+                                                          count=Count('pk'))
+        self.conditional_count = aggregates['count']
+        self._validators = await sync_to_async(self.get_validators)(queryset.model, aggregates['count'],
+                                                                     aggregates['last_modified'])
+
+    def evaluate_preconditions(self, request, response=None):
+        """
+        Evaluates the conditional headers of the request against the validators.
+        Args:
+            request (Request): The incoming request.
+            response (Response): The response to send when the preconditions pass (optional).
+        Returns:
+            The 304 (or 412) response when they do not pass, otherwise the given response (None by default).
+        """
+        validators = getattr(self, '_validators', None)
+        if validators is None:
+            return response
+        etag, last_modified = validators
+        if response is not None:
+            self.set_validators(response)
+        response = get_conditional_response(request, etag=etag, response=response,
+                                            last_modified=int(last_modified.timestamp()) if last_modified else None)
+        return response if response is None else self.set_validators(response)
+
+    def set_validators(self, response):
+        """
+        Adds the ETag and Last-Modified headers to a successful response.
+        Returns:
+            Response: The response.
+        """
+        validators = getattr(self, '_validators', None)
+        if validators is not None and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin class letting clients pick the serialized fields with `?fields=` or drop some with `?exclude=`.
+    Both take comma separated field names, dotted paths select the fields of nested serializers
+    (e.g. `?fields=id,brand.name`). The serializer of the action is pruned, so the fields selected with only()
+    by QueryPlanMixin follow the request, and excluded fields are deferred otherwise. Unknown fields are
+    rejected with a validation error.
+    Attributes:
+        fields_query_param (str): Query parameter listing the fields to keep.
+        exclude_query_param (str): Query parameter listing the fields to remove.
+        sparse_fieldset_actions (tuple): The actions accepting sparse fieldsets.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    sparse_fieldset_actions = ('list', 'retrieve', 'export')
+
+    def get_serializer(self, *args, **kwargs):
+        return self.apply_sparse_fieldset(super().get_serializer(*args, **kwargs))
+
+    def apply_sparse_fieldset(self, serializer):
+        """
+        Prunes the fields of the serializer according to the query params of the request.
+        Returns:
+            Serializer: The serializer, pruned in place.
+        Raises:
+            ValidationError: If a requested field does not exist.
+        """
+        request = getattr(self, 'request', None)
+        if getattr(self, 'action', None) not in self.sparse_fieldset_actions or request is None:
+            return serializer
+        target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+        if get_nested_serializer(target) is None:
+            return serializer
+
+        fields_tree = parse_fieldset(request.query_params.getlist(self.fields_query_param))
+        exclude_tree = parse_fieldset(request.query_params.getlist(self.exclude_query_param))
+        errors = {}
+        if fields_tree:
+            unknown = prune_fields(target, fields_tree)
+            if unknown:
+                errors[self.fields_query_param] = [UNKNOWN_FIELD.format(value=path) for path in unknown]
+        self._deferred_fields = []
+        if exclude_tree:
+            model = getattr(getattr(target, 'Meta', None), 'model', None)
+            deferrable = get_deferrable_fields(target, exclude_tree, model) if model is not None else []
+            unknown = prune_fields(target, exclude_tree, exclude=True)
+            if unknown:
+                errors[self.exclude_query_param] = [UNKNOWN_FIELD.format(value=path) for path in unknown]
+            # A field still serialized may read the same model field
+            kept_sources = {field.source_attrs[0] for field in target.fields.values() if field.source_attrs}
+            self._deferred_fields = [name for name in deferrable if name not in kept_sources]
+        if errors:
+            raise ValidationError(errors)
+        return serializer
+
+    def get_deferred_fields(self):
+        return getattr(self, '_deferred_fields', [])
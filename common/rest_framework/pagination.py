@@ -1,4 +1,149 @@
-from rest_framework.pagination import PageNumberPagination
+import asyncio
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from math import ceil
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.core.paginator import Paginator, Page, EmptyPage, PageNotAnInteger, InvalidPage
+from django.db import connections
+from django.db.models import Model, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+
+from common.rest_framework.counts import ExactCount, count_in_thread
+
+
+async def alist(object_list):
+    """
+    Returns the rows of a queryset (or a list) fetched with async iteration.
+    """
+    if not hasattr(object_list, 'query'):
+        return list(object_list)
+    return [row async for row in object_list]
+
+
+class UncountedPage(Page):
+    """
+    Page of a paginator without an exact count, which knows if a next page exists from an extra fetched row.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    Paginator delegating the count of the object list to a count strategy.
+    When the count is not exact (or still running in a thread) the page number is not validated against
+    the number of pages, the page is fetched with one extra row to know if a next page exists instead.
+    """
+
+    def __init__(self, object_list, per_page, count_strategy=None, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy or ExactCount()
+        self.count_future = None
+        if known_count is not None and self.count_strategy.exact:
+            # An exact count already run for the same rows, e.g. by the conditional GET validators
+            self.__dict__['count'] = known_count
+        elif self.count_strategy.concurrent and hasattr(object_list, 'query'):
+            # Rows written in the current transaction would be invisible to another connection
+            if not connections[object_list.db].in_atomic_block:
+                # None when every count thread is busy, the count then runs sequentially
+                self.count_future = count_in_thread(self.count_strategy, object_list)
+
+    @cached_property
+    def count(self):
+        """
+        Returns the count of the strategy, None when it is not known.
+        """
+        if self.count_future is not None:
+            return self.count_future.result()
+        if not hasattr(self.object_list, 'query'):
+            return len(self.object_list)
+        return self.count_strategy.count(self.object_list)
+
+    @property
+    def display_count(self):
+        return self.count_strategy.get_display_count(self.count)
+
+    @property
+    def counted(self):
+        """
+        Returns True if the exact count is needed before fetching a page.
+        """
+        return self.count_strategy.exact and self.count_future is None
+
+    @cached_property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        if self.count == 0 and not self.allow_empty_first_page:
+            return 0
+        hits = max(1, self.count - self.orphans)
+        return ceil(hits / self.per_page)
+
+    def validate_number(self, number):
+        if self.counted:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        if self.counted:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return UncountedPage(object_list[:self.per_page], number, self, has_next=len(object_list) > self.per_page)
+
+    async def acount(self):
+        """
+        Async version of count: awaits the count running in a thread, or counts with the strategy.
+        The result is cached like count.
+        """
+        if 'count' not in self.__dict__:
+            if self.count_future is not None:
+                count = await asyncio.wrap_future(self.count_future)
+            elif not hasattr(self.object_list, 'query'):
+                count = len(self.object_list)
+            else:
+                count = await self.count_strategy.acount(self.object_list)
+            self.__dict__['count'] = count
+        return self.count
+
+    async def apage(self, number):
+        """
+        Async version of page(), fetching the rows of the page with async iteration.
+        """
+        if self.counted:
+            await self.acount()
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.counted:
+            top = bottom + self.per_page
+            if top + self.orphans >= self.count:
+                top = self.count
+            return self._get_page(await alist(self.object_list[bottom:top]), number, self)
+        object_list = await alist(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return UncountedPage(object_list[:self.per_page], number, self, has_next=len(object_list) > self.per_page)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -9,12 +154,84 @@ class StandardResultsSetPagination(PageNumberPagination):
         page_size_query_param (str): Query parameter to set the page size.
         max_page_size (int): Maximum number of items allowed per page.
         page_query_param (str): Query parameter to set the page number.
+        count_strategy (BaseCountStrategy): How the rows are counted, a view can override it with its own
+            `count_strategy` attribute.
     """
 
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 500
     page_query_param = 'page'
+    django_paginator_class = CountStrategyPaginator
+    count_strategy = ExactCount()
+
+    def get_count_strategy(self, view=None):
+        """
+        Returns the count strategy of the view, or the default one of the pagination class.
+        """
+        return getattr(view, 'count_strategy', None) or self.count_strategy
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate a queryset, counting its rows with the count strategy of the view.
+        An exact count already known by the view (`conditional_count`) is reused instead of counting again.
+        """
+        self.request = request
+        paginator = self.get_paginator(queryset, request, view)
+        if paginator is None:
+            return None
+
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if (paginator.num_pages or 0) > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of paginate_queryset, counting and fetching the page with the async ORM. The count is
+        awaited before returning so get_paginated_response never blocks on it.
+        """
+        self.request = request
+        paginator = self.get_paginator(queryset, request, view)
+        if paginator is None:
+            return None
+
+        if paginator.counted:
+            await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = await paginator.apage(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        await paginator.acount()
+        if (paginator.num_pages or 0) > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginator(self, queryset, request, view=None):
+        """
+        Returns the paginator of the queryset, or None when the request disables pagination.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        return self.django_paginator_class(queryset, page_size, count_strategy=self.get_count_strategy(view),
+                                           known_count=getattr(view, 'conditional_count', None))
+
+    def get_page_number(self, request, paginator):
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            # The last page is only known with an exact count
+            page_number = paginator.num_pages if paginator.counted else page_number
+        return page_number
 
     def get_paginated_response(self, data):
         """
@@ -28,6 +245,244 @@ class StandardResultsSetPagination(PageNumberPagination):
             "page_size": self.page.paginator.per_page,
             "page": self.page.number,
             'total_pages': self.page.paginator.num_pages,
-            "count": self.page.paginator.count,
+            "count": self.page.paginator.display_count,
+            "results": data
+        }
+
+
+class StandardCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination keeping the envelope of StandardResultsSetPagination.
+    Pages are fetched with a WHERE clause on the ordering of the view (as applied by OrderingFilter, or the
+    model's Meta.ordering) plus the primary key as a unique tiebreaker, so deep pages cost the same as the
+    first one. Cursors are opaque tokens and support both directions.
+    Attributes:
+        page_size (int): Number of items per page.
+        page_size_query_param (str): Query parameter to set the page size.
+        max_page_size (int): Maximum number of items allowed per page.
+        cursor_query_param (str): Query parameter carrying the cursor.
+        ordering (str): Ordering used when neither the view nor the model defines one.
+    Note:
+        The ordering fields should be non-nullable, rows with NULL values cannot be compared to a cursor.
+    """
+
+    page_size = StandardResultsSetPagination.page_size
+    page_size_query_param = StandardResultsSetPagination.page_size_query_param
+    max_page_size = StandardResultsSetPagination.max_page_size
+    cursor_query_param = 'cursor'
+    ordering = '-pk'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the rows of the page pointed at by the cursor of the request.
+        Args:
+            queryset (QuerySet): The filtered and ordered queryset.
+            request (Request): The incoming request.
+            view: The view paginating the queryset.
+        Returns:
+            list: The rows of the page.
+        """
+        queryset, values, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), values, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async version of paginate_queryset, fetching the page with async iteration.
+        """
+        queryset, values, reverse = self.get_page_queryset(queryset, request)
+        return self.set_page(await alist(queryset), values, reverse)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the queryset of the rows of the page (plus one, telling if there are more), along with the
+        cursor values and direction of the request.
+        """
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        values, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = [self.reverse_field(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.get_cursor_filter(ordering, values))
+        return queryset[:self.page_size + 1], values, reverse
+
+    def set_page(self, results, values, reverse):
+        """
+        Keeps the rows of the page and the directions they can be followed in.
+        Returns:
+            list: The rows of the page.
+        """
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        """
+        Custom method to format the paginated response.
+        Args:
+            data (list): The paginated data.
+        Returns:
+            dict: A dictionary containing paginated response information.
+        """
+        return {
+            "page_size": self.page_size,
+            "next": self.get_next_cursor(),
+            "previous": self.get_previous_cursor(),
             "results": data
         }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Returns the ordering of the queryset with the primary key appended as a unique tiebreaker.
+        """
+        ordering = list(queryset.query.order_by)
+        if not ordering and queryset.query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        if not ordering:
+            ordering = [self.ordering]
+        if any(not isinstance(field, str) for field in ordering):
+            raise ImproperlyConfigured(f"{self.__class__.__name__} only supports ordering by field names.")
+
+        pk_name = queryset.model._meta.pk.name
+        if not any(field.lstrip('-') in ('pk', pk_name) for field in ordering):
+            ordering.append('-pk' if ordering[-1].startswith('-') else 'pk')
+        return ordering
+
+    @staticmethod
+    def reverse_field(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def get_cursor_filter(ordering, values):
+        """
+        Builds the keyset condition selecting the rows after the cursor values in the given ordering,
+        i.e. (a > x) OR (a = x AND b > y) OR ... for an ascending ordering on (a, b, ...).
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal_fields = {previous.lstrip('-'): value for previous, value in zip(ordering[:index], values)}
+            condition |= Q(**equal_fields, **{f'{name}__{lookup}': values[index]})
+        return condition
+
+    def get_position(self, instance):
+        """
+        Returns the ordering values of an instance, following '__' separated relations.
+        Rows of a values() queryset are dicts keyed by the ordering lookups.
+        """
+        values = []
+        for field in self.ordering:
+            if isinstance(instance, dict):
+                values.append(instance[field.lstrip('-')])
+                continue
+            value = instance
+            for attribute in field.lstrip('-').split(LOOKUP_SEP):
+                value = getattr(value, attribute) if value is not None else None
+            values.append(value.pk if isinstance(value, Model) else value)
+        return values
+
+    def encode_cursor(self, instance, reverse):
+        # Values are kept as strings with their full precision, filters convert them back to the field types
+        payload = json.dumps({'v': self.get_position(instance), 'r': reverse}, default=str)
+        return urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def get_ordering_field(self, model, field):
+        """
+        Returns the model field of an ordering, following '__' separated relations, the target field for
+        relations, or None for the orderings not resolving to a model field (e.g. annotations).
+        """
+        opts = model._meta
+        model_field = None
+        for name in field.lstrip('-').split(LOOKUP_SEP):
+            if opts is None:
+                return None
+            try:
+                model_field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            opts = model_field.related_model._meta if model_field.is_relation else None
+        if model_field is not None and model_field.is_relation:
+            model_field = getattr(model_field, 'target_field', None)
+        return model_field
+
+    def decode_cursor(self, request, model):
+        """
+        Returns the ordering values, converted to the types of the ordering fields, and the direction of the
+        cursor of the request.
+        Raises:
+            NotFound: If the cursor is malformed or holds a value its ordering field cannot take.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            values = [self.to_python(model, field, value) for field, value in zip(self.ordering, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def to_python(self, model, field, value):
+        """
+        Converts a cursor value to the type of its ordering field.
+        Raises:
+            ValueError: If the value is None, rows can not be compared to NULL.
+            ValidationError: If the ordering field cannot take the value.
+        """
+        if value is None:
+            raise ValueError('Cursor values can not be null.')
+        model_field = self.get_ordering_field(model, field)
+        return model_field.to_python(value) if model_field is not None else value
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
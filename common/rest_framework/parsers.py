@@ -0,0 +1,70 @@
+import codecs
+import msgpack
+from io import BytesIO
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from common.rest_framework.renderers import FastJSONRenderer, MessagePackRenderer, orjson
+
+# orjson reads the integers out of the 64 bit range as floats, whose magnitude is at least 2 ** 63
+WIDE_INTEGER_MAGNITUDE = 2 ** 63
+
+
+def has_wide_integer_float(data):
+    """
+    Checks if parsed JSON holds an integral float out of the 64 bit integer range, which orjson may have read
+    from an integer literal. Such bodies are parsed again by the stdlib parser.
+    """
+    if type(data) is not dict and type(data) is not list:
+        return type(data) is float and abs(data) >= WIDE_INTEGER_MAGNITUDE and data.is_integer()
+    # Only the containers are stacked, the scalars are checked in place
+    stack = [data]
+    while stack:
+        container = stack.pop()
+        for value in (container.values() if type(container) is dict else container):
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                stack.append(value)
+            elif value_type is float and abs(value) >= WIDE_INTEGER_MAGNITUDE and value.is_integer():
+                return True
+    return False
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in replacement of DRF's JSONParser parsing UTF-8 bodies with orjson when it is installed.
+    The bodies orjson rejects or reads differently (other encodings, integers wider than 64 bits, NaN
+    when STRICT_JSON is off, invalid JSON) are parsed by the stdlib parser, which also builds the error
+    message.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
+        if has_wide_integer_float(data):
+            return super().parse(BytesIO(body), media_type, parser_context)
+        return data
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses `Content-Type: application/msgpack` request bodies.
+    """
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % (str(exc) or exc.__class__.__name__))
@@ -0,0 +1,138 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField, SlugRelatedField
+
+
+class QueryPlan:
+    """
+    The select_related, prefetch_related and only() paths applied to the queryset of a view.
+    Attributes:
+        select_related (list): Forward foreign key and one to one paths fetched with joins.
+        prefetch_related (list): Reverse and many to many paths fetched with separate queries.
+        only (list): The fields to load, or None to load every field.
+        defer (list): The fields not to load, used when only is None.
+    """
+
+    def __init__(self, select_related=(), prefetch_related=(), only=None, defer=()):
+        self.select_related = list(dict.fromkeys(select_related))
+        self.prefetch_related = list(dict.fromkeys(prefetch_related))
+        self.only = None if only is None else list(dict.fromkeys(only))
+        self.defer = list(dict.fromkeys(defer))
+
+    def apply(self, queryset):
+        """
+        Returns the queryset with the plan applied.
+        """
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        elif self.defer:
+            queryset = queryset.defer(*self.defer)
+        return queryset
+
+    def as_dict(self):
+        return {'select_related': self.select_related, 'prefetch_related': self.prefetch_related, 'only': self.only,
+                'defer': self.defer}
+
+    def __repr__(self):
+        return f'QueryPlan({self.as_dict()})'
+
+
+class QueryPlanBuilder:
+    """
+    Walks the readable fields of a serializer to find the relations it reads and the fields it loads.
+    Relations reached through forward foreign keys and one to one fields are joined with select_related,
+    relations reached through reverse or many to many relations are prefetched along with everything below
+    them. The only() list is given up as soon as a field reads something which is not a model field
+    (method fields, properties, annotations, string representations of related objects).
+    """
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+        self.only_supported = True
+
+    def build(self, serializer, model, include_only=True):
+        self.walk(serializer, model, prefix=(), prefetched=False)
+        only = self.only if include_only and self.only_supported else None
+        return QueryPlan(self.select_related, self.prefetch_related, only)
+
+    def add_relation(self, path, prefetched):
+        lookup = LOOKUP_SEP.join(path)
+        if prefetched:
+            self.prefetch_related.append(lookup)
+        else:
+            self.select_related.append(lookup)
+            self.only.append(lookup)
+
+    def walk(self, serializer, model, prefix, prefetched):
+        for field in serializer._readable_fields:
+            if field.source == '*':
+                if isinstance(field, serializers.Serializer):
+                    self.walk(field, model, prefix, prefetched)
+                else:
+                    self.only_supported = False
+                continue
+            self.walk_field(field, model, prefix, prefetched)
+
+    def walk_field(self, field, model, prefix, prefetched):
+        path = prefix
+        source_attrs = field.source_attrs
+        for index, attr in enumerate(source_attrs):
+            last = index == len(source_attrs) - 1
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Properties, methods and annotations are unknown to the plan
+                self.only_supported = False
+                return
+            path = (*path, model_field.name)
+
+            if not model_field.is_relation:
+                if not prefetched:
+                    self.only.append(LOOKUP_SEP.join(path))
+                return
+
+            forward = model_field.concrete and (model_field.many_to_one or model_field.one_to_one)
+            if last and forward and isinstance(field, PrimaryKeyRelatedField):
+                # The primary key of the related object is read from the foreign key column
+                if not prefetched:
+                    self.only.append(LOOKUP_SEP.join(path))
+                return
+            if not forward:
+                prefetched = True
+            self.add_relation(path, prefetched)
+            model = model_field.related_model
+
+        if isinstance(field, serializers.ListSerializer):
+            self.walk(field.child, model, path, prefetched=True)
+        elif isinstance(field, serializers.Serializer):
+            self.walk(field, model, path, prefetched)
+        elif isinstance(field, ManyRelatedField):
+            child = field.child_relation
+            if isinstance(child, SlugRelatedField) and not prefetched:
+                self.only.append(LOOKUP_SEP.join((*path, child.slug_field)))
+        elif isinstance(field, SlugRelatedField):
+            if not prefetched:
+                self.only.append(LOOKUP_SEP.join((*path, field.slug_field)))
+        elif not prefetched and (isinstance(field, RelatedField) or model_field.is_relation):
+            # String and hyperlinked representations may read any field of the related object
+            self.only_supported = False
+
+
+def infer_query_plan(serializer, model, include_only=True):
+    """
+    Infers the query plan needed to serialize objects of a model without N+1 queries.
+    Args:
+        serializer (Serializer): The serializer instance of the action.
+        model: The model class of the queryset.
+        include_only (bool): If False, every field of the objects is loaded.
+    Returns:
+        QueryPlan: The inferred plan.
+    """
+    return QueryPlanBuilder().build(serializer, model, include_only)
@@ -0,0 +1,83 @@
+import msgpack
+from functools import lru_cache
+from rest_framework.utils import encoders
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Escapes keeping the output a strict JavaScript subset, as DRF does
+LINE_SEPARATOR_ESCAPES = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+@lru_cache(maxsize=None)
+def get_encoder_default(encoder_class):
+    """
+    Returns the default() method of an instance of a json.JSONEncoder class, called by orjson for the
+    types it does not serialize natively (lazy strings, Decimals, timedeltas, querysets...).
+    """
+    return encoder_class().default
+
+
+def fast_json_dumps(data, encoder_class):
+    """
+    Serializes data with orjson, producing the same document as json.dumps(data, cls=encoder_class) with
+    compact separators and ensure_ascii=False.
+    Datetimes, dates, times and UUIDs are serialized natively by orjson the way DRF's JSONEncoder does
+    (ISO 8601, 'Z' for UTC).
+    Two known differences remain: floats in exponent notation are spelled without padding (1e16 instead
+    of 1e+16, the same value), and NaN and infinities are written as null instead of raising.
+    Args:
+        data: The data to serialize.
+        encoder_class: The json.JSONEncoder subclass whose default() handles the other types.
+    Returns:
+        bytes: The UTF-8 JSON document, or None when orjson is not installed or can not serialize the
+        data (non string keys, integers wider than 64 bits...), the caller then falls back to json.dumps.
+    """
+    if orjson is None:
+        return None
+    try:
+        return orjson.dumps(data, default=get_encoder_default(encoder_class), option=orjson.OPT_UTC_Z)
+    except orjson.JSONEncodeError:
+        return None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement of DRF's JSONRenderer serializing with orjson when it is installed.
+    Indented, ASCII only or non compact output, and the data orjson can not serialize, are rendered by
+    the stdlib renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.compact and not self.ensure_ascii and self.get_indent(accepted_media_type,
+                                                                      renderer_context) is None:
+            ret = fast_json_dumps(data, self.encoder_class)
+            if ret is not None:
+                for character, escape in LINE_SEPARATOR_ESCAPES:
+                    ret = ret.replace(character, escape)
+                return ret
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders the API envelope as MessagePack, for the internal services sending `Accept: application/msgpack`.
+    The values JSON has no type for (lazy messages, Decimals, datetimes, UUIDs...) are converted by DRF's
+    JSONEncoder, so the decoded document equals the JSON one.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=get_encoder_default(encoders.JSONEncoder), use_bin_type=True)
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from brands.messages import INVALID_ACTION
 from common.logging import LogInfo
 from common.messages import INTERNAL_SERVER_ERROR_MESSAGE
+from common.rest_framework.bulk import bulk_create_compatible
 from common.rest_framework.messages import (FILE_NOT_PROVIDED, PROCESS_FILE_NOT_IMPLEMENTED, INVALID_OPERATION,
                                             INVALID_EXTENSION, FILE_EMAIL_SENT, EMAIL_NOT_FOUND, PERMISSION_DENIED)
 from common.utils.file import generate_excel_from_html, generate_pdf_from_html
@@ -25,6 +26,7 @@ class BaseModelSerializer(serializers.ModelSerializer):
         if override or not hasattr(instance, field_name):
             instance[field_name] = user
 
+    @bulk_create_compatible
     def create(self, validated_data, set_user=True):
         if set_user:
             user = self.context['request'].user
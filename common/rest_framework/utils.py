@@ -1,24 +1,76 @@
+from asgiref.sync import sync_to_async
 from rest_framework.status import HTTP_200_OK
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
 
 from common.constants import FAILED
-from common.services.threadlocals import thread_local
+from common.db.identity_map import amemoized_get, memoized_get
+from common.rest_framework.renderers import FastJSONRenderer
+from common.services.tenant_context import VENDOR_FIELD, get_vendor, is_vendor_model
 
 
 def get_object_or_404(queryset=None, error_message=None, **kwargs):
     """
     Use get() to return an object, or send failure response if the object does not exist.
+    The object is memoized in the identity map of the request, the same lookup does not query it again.
+    The objects of vendor owned models are looked up in the vendor of the current context.
     """
     try:
-        kwargs['vendor'] = thread_local.get_vendor()
-        return True, queryset.get(**kwargs)
+        if is_vendor_model(queryset.model):
+            kwargs[VENDOR_FIELD] = get_vendor()
+        return True, memoized_get(queryset, **kwargs)
     except queryset.model.DoesNotExist:
         if error_message is None:
             error_message = f"{queryset.model._meta.object_name} not found"
     return False, error_message
 
 
+async def aget_object_or_404(queryset=None, error_message=None, **kwargs):
+    """
+    Async version of get_object_or_404, fetching the object with aget().
+    """
+    try:
+        if is_vendor_model(queryset.model):
+            kwargs[VENDOR_FIELD] = get_vendor()
+        return True, await amemoized_get(queryset, **kwargs)
+    except queryset.model.DoesNotExist:
+        if error_message is None:
+            error_message = f"{queryset.model._meta.object_name} not found"
+    return False, error_message
+
+
+def is_asgi_request(request):
+    """
+    Returns True when the request (a DRF or a Django request) is served by the ASGI handler.
+    """
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterator):
+    """
+    Async iterator over a sync iterator, each item being produced in the sync thread of sync_to_async.
+    Lets the ASGI handler stream a sync generator (e.g. rows read with queryset.iterator()) chunk by chunk,
+    instead of consuming the whole generator in a thread before sending the first chunk. The database cursor
+    stays in the same thread for every item, and the generator is closed if the client disconnects.
+    """
+    iterator = iter(iterator)
+    exhausted = object()
+    try:
+        while True:
+            item = await sync_to_async(next)(iterator, exhausted)
+            if item is exhausted:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
 def send_json_response(message=None, data=None, status=FAILED, status_code=HTTP_200_OK):
+    """
+    Returns the API envelope outside of DRF views (e.g. middlewares), rendered like the DRF responses.
+    """
     response_data = {
         "status": status,
         "status_code": status_code,
@@ -27,4 +79,5 @@ def send_json_response(message=None, data=None, status=FAILED, status_code=HTTP_
             **({"data": data} if not isinstance(data, dict) else data)
         }
     }
-    return JsonResponse(response_data, status=status_code)
+    renderer = FastJSONRenderer()
+    return HttpResponse(renderer.render(response_data), content_type=renderer.media_type, status=status_code)
@@ -1,14 +1,40 @@
+import csv
+import json
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status, serializers, filters
+from rest_framework.decorators import action
+from rest_framework.utils import encoders
 
-from common.rest_framework.filters import QueryFilterBackend
-from common.rest_framework.mixins import APIViewResponseMixin
+from common.db.querysets import SoftDeletionQuerySet
+from common.db.signals import send_rows_changed
+from common.rest_framework.bulk import is_bulk_create_compatible, validate_items, split_many_to_many
+from common.rest_framework.filters import FullTextSearchFilter, QueryFilterBackend, QueryFilterPlanMixin
+from common.rest_framework.mixins import (APIViewResponseMixin, AsyncAPIViewMixin, PaginationSelectionMixin,
+                                         FastListSerializationMixin, QueryPlanMixin, QueryBudgetMixin,
+                                         ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                                         TenantContextMixin)
 from common.rest_framework.pagination import StandardResultsSetPagination
-from common.rest_framework.utils import get_object_or_404
+from common.rest_framework.utils import aget_object_or_404, aiterate, get_object_or_404, is_asgi_request
 from common.rest_framework import messages
-from vendors.utils import vendor_filter
+from common.services.tenant_context import vendor_filter
+from common.utils import is_soft_delete_model
 
 
-class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
+class EchoBuffer:
+    """
+    File-like object returning what is written to it, used to stream the rows of a csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+class BaseViewSet(QueryBudgetMixin, TenantContextMixin, QueryFilterPlanMixin, PaginationSelectionMixin,
+                  FastListSerializationMixin, SparseFieldsetMixin, QueryPlanMixin, ResponseCacheMixin,
+                  ConditionalGetMixin, viewsets.ModelViewSet, APIViewResponseMixin):
     """
     Base ViewSet for Django Rest Framework with extended functionality.
 
@@ -20,11 +46,24 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         model (class): The Django model associated with this ViewSet.
         queryset (QuerySet): The base queryset used for retrieving objects.
         pagination_class (class): The pagination class to use for list views.
+        pagination_classes (dict): Pagination classes selectable per request with the `pagination` query param.
+        count_strategy (BaseCountStrategy): How paginated lists are counted, defaults to the pagination class one.
+        fast_list_serialization (bool): True to serialize list pages from values() rows when the list
+            serializer only has plain fields.
+        query_plans (dict): Explicit select_related/prefetch_related/only paths per action, overriding the
+            ones inferred from the serializer of the action.
         serializer_class (class): The default serializer class for the ViewSet.
         serializer_classes (dict): A dictionary mapping action names to serializer classes.
         default_messages (dict): A dictionary containing default success/failure messages for various actions.
         messages (dict): Additional or overridden messages for specific actions.
         api_permissions (dict): API Permissions for the different actions
+        query_filters (list): The BaseFilter instances applied by QueryFilterBackend, compiled into the immutable
+            `query_filter_plan` when the class is created.
+        query_budgets (dict): The maximum number of queries per action, checked when QUERY_BUDGET_MODE is set.
+        cache_actions (tuple): The read actions ('list', 'retrieve') whose responses are cached.
+        conditional_actions (tuple): The actions answering If-None-Match/If-Modified-Since requests with 304,
+            for models with an `updated_at` field.
+        sparse_fieldset_actions (tuple): The actions accepting `?fields=` and `?exclude=` to prune the response.
 
     Methods:
         get_permissions: Returns a list of permission classes for the ViewSet.
@@ -35,12 +74,15 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         update: Updates an existing object and returns a success or failure response.
         destroy: Deletes an object and returns a success or failure response.
         list: Retrieves a paginated list of objects and returns a serialized response.
+        export: Streams every filtered object as NDJSON or CSV.
+        bulk_create, bulk_update, bulk_destroy: Create, update or delete a list of objects in one transaction.
     """
     model = None
     model_name = None
     queryset = None
-    filter_backends = (QueryFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (QueryFilterBackend, FullTextSearchFilter, filters.OrderingFilter)
     pagination_class = StandardResultsSetPagination
+    count_strategy = None
     serializer_class = serializers.Serializer
     serializer_classes = {
         'create': None,
@@ -48,7 +90,18 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         'list': None,
         'update': None,
         'destroy': None,
+        'export': None,
+        'bulk_create': None,
+        'bulk_update': None,
+    }
+    export_formats = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
     }
+    export_format_query_param = 'export_format'
+    export_chunk_size = 2000
+    bulk_max_items = 1000
+    bulk_batch_size = 500
     default_messages = {
         'create_success': messages.CREATE_SUCCESS_MESSAGE,
         'create_failure': messages.INVALID_DATA,
@@ -56,11 +109,14 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         'destroy_success': messages.DESTROY_SUCCESS_MESSAGE,
         'destroy_failure': messages.DESTROY_FAILURE_MESSAGE,
         'update_success': messages.UPDATE_SUCCESS_MESSAGE,
-        'update_failure': messages.UPDATE_FAILURE_MESSAGE
+        'update_failure': messages.UPDATE_FAILURE_MESSAGE,
+        'bulk_create_success': messages.BULK_CREATE_SUCCESS_MESSAGE,
+        'bulk_update_success': messages.BULK_UPDATE_SUCCESS_MESSAGE,
+        'bulk_destroy_success': messages.BULK_DESTROY_SUCCESS_MESSAGE,
+        'bulk_failure': messages.BULK_INVALID_DATA,
     }
     messages = {}
     api_permissions = {}
-    query_filters = []
     search_fields = []
     ordering_fields = []
 
@@ -132,13 +188,24 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         the serialized data is returned. If the object is not found or does not match the
         expected model, an appropriate error response is returned.
         """
+        cached_response = self.get_cached_response(request)
+        if cached_response is not None:
+            return self.evaluate_preconditions(request, cached_response)
+
         pk = kwargs.get('pk')
         get_object_status, instance = get_object_or_404(queryset=self.get_queryset(),
                                                         error_message=self.get_message('retrieve_failure'),
                                                         id=pk)
         if get_object_status:
+            # Answer conditional requests before serializing
+            self.compute_validators(instance=instance)
+            not_modified_response = self.evaluate_preconditions(request)
+            if not_modified_response is not None:
+                return not_modified_response
+
             serializer = self.get_serializer(instance)
-            return self.success_response(data=serializer.data, status_code=status.HTTP_200_OK)
+            response = self.success_response(data=serializer.data, status_code=status.HTTP_200_OK)
+            return self.cache_response(self.set_validators(response))
         return self.failure_response(message=instance, status_code=status.HTTP_404_NOT_FOUND)
 
     def update(self, request, *args, **kwargs):
@@ -188,8 +255,412 @@ class BaseViewSet(viewsets.ModelViewSet, APIViewResponseMixin):
         This method filters the queryset based on the request, paginates the results,
         and returns a success response containing the paginated list of serialized data.
         """
+        cached_response = self.get_cached_response(request)
+        if cached_response is not None:
+            return self.evaluate_preconditions(request, cached_response)
+
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
-        serializer = self.get_serializer(page, many=True)
-        data = self.get_paginated_response(serializer.data)
-        return self.success_response(data=data, status_code=status.HTTP_200_OK)
+        # Answer conditional requests before paginating and serializing
+        self.compute_validators(queryset=queryset)
+        not_modified_response = self.evaluate_preconditions(request)
+        if not_modified_response is not None:
+            return not_modified_response
+
+        data = self.get_paginated_response(self.serialize_list(queryset))
+        response = self.success_response(data=data, status_code=status.HTTP_200_OK)
+        return self.cache_response(self.set_validators(response))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every object matching the filters of the request as NDJSON or CSV.
+        This method applies the same filter backends and vendor scoping as `list`, reads the rows with a
+        chunked (server-side on PostgreSQL) cursor and serializes them one by one while the response is
+        streamed, so memory stays constant whatever the number of rows. The format is selected with the
+        `export_format` query param, NDJSON by default. Under ASGI the content is an async iterator producing
+        each chunk in a thread, the ASGI handler would otherwise buffer a sync generator entirely.
+        """
+        export_format = request.query_params.get(self.export_format_query_param, 'ndjson')
+        if export_format not in self.export_formats:
+            return self.failure_response(message=messages.INVALID_EXTENSION.format(value=export_format),
+                                         status_code=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_export_serializer()
+        rows = (serializer.to_representation(instance)
+                for instance in queryset.iterator(chunk_size=self.export_chunk_size))
+        if export_format == 'csv':
+            content = self.stream_csv(rows, serializer)
+        else:
+            content = self.stream_ndjson(rows)
+        if is_asgi_request(request):
+            content = aiterate(content)
+
+        response = StreamingHttpResponse(content, content_type=self.export_formats[export_format])
+        filename = (self.model or queryset.model)._meta.model_name
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+        return response
+
+    def get_export_serializer(self):
+        """
+        Returns the serializer used to represent every exported object.
+        The `export` serializer class is used if defined, then the `list` one. A single instance is created
+        and reused for every row, which avoids binding the serializer fields again for each object.
+        """
+        serializer_class = (self.serializer_classes.get('export') or self.serializer_classes.get('list')
+                            or self.serializer_class)
+        return self.apply_sparse_fieldset(serializer_class(context=self.get_serializer_context()))
+
+    def get_query_plan_serializer(self):
+        if self.action == 'export':
+            return self.get_export_serializer()
+        return super().get_query_plan_serializer()
+
+    def stream_ndjson(self, rows):
+        """
+        Yields the rows as JSON lines, grouped by export_chunk_size rows.
+        """
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(row, cls=encoders.JSONEncoder, ensure_ascii=False) + '\n')
+            if len(lines) >= self.export_chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+    def stream_csv(self, rows, serializer):
+        """
+        Yields a header line with the readable serializer fields then the rows as CSV lines, grouped by
+        export_chunk_size rows. Nested values are written as JSON.
+        """
+        columns = [name for name, field in serializer.fields.items() if not field.write_only]
+        writer = csv.writer(EchoBuffer())
+        lines = [writer.writerow(columns)]
+        for row in rows:
+            lines.append(writer.writerow([
+                json.dumps(row.get(column), cls=encoders.JSONEncoder, ensure_ascii=False)
+                if isinstance(row.get(column), (dict, list)) else row.get(column)
+                for column in columns
+            ]))
+            if len(lines) >= self.export_chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+    def get_bulk_items(self, request):
+        """
+        Returns the list of items of a bulk request, or None when the payload is not a list of at most
+        bulk_max_items objects.
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('items', items.get('ids'))
+        if not isinstance(items, list) or not items or len(items) > self.bulk_max_items:
+            return None
+        return items
+
+    def get_bulk_serializer(self, action_name, fallback):
+        """
+        Returns the serializer validating every item of a bulk action, falling back to the serializer of the
+        single object action.
+        """
+        serializer_class = (self.serializer_classes.get(action_name) or self.serializer_classes.get(fallback)
+                            or self.serializer_class)
+        partial = self.request.method == 'PATCH'
+        return serializer_class(context=self.get_serializer_context(), partial=partial)
+
+    def invalid_bulk_payload_response(self):
+        return self.failure_response(message=messages.BULK_INVALID_PAYLOAD.format(max_items=self.bulk_max_items),
+                                     status_code=status.HTTP_400_BAD_REQUEST)
+
+    def bulk_failure_response(self, errors):
+        return self.failure_response(data={'errors': errors}, message=self.get_message('bulk_failure'),
+                                     status_code=status.HTTP_400_BAD_REQUEST)
+
+    def set_bulk_user_field(self, instance, field_name, override=False):
+        """
+        Stamps the request user on created_by/updated_by, as BaseModelSerializer does for single objects.
+        Returns:
+            bool: True if the field was set.
+        """
+        user = self.request.user
+        if not user or not user.is_authenticated:
+            return False
+        if any(field.name == field_name for field in instance._meta.concrete_fields):
+            if override or getattr(instance, f'{field_name}_id', None) is None:
+                setattr(instance, field_name, user)
+                return True
+        return False
+
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Create a list of objects in one transaction.
+        Every item is validated with the create serializer, the unique fields are checked with one query per
+        field for the whole list, and the objects are created with perform_bulk_create. Nothing is written when
+        an item is invalid, the errors are returned in the order of the items.
+        """
+        items = self.get_bulk_items(request)
+        if items is None:
+            return self.invalid_bulk_payload_response()
+
+        serializer = self.get_bulk_serializer('bulk_create', 'create')
+        validated, errors = validate_items(serializer, items)
+        if any(errors):
+            return self.bulk_failure_response(errors)
+
+        queryset = serializer.Meta.model._default_manager.all()
+        with transaction.atomic(using=queryset.db):
+            objects = self.perform_bulk_create(serializer, validated, queryset)
+        if not isinstance(queryset, SoftDeletionQuerySet):
+            send_rows_changed(queryset.model, queryset.db)
+        return self.success_response(message=self.get_message('bulk_create_success'),
+                                     data={'count': len(objects), 'ids': [instance.pk for instance in objects]},
+                                     status_code=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer, validated, queryset):
+        """
+        Creates the objects of the validated items, in the transaction of bulk_create.
+        The objects are inserted with bulk_create when the serializer's create() only saves the validated data
+        (see is_bulk_create_compatible), to-many relations being set once the rows are inserted. The items of
+        serializers customizing create() (password hashing, nested writes...) go through it one by one, so
+        they give the same rows as the create action.
+        Args:
+            serializer (ModelSerializer): The serializer which validated the items.
+            validated (list): The validated data of every item.
+            queryset (QuerySet): The queryset of the model the objects are inserted with.
+        Returns:
+            list: The created objects.
+        """
+        if not is_bulk_create_compatible(serializer):
+            return [serializer.create(validated_data) for validated_data in validated]
+
+        model = queryset.model
+        objects, many_to_many = [], []
+        for validated_data in validated:
+            many_to_many.append(split_many_to_many(model, validated_data))
+            instance = model(**validated_data)
+            self.set_bulk_user_field(instance, 'created_by')
+            objects.append(instance)
+        objects = queryset.bulk_create(objects, batch_size=self.bulk_batch_size)
+        for instance, relations in zip(objects, many_to_many):
+            for field_name, value in relations.items():
+                getattr(instance, field_name).set(value)
+        return objects
+
+    @action(detail=False, methods=['put', 'patch'], url_path='bulk-update')
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Update a list of objects, identified by the `id` of each item, in one transaction.
+        The objects are fetched with one query (with the vendor scoping of the view), validated like
+        bulk_create and written with bulk_update. PATCH requests are partial updates.
+        """
+        items = self.get_bulk_items(request)
+        if items is None or any(not isinstance(item, dict) for item in items):
+            return self.invalid_bulk_payload_response()
+
+        queryset = self.get_queryset()
+        model = queryset.model
+        pks, errors = [], []
+        for item in items:
+            try:
+                pks.append(model._meta.pk.to_python(item.get('id')))
+                errors.append({})
+            except DjangoValidationError:
+                pks.append(None)
+                errors.append({'id': [messages.BULK_OBJECT_NOT_FOUND]})
+        instances_by_pk = queryset.in_bulk([pk for pk in pks if pk is not None])
+        instances = [instances_by_pk.get(pk) for pk in pks]
+        for index, instance in enumerate(instances):
+            if instance is None:
+                errors[index] = {'id': [messages.BULK_OBJECT_NOT_FOUND]}
+        if any(errors):
+            return self.bulk_failure_response(errors)
+
+        serializer = self.get_bulk_serializer('bulk_update', 'update')
+        validated, errors = validate_items(serializer, items, instances)
+        if any(errors):
+            return self.bulk_failure_response(errors)
+
+        # The keys which are not model columns (e.g. properties with a setter) are set but not written
+        field_names = {}
+        for field in model._meta.concrete_fields:
+            field_names[field.name] = field_names[field.attname] = field.name
+        fields, many_to_many = set(), []
+        for instance, validated_data in zip(instances, validated):
+            many_to_many.append(split_many_to_many(model, validated_data))
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+                if attr in field_names:
+                    fields.add(field_names[attr])
+            if self.set_bulk_user_field(instance, 'updated_by', override=True):
+                fields.add('updated_by')
+        for field in model._meta.concrete_fields:
+            # bulk_update does not call pre_save, refresh the auto_now timestamps here
+            if getattr(field, 'auto_now', False):
+                for instance in instances:
+                    field.pre_save(instance, add=False)
+                fields.add(field.name)
+
+        with transaction.atomic(using=queryset.db):
+            if fields:
+                model._default_manager.bulk_update(instances, fields, batch_size=self.bulk_batch_size)
+            for instance, relations in zip(instances, many_to_many):
+                for field_name, value in relations.items():
+                    getattr(instance, field_name).set(value)
+        if not isinstance(model._default_manager.all(), SoftDeletionQuerySet):
+            send_rows_changed(model, queryset.db)
+        return self.success_response(message=self.get_message('bulk_update_success'),
+                                     data={'count': len(instances)}, status_code=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_destroy(self, request, *args, **kwargs):
+        """
+        Delete a list of objects, given as a list of ids, in one transaction.
+        Soft delete models are marked with a single UPDATE per batch of ids (their dependencies cascading as
+        for destroy), other models are deleted. Nothing is deleted when an id is not found. The response holds
+        the number of objects the delete reported and its count per model label, dependencies included.
+        """
+        items = self.get_bulk_items(request)
+        if items is None:
+            return self.invalid_bulk_payload_response()
+
+        queryset = self.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks, errors = [], []
+        for item in items:
+            try:
+                pks.append(pk_field.to_python(item))
+                errors.append({})
+            except DjangoValidationError:
+                pks.append(None)
+                errors.append({'id': [messages.BULK_OBJECT_NOT_FOUND]})
+        existing = set(queryset.filter(pk__in=[pk for pk in pks if pk is not None]).values_list('pk', flat=True))
+        for index, pk in enumerate(pks):
+            if pk not in existing:
+                errors[index] = {'id': [messages.BULK_OBJECT_NOT_FOUND]}
+        if any(errors):
+            return self.bulk_failure_response(errors)
+
+        queryset = queryset.filter(pk__in=existing)
+        with transaction.atomic(using=queryset.db):
+            if is_soft_delete_model(queryset.model):
+                user = request.user if request.user.is_authenticated else None
+                _, deleted_counts = queryset.delete(user=user, batch_size=self.bulk_batch_size)
+            else:
+                _, deleted_counts = queryset.delete()
+        # The rows of the model itself, the counts include the cascaded dependencies
+        count = deleted_counts.get(queryset.model._meta.label, 0)
+        return self.success_response(message=self.get_message('bulk_destroy_success'),
+                                     data={'count': count, 'counts': deleted_counts}, status_code=status.HTTP_200_OK)
+
+
+class AsyncBaseViewSet(AsyncAPIViewMixin, BaseViewSet):
+    """
+    BaseViewSet running list, retrieve, create, update and destroy natively under ASGI, with the same contract
+    (serializer_classes, messages, response envelope, pagination, response cache and conditional GET).
+    Objects are fetched with aget(), pages are counted with acount() and fetched with async iteration. The
+    serializers (validation, save, representation) and perform_* hooks run in a thread with sync_to_async, as
+    they may query the database. The export and bulk actions are the sync ones, run in a thread.
+    """
+
+    async def create(self, request, *args, **kwargs):
+        """
+        Async version of BaseViewSet.create.
+        """
+        serializer = self.get_serializer(data=request.data)
+        if await sync_to_async(serializer.is_valid)():
+            await sync_to_async(self.perform_create)(serializer)
+            return self.success_response(status_code=status.HTTP_201_CREATED,
+                                         message=self.get_message('create_success'))
+        else:
+            non_field_errors = serializer.errors.get('non_field_errors', [])
+            message = non_field_errors[0] if non_field_errors else self.get_message('create_failure')
+            return self.failure_response(data=serializer.errors, message=message,
+                                         status_code=status.HTTP_400_BAD_REQUEST)
+
+    async def retrieve(self, request, *args, **kwargs):
+        """
+        Async version of BaseViewSet.retrieve.
+        """
+        # The cache scope may read the permissions of the user
+        cached_response = await sync_to_async(self.get_cached_response)(request)
+        if cached_response is not None:
+            return self.evaluate_preconditions(request, cached_response)
+
+        pk = kwargs.get('pk')
+        get_object_status, instance = await aget_object_or_404(queryset=self.get_queryset(),
+                                                               error_message=self.get_message('retrieve_failure'),
+                                                               id=pk)
+        if get_object_status:
+            # Answer conditional requests before serializing
+            await self.acompute_validators(instance=instance)
+            not_modified_response = self.evaluate_preconditions(request)
+            if not_modified_response is not None:
+                return not_modified_response
+
+            serializer = self.get_serializer(instance)
+            data = await sync_to_async(lambda: serializer.data)()
+            response = self.success_response(data=data, status_code=status.HTTP_200_OK)
+            return await sync_to_async(self.cache_response)(self.set_validators(response))
+        return self.failure_response(message=instance, status_code=status.HTTP_404_NOT_FOUND)
+
+    async def update(self, request, *args, **kwargs):
+        """
+        Async version of BaseViewSet.update.
+        """
+        pk = kwargs.get('pk')
+        partial = kwargs.pop('partial', False)
+        get_object_status, instance = await aget_object_or_404(queryset=self.get_queryset(),
+                                                               error_message=self.get_message('retrieve_failure'),
+                                                               id=pk)
+        if get_object_status:
+            serializer = self.get_serializer(instance, data=request.data, partial=partial)
+            if await sync_to_async(serializer.is_valid)():
+                await sync_to_async(self.perform_update)(serializer)
+                return self.success_response(message=self.get_message('update_success'),
+                                             status_code=status.HTTP_200_OK)
+            else:
+                return self.failure_response(data=serializer.errors, message=self.get_message('update_failure'),
+                                             status_code=status.HTTP_400_BAD_REQUEST)
+        return self.failure_response(message=instance, status_code=status.HTTP_404_NOT_FOUND)
+
+    async def partial_update(self, request, *args, **kwargs):
+        kwargs['partial'] = True
+        return await self.update(request, *args, **kwargs)
+
+    async def destroy(self, request, *args, **kwargs):
+        """
+        Async version of BaseViewSet.destroy.
+        """
+        pk = kwargs.get('pk')
+        get_object_status, instance = await aget_object_or_404(queryset=self.get_queryset(),
+                                                               error_message=self.get_message('retrieve_failure'),
+                                                               id=pk)
+        if get_object_status:
+            # The soft delete cascade is collected and written with the sync ORM
+            await sync_to_async(self.perform_destroy)(instance)
+            return self.success_response(message=self.get_message('destroy_success'),
+                                         status_code=status.HTTP_200_OK)
+        return self.failure_response(message=instance, status_code=status.HTTP_404_NOT_FOUND)
+
+    async def list(self, request, *args, **kwargs):
+        """
+        Async version of BaseViewSet.list.
+        """
+        cached_response = await sync_to_async(self.get_cached_response)(request)
+        if cached_response is not None:
+            return self.evaluate_preconditions(request, cached_response)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # Answer conditional requests before paginating and serializing
+        await self.acompute_validators(queryset=queryset)
+        not_modified_response = self.evaluate_preconditions(request)
+        if not_modified_response is not None:
+            return not_modified_response
+
+        data = self.get_paginated_response(await self.aserialize_list(queryset))
+        response = self.success_response(data=data, status_code=status.HTTP_200_OK)
+        return await sync_to_async(self.cache_response)(self.set_validators(response))
@@ -0,0 +1,119 @@
+import contextvars
+from contextlib import contextmanager
+from celery.signals import before_task_publish, task_postrun, task_prerun
+
+# The vendor the current request (or task) is scoped to. A context variable is private to each asyncio task
+# and copied into sync_to_async calls, unlike a thread local shared by the requests an ASGI thread serves
+_vendor = contextvars.ContextVar('vendor', default=None)
+
+# The Celery message header carrying the primary key of the vendor of the publishing context
+VENDOR_HEADER = 'tenant_vendor'
+# The field scoping the vendor owned models, a foreign key of the users of a vendor as well
+VENDOR_FIELD = 'vendor'
+
+# The tokens restoring the context of the worker after each task, by task id
+_task_tokens = {}
+
+
+def get_vendor():
+    """
+    Returns the vendor of the current context: the instance set by the request, the primary key in Celery
+    tasks, or None.
+    """
+    return _vendor.get()
+
+
+def get_vendor_id():
+    """
+    Returns the primary key of the vendor of the current context, or None.
+    """
+    vendor = _vendor.get()
+    return getattr(vendor, 'pk', vendor)
+
+
+def set_vendor(vendor):
+    """
+    Scopes the current context to a vendor (instance or primary key).
+    Returns:
+        Token: The token restoring the previous vendor with reset_vendor().
+    """
+    return _vendor.set(vendor)
+
+
+def reset_vendor(token):
+    _vendor.reset(token)
+
+
+@contextmanager
+def vendor_context(vendor):
+    """
+    Context manager scoping the block to a vendor, the previous vendor is restored at its end.
+    """
+    token = _vendor.set(vendor)
+    try:
+        yield vendor
+    finally:
+        _vendor.reset(token)
+
+
+def get_user_vendor(user):
+    """
+    Returns the primary key of the vendor of a user, read from its vendor foreign key without a query, or None
+    for anonymous users and users without a vendor.
+    This is the hook scoping the requests: TenantContextMiddleware calls it with the session user and the
+    BaseViewSet/BaseAPIView views with the user authenticated by DRF (e.g. JWT), both call set_vendor() with
+    the result.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    return getattr(user, f'{VENDOR_FIELD}_id', None)
+
+
+def is_vendor_model(model):
+    """
+    Checks if the rows of a model are owned by a vendor.
+    """
+    return any(field.name == VENDOR_FIELD for field in model._meta.concrete_fields)
+
+
+def vendor_filter(queryset):
+    """
+    Restricts a queryset of a vendor owned model to the rows of the vendor of the current context, the querysets
+    of the other models are returned as is.
+    """
+    if not is_vendor_model(queryset.model):
+        return queryset
+    return queryset.filter(**{VENDOR_FIELD: get_vendor()})
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """
+    Submits a callable to a thread pool executor, running it in a copy of the current context so the vendor
+    (and the other context variables) of the caller is seen by the worker thread.
+    Returns:
+        Future: The future of the call.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@before_task_publish.connect
+def add_vendor_header(headers=None, **kwargs):
+    vendor_id = get_vendor_id()
+    if headers is not None and vendor_id is not None:
+        headers[VENDOR_HEADER] = vendor_id
+
+
+@task_prerun.connect
+def set_task_vendor(task_id=None, task=None, **kwargs):
+    # Eager tasks run in the context of the caller, which already holds its vendor
+    if task is None or task.request.is_eager:
+        return
+    # Tasks published without a vendor run unscoped, never with the vendor of the previous task of the worker
+    _task_tokens[task_id] = _vendor.set(task.request.get(VENDOR_HEADER))
+
+
+@task_postrun.connect
+def reset_task_vendor(task_id=None, **kwargs):
+    token = _task_tokens.pop(task_id, None)
+    if token is not None:
+        _vendor.reset(token)
@@ -0,0 +1,69 @@
+import datetime
+from collections import Counter
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from backend.celery import app
+from common.constants import SOFT_DELETE_BATCH_SIZE, SOFT_DELETE_ATOMIC_CASCADE, SOFT_DELETE_JOB_PROGRESS
+from common.db.archive import archive_soft_deleted
+from common.logging import LogInfo
+from common.utils import stream_soft_delete
+
+
+@app.task(bind=True)
+def soft_delete_cascade(self, model_label, deleted_at, first_pk=None, last_pk=None, user_id=None, root_counts=None,
+                        using='default', batch_size=SOFT_DELETE_BATCH_SIZE, atomic=SOFT_DELETE_ATOMIC_CASCADE):
+    """
+    Soft deletes the dependencies of already deleted root objects, reporting progress after every batch.
+    The roots are the rows of the model in the primary key range of the dispatch, marked with its deletion
+    timestamp and user, read in keyset ordered batches by the cascade. The cascaded rows are stamped with a
+    later timestamp, so they never join the roots (self-referencing models).
+    Args:
+        model_label (str): The label of the root model, e.g. 'users.User'.
+        deleted_at (str): The ISO formatted deletion timestamp of the root objects.
+        first_pk: The smallest primary key of the root objects, None when no root was marked.
+        last_pk: The largest primary key of the root objects, None when no root was marked.
+        user_id: The primary key of the user initiating the deletion (optional).
+        root_counts (dict): The number of root objects marked before dispatch, per model label (optional).
+        using (str): The database alias to write to.
+        batch_size (int): The maximum number of primary keys per batch.
+        atomic (str): The transaction boundaries of the cascade, per cascade or per batch.
+    Returns:
+        dict: The total number of rows marked as deleted and the count per model label, roots included.
+    """
+    model = apps.get_model(model_label)
+    user = get_user_model()._default_manager.filter(pk=user_id).first() if user_id is not None else None
+    deleted_counter = Counter(root_counts or {})
+    LogInfo.celery_log_info(f"Soft delete cascade {self.request.id} started for {dict(deleted_counter)}")
+
+    def report_progress(label, count):
+        deleted_counter[label] += count
+        self.update_state(state=SOFT_DELETE_JOB_PROGRESS,
+                          meta={'total': sum(deleted_counter.values()), 'counts': dict(deleted_counter)})
+
+    if first_pk is not None:
+        # The roots are already marked, so the cascade starts from the rows of their deletion instead of live rows
+        deleted_at = parse_datetime(deleted_at)
+        queryset = model._base_manager.using(using).filter(deleted_at=deleted_at, deleted_by_id=user_id,
+                                                           pk__gte=first_pk, pk__lte=last_pk)
+        cascade_deleted_at = max(timezone.now(), deleted_at + datetime.timedelta(microseconds=1))
+        stream_soft_delete(queryset, user, batch_size=batch_size, atomic=atomic, deleted_at=cascade_deleted_at,
+                           on_batch=report_progress)
+
+    LogInfo.celery_log_info(f"Soft delete cascade {self.request.id} finished: {dict(deleted_counter)}")
+    return {'total': sum(deleted_counter.values()), 'counts': dict(deleted_counter)}
+
+
+@app.task
+def archive_soft_deleted_rows():
+    """
+    Periodic task moving the soft deleted rows past their retention window to the archive tables
+    and purging the archived rows past their archive retention.
+    Returns:
+        dict: The number of rows archived and purged per model label.
+    """
+    results = archive_soft_deleted()
+    LogInfo.celery_log_info(f"Soft deleted rows archival finished: {results}")
+    return results
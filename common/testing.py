@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+from django.urls import NoReverseMatch, reverse
+
+from common.constants import QUERY_BUDGET_DUPLICATE_THRESHOLD
+from common.db.queries import collect_queries
+from common.rest_framework.mixins import QueryBudgetMixin
+from common.utils.urls import iter_url_patterns, get_view_class
+
+
+@contextmanager
+def assert_query_budget(budget=None, threshold=QUERY_BUDGET_DUPLICATE_THRESHOLD, using=None):
+    """
+    Context manager failing with an AssertionError when the block runs more than `budget` queries,
+    or repeats a statement with different parameters at least `threshold` times.
+    Yields:
+        QueryCollector: The collector of the block.
+    """
+    with collect_queries(using) as collector:
+        yield collector
+    violations = collector.get_violations(budget, threshold)
+    if violations:
+        queries = '\n'.join(f'{index}. {sql}' for index, (alias, sql, duration) in enumerate(collector.queries, 1))
+        raise AssertionError('; '.join(violations) + f'\nQueries:\n{queries}')
+
+
+def get_budgeted_views(urlconf=None, method='get'):
+    """
+    Returns the URL patterns of the views having a query budget for the given method.
+    Args:
+        urlconf (str): The URLconf module (optional, defaults to ROOT_URLCONF).
+        method (str): The lowercase HTTP method.
+    Returns:
+        list: Tuples of (namespaced URL name, view class, action, budget).
+    """
+    views, names = [], set()
+    for route, name, callback in iter_url_patterns(urlconf):
+        view_class = get_view_class(callback)
+        # Format suffix patterns share the name of the pattern they extend
+        if name is None or name in names or view_class is None or not issubclass(view_class, QueryBudgetMixin):
+            continue
+        actions = getattr(callback, 'actions', None)
+        action = actions.get(method) if actions else method
+        if action is None or (not actions and not hasattr(view_class, method)):
+            continue
+        budget = view_class.get_action_query_budget(action)
+        if budget is not None:
+            names.add(name)
+            views.append((name, view_class, action, budget))
+    return views
+
+
+def assert_view_query_budgets(client, urlconf=None, url_kwargs=None, threshold=QUERY_BUDGET_DUPLICATE_THRESHOLD):
+    """
+    Requests every budgeted GET endpoint of the URLconf and asserts it stays within its query budget.
+    Endpoints needing URL kwargs (e.g. retrieve) are only checked when url_kwargs provides them.
+    Args:
+        client: The (authenticated) test client.
+        urlconf (str): The URLconf module (optional, defaults to ROOT_URLCONF).
+        url_kwargs (dict): The reverse() kwargs per URL name, e.g. {'users:user-detail': {'pk': 1}}.
+        threshold (int): Executions of a statement flagged as N+1.
+    Returns:
+        list: The URL names checked.
+    """
+    url_kwargs = url_kwargs or {}
+    checked, failures = [], []
+    for name, view_class, action, budget in get_budgeted_views(urlconf):
+        try:
+            url = reverse(name, urlconf=urlconf, kwargs=url_kwargs.get(name))
+        except NoReverseMatch:
+            continue
+        try:
+            with assert_query_budget(budget, threshold):
+                client.get(url)
+        except AssertionError as e:
+            failures.append(f'{view_class.__name__}.{action} ({url}): {e}')
+        checked.append(name)
+    if failures:
+        raise AssertionError('\n\n'.join(failures))
+    return checked
@@ -0,0 +1,49 @@
+import datetime
+from django.db import connections, models
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+from common.db.models import SoftDeleteModel
+
+
+class Node(SoftDeleteModel):
+    name = models.CharField(max_length=100)
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, related_name='children', null=True, blank=True)
+
+    soft_delete_retention = datetime.timedelta(days=30)
+
+    class Meta:
+        app_label = 'common'
+
+
+class Tag(SoftDeleteModel):
+    node = models.ForeignKey(Node, on_delete=models.CASCADE, related_name='tags')
+
+    class Meta:
+        app_label = 'common'
+
+
+class Link(SoftDeleteModel):
+    node = models.ForeignKey(Node, on_delete=models.RESTRICT, related_name='links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='links', null=True, blank=True)
+
+    class Meta:
+        app_label = 'common'
+
+
+# The models of the tests, referenced models first
+TEST_MODELS = (Node, Tag, Link)
+
+
+@receiver(post_migrate)
+def create_test_model_tables(using, **kwargs):
+    """
+    Creates the tables of the test models in the test database, the common app having no migrations.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        table_names = connection.introspection.table_names(cursor)
+    with connection.schema_editor() as schema_editor:
+        for model in TEST_MODELS:
+            if model._meta.db_table not in table_names:
+                schema_editor.create_model(model)
@@ -0,0 +1,41 @@
+from unittest import mock
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from common.db import archive
+from common.db.archive import archive_model
+from common.tests.models import Node
+
+
+class ArchiveModelTests(TransactionTestCase):
+
+    def setUp(self):
+        self.deleted_at = timezone.now() - Node.soft_delete_retention * 2
+        self.node = Node.all_objects.create(name='node', is_deleted=True, deleted_at=self.deleted_at)
+
+    def test_archives_deleted_rows(self):
+        self.assertEqual(archive_model(Node, delay=0), 1)
+        self.assertFalse(Node.all_objects.filter(pk=self.node.pk).exists())
+
+    def test_skips_rows_restored_after_the_page_was_read(self):
+        atomic = transaction.atomic
+
+        def restore_then_atomic(*args, **kwargs):
+            Node.all_objects.filter(pk=self.node.pk).update(is_deleted=False, deleted_at=None)
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(archive.transaction, 'atomic', side_effect=restore_then_atomic):
+            self.assertEqual(archive_model(Node, delay=0), 0)
+        self.assertTrue(Node.objects.filter(pk=self.node.pk).exists())
+
+    def test_skips_rows_referenced_after_the_page_was_read(self):
+        atomic = transaction.atomic
+
+        def reference_then_atomic(*args, **kwargs):
+            Node.all_objects.create(name='child', parent=self.node)
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(archive.transaction, 'atomic', side_effect=reference_then_atomic):
+            self.assertEqual(archive_model(Node, delay=0), 0)
+        self.assertTrue(Node.all_objects.filter(pk=self.node.pk).exists())
@@ -0,0 +1,99 @@
+import datetime
+import gzip
+import json
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework import serializers
+from rest_framework.permissions import AllowAny
+from rest_framework.routers import DefaultRouter
+
+from common.constants import QUERY_BUDGET_RAISE
+from common.db.queries import QueryBudgetExceeded
+from common.rest_framework.viewsets import AsyncBaseViewSet
+from users.models import User
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'email', 'name')
+
+
+class AsyncUserViewSet(AsyncBaseViewSet):
+    model = User
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    cache_actions = ('list', 'retrieve')
+
+
+router = DefaultRouter()
+router.register('users', AsyncUserViewSet, basename='user')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewSetASGITests(TestCase):
+    """
+    Requests the async viewset through the ASGI handler of AsyncClient, with the middleware of the project.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create(email=f'user{index}@example.com', name=f'User {index}',
+                                date_of_birth=datetime.date(1990, 1, 1))
+            for index in range(3)
+        ]
+
+    def setUp(self):
+        caches[AsyncUserViewSet.cache_alias].clear()
+
+    async def test_list(self):
+        response = await self.async_client.get('/users/')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['data']['count'], 3)
+        self.assertEqual([row['name'] for row in body['data']['results']], ['User 0', 'User 1', 'User 2'])
+
+    async def test_retrieve(self):
+        user = self.users[1]
+        response = await self.async_client.get(f'/users/{user.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {'id': user.pk, 'email': user.email, 'name': user.name})
+
+        # Served from the response cache
+        cached = await self.async_client.get(f'/users/{user.pk}/')
+        self.assertEqual(cached.json(), response.json())
+
+    @override_settings(QUERY_BUDGET_MODE=QUERY_BUDGET_RAISE)
+    async def test_query_budget(self):
+        AsyncUserViewSet.query_budgets = {'list': 0}
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                await self.async_client.get('/users/')
+        finally:
+            AsyncUserViewSet.query_budgets = {}
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    async def test_compression(self):
+        response = await self.async_client.get('/users/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'User 0', gzip.decompress(response.content))
+
+    async def test_export_streams_an_async_iterator(self):
+        response = await self.async_client.get('/users/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([json.loads(line)['name'] for line in content.splitlines()], ['User 0', 'User 1', 'User 2'])
+
+    def test_export_streams_a_sync_iterator_under_wsgi(self):
+        response = self.client.get('/users/export/')
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
@@ -0,0 +1,54 @@
+import datetime
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework import serializers
+from rest_framework.permissions import AllowAny
+from rest_framework.routers import DefaultRouter
+
+from common.rest_framework.viewsets import BaseViewSet
+from users.models import User
+
+
+class UserCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('email', 'name', 'date_of_birth', 'password')
+
+    def create(self, validated_data):
+        return User.objects.create_user(**validated_data)
+
+
+class UserViewSet(BaseViewSet):
+    model = User
+    queryset = User.objects.all()
+    serializer_class = UserCreateSerializer
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+
+router = DefaultRouter()
+router.register('users', UserViewSet, basename='user')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class BulkCreateTests(TestCase):
+
+    def get_item(self, email):
+        return {'email': email, 'name': 'User', 'date_of_birth': '1990-01-01', 'password': 'secret-password'}
+
+    def test_bulk_create_uses_custom_create(self):
+        response = self.client.post('/users/', self.get_item('single@example.com'), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/users/bulk-create/', [self.get_item('bulk@example.com')],
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        single, bulk = User.objects.get(email='single@example.com'), User.objects.get(email='bulk@example.com')
+        self.assertEqual(response.json()['data']['ids'], [bulk.pk])
+        for user in (single, bulk):
+            self.assertTrue(user.check_password('secret-password'))
+            self.assertEqual((user.name, user.date_of_birth), ('User', datetime.date(1990, 1, 1)))
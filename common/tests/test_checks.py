@@ -0,0 +1,44 @@
+from unittest import mock
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+
+from common.checks import check_query_filter_plans
+from common.rest_framework.filters import CharFilter
+from common.rest_framework.generics import BaseListAPIView
+from users.models import User
+
+# Compiled as if the view was imported while the models load, its lookup is only validated by the system check
+with mock.patch.object(apps, 'models_ready', False):
+    class InvalidUserListView(BaseListAPIView):
+        queryset = User.objects.all()
+        query_filters = [CharFilter(name='city', lookup='city__iexact', required=False)]
+
+
+class UserListView(BaseListAPIView):
+    queryset = User.objects.all()
+    query_filters = [CharFilter(name='email', lookup='email__iexact', required=False)]
+
+
+urlpatterns = [
+    path('invalid/', InvalidUserListView.as_view()),
+    path('users/', UserListView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class QueryFilterPlanCheckTests(SimpleTestCase):
+    def test_invalid_lookup_is_reported(self):
+        errors = check_query_filter_plans(None)
+        self.assertEqual([(error.id, error.obj) for error in errors], [('common.E001', InvalidUserListView)])
+
+    def test_invalid_lookup_raises_once_models_are_loaded(self):
+        with self.assertRaises(ImproperlyConfigured):
+            class UserCityListView(BaseListAPIView):
+                queryset = User.objects.all()
+                query_filters = [CharFilter(name='city', lookup='city__iexact', required=False)]
+
+    def test_list_view_compiles_its_plan(self):
+        self.assertEqual(list(UserListView.query_filter_plan.filters), ['email'])
+        self.assertIs(UserListView.query_filter_plan.model, User)
@@ -0,0 +1,30 @@
+import gzip
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from common.middleware.compression import CompressionMiddleware
+
+
+@override_settings(COMPRESSION_MIN_SIZE=0)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"name": "compressible"}' * 64
+
+    def get_response(self, response, **meta):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip', **meta)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_response(self):
+        response = self.get_response(HttpResponse(self.body, content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_skips_response_rendering_csrf_token(self):
+        response = self.get_response(HttpResponse(self.body, content_type='text/html'), CSRF_COOKIE_USED=True)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.body)
+
+    def test_skips_no_transform_response(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['Cache-Control'] = 'no-store, no-transform'
+        response = self.get_response(response)
+        self.assertFalse(response.has_header('Content-Encoding'))
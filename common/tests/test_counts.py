@@ -0,0 +1,28 @@
+import threading
+from unittest import mock
+from django.test import SimpleTestCase
+
+from common.rest_framework import counts
+from common.rest_framework.counts import BaseCountStrategy, count_in_thread
+from users.models import User
+
+
+class ThreadNameCount(BaseCountStrategy):
+    concurrent = True
+
+    def count(self, queryset):
+        return threading.current_thread().name
+
+
+class CountInThreadTests(SimpleTestCase):
+    def test_counts_run_in_the_shared_pool(self):
+        names = {count_in_thread(ThreadNameCount(), User.objects.all()).result() for _ in range(10)}
+        self.assertTrue(all(name.startswith('pagination-count') for name in names))
+        self.assertLessEqual(len(names), counts.COUNT_THREAD_POOL_SIZE)
+
+    def test_busy_pool_returns_none(self):
+        with mock.patch.object(counts, '_count_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            self.assertIsNone(count_in_thread(ThreadNameCount(), User.objects.all()))
+            slots.release()
+            self.assertIsNotNone(count_in_thread(ThreadNameCount(), User.objects.all()).result())
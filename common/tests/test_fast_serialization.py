@@ -0,0 +1,63 @@
+import datetime
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework import serializers
+from rest_framework.permissions import AllowAny
+from rest_framework.routers import DefaultRouter
+
+from common.rest_framework import mixins
+from common.rest_framework.viewsets import BaseViewSet
+from users.models import User
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'email', 'name')
+
+
+class UserViewSet(BaseViewSet):
+    model = User
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    fast_list_serialization = True
+    cache_actions = ()
+
+
+router = DefaultRouter()
+router.register('users', UserViewSet, basename='user')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class ValuesPlanCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='user@example.com', name='User', date_of_birth=datetime.date(1990, 1, 1))
+
+    def setUp(self):
+        UserViewSet.values_plans = {}
+
+    def test_plan_compiled_once(self):
+        with mock.patch.object(mixins, 'compile_serializer', wraps=mixins.compile_serializer) as compile_serializer:
+            first = self.client.get('/users/')
+            second = self.client.get('/users/')
+        self.assertEqual(compile_serializer.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first.json()['data']['results'],
+                         [{'id': self.user.pk, 'email': 'user@example.com', 'name': 'User'}])
+
+    def test_sparse_fieldset_compiles_its_own_plan(self):
+        self.client.get('/users/')
+        with mock.patch.object(mixins, 'compile_serializer', wraps=mixins.compile_serializer) as compile_serializer:
+            response = self.client.get('/users/', {'fields': 'name'})
+        self.assertEqual(compile_serializer.call_count, 1)
+        self.assertEqual(response.json()['data']['results'], [{'name': 'User'}])
+        self.assertEqual(list(UserViewSet.values_plans), [UserSerializer])
@@ -0,0 +1,91 @@
+import datetime
+from django.contrib.auth.models import Group
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from common.db.identity_map import amemoized_get, identity_map, memoized_get
+from users.models import User
+
+
+class IdentityMapInvalidationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='user@example.com', name='User', date_of_birth=datetime.date(1990, 1, 1))
+
+    def test_memoized_until_written(self):
+        with identity_map():
+            first = memoized_get(User.objects.all(), pk=self.user.pk)
+            with self.assertNumQueries(0):
+                self.assertIs(memoized_get(User.objects.all(), pk=self.user.pk), first)
+
+    def test_queryset_update_invalidates(self):
+        with identity_map():
+            memoized_get(User.objects.all(), pk=self.user.pk)
+            User.objects.filter(pk=self.user.pk).update(name='Updated')
+            self.assertEqual(memoized_get(User.objects.all(), pk=self.user.pk).name, 'Updated')
+
+    def test_bulk_update_invalidates(self):
+        with identity_map():
+            user = memoized_get(User.objects.all(), pk=self.user.pk)
+            user.name = 'Bulk'
+            User.objects.bulk_update([User(pk=self.user.pk, name='Bulk')], ['name'])
+            self.assertIsNot(memoized_get(User.objects.all(), pk=self.user.pk), user)
+
+    def test_delete_invalidates(self):
+        with identity_map():
+            memoized_get(User.objects.all(), pk=self.user.pk)
+            User.objects.get(pk=self.user.pk).delete()
+            with self.assertRaises(User.DoesNotExist):
+                memoized_get(User.objects.all(), pk=self.user.pk)
+
+    def test_raw_delete_invalidates(self):
+        with identity_map():
+            memoized_get(User.objects.all(), pk=self.user.pk)
+            User.objects.filter(pk=self.user.pk)._raw_delete(User.objects.db)
+            with self.assertRaises(User.DoesNotExist):
+                memoized_get(User.objects.all(), pk=self.user.pk)
+
+    def test_raw_sql_invalidates(self):
+        with identity_map():
+            memoized_get(User.objects.all(), pk=self.user.pk)
+            with connection.cursor() as cursor:
+                cursor.execute(f'UPDATE {User._meta.db_table} SET name = %s WHERE id = %s', ['Raw', self.user.pk])
+            self.assertEqual(memoized_get(User.objects.all(), pk=self.user.pk).name, 'Raw')
+
+    def test_m2m_change_invalidates(self):
+        group = Group.objects.create(name='staff')
+        self.user.groups.add(group)
+        with identity_map():
+            memoized_get(User.objects.filter(groups=group), pk=self.user.pk)
+            self.user.groups.remove(group)
+            with self.assertRaises(User.DoesNotExist):
+                memoized_get(User.objects.filter(groups=group), pk=self.user.pk)
+
+    async def test_async_update_invalidates(self):
+        with identity_map():
+            await amemoized_get(User.objects.all(), pk=self.user.pk)
+            await User.objects.filter(pk=self.user.pk).aupdate(name='Async')
+            self.assertEqual((await amemoized_get(User.objects.all(), pk=self.user.pk)).name, 'Async')
+
+    def test_savepoint_rollback_invalidates(self):
+        with identity_map():
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    User.objects.filter(pk=self.user.pk).update(name='Rolled')
+                    self.assertEqual(memoized_get(User.objects.all(), pk=self.user.pk).name, 'Rolled')
+                    raise ValueError
+            self.assertEqual(memoized_get(User.objects.all(), pk=self.user.pk).name, 'User')
+
+
+class IdentityMapRollbackTests(TransactionTestCase):
+
+    def test_rollback_invalidates(self):
+        user = User.objects.create(email='user@example.com', name='User', date_of_birth=datetime.date(1990, 1, 1))
+        with identity_map():
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    User.objects.filter(pk=user.pk).update(name='Rolled')
+                    self.assertEqual(memoized_get(User.objects.all(), pk=user.pk).name, 'Rolled')
+                    raise ValueError
+            self.assertEqual(memoized_get(User.objects.all(), pk=user.pk).name, 'User')
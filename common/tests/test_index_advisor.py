@@ -0,0 +1,35 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from common.db.index_advisor import SEQ_SCAN, SORT, SORT_SPILL, walk_mysql_plan
+
+# No view to explain, the command only checks its options
+urlpatterns = []
+
+
+class WalkMySQLPlanTests(SimpleTestCase):
+
+    def get_plan(self, **filesort):
+        return {'query_block': {'select_id': 1, 'filesort': {
+            'sort_key': 'node.created_at', **filesort,
+            'table': {'table_name': 'node', 'access_type': 'ALL', 'rows': 1000, 'r_rows': 980},
+        }}}
+
+    def test_mariadb_analyze_reports_spilled_sort(self):
+        findings = list(walk_mysql_plan(self.get_plan(r_sort_passes=2)))
+        self.assertEqual(findings, [(SORT_SPILL, None, 'filesort (2 merge passes)'),
+                                    (SEQ_SCAN, 'node', '980 rows read')])
+
+    def test_in_memory_sort(self):
+        findings = list(walk_mysql_plan(self.get_plan()))
+        self.assertEqual(findings[0], (SORT, None, 'filesort'))
+
+
+class AdviseIndexesCommandTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_analyze_warns_without_support(self):
+        stdout = StringIO()
+        call_command('advise_indexes', analyze=True, urlconf=__name__, stdout=stdout)
+        self.assertIn('--analyze has no effect on SQLite', stdout.getvalue())
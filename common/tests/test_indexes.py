@@ -0,0 +1,31 @@
+from unittest import mock
+from django.db import connection, models
+from django.test import SimpleTestCase
+from django.test.utils import isolate_apps
+
+from common.db.indexes import SoftDeleteIndex, TimestampIndex, get_base_model_indexes
+from common.db.models import SoftDeleteModel, TimestampModel
+
+
+@isolate_apps('common')
+class BaseModelIndexTests(SimpleTestCase):
+
+    def test_updated_at_gets_a_btree_index(self):
+        class Event(TimestampModel):
+            class Meta:
+                app_label = 'common'
+
+        brin = {index.fields[0]: index.brin for index in Event._meta.indexes if isinstance(index, TimestampIndex)}
+        self.assertEqual(brin, {'created_at': True, 'updated_at': False})
+
+    def test_partial_index_skipped_without_support(self):
+        class Item(SoftDeleteModel):
+            name = models.CharField(max_length=100)
+            soft_delete_index_fields = ('name',)
+
+            class Meta:
+                app_label = 'common'
+
+        self.assertTrue(any(isinstance(index, SoftDeleteIndex) for index in get_base_model_indexes(Item)))
+        with mock.patch.object(connection.features, 'supports_partial_indexes', False):
+            self.assertEqual(get_base_model_indexes(Item), [])
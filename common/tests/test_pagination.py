@@ -0,0 +1,31 @@
+import json
+from base64 import urlsafe_b64encode
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.rest_framework.pagination import StandardCursorPagination
+from users.models import User
+
+
+def get_cursor_request(payload):
+    cursor = urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+    return Request(APIRequestFactory().get('/', {'cursor': cursor}))
+
+
+class CursorPaginationTests(TestCase):
+
+    def test_cursor_values_are_converted(self):
+        paginator = StandardCursorPagination()
+        request = get_cursor_request({'v': ['User', '5'], 'r': False})
+        queryset, values, reverse = paginator.get_page_queryset(User.objects.order_by('name'), request)
+        self.assertEqual(values, ['User', 5])
+        self.assertEqual(list(queryset), [])
+
+    def test_invalid_cursor_value_is_not_found(self):
+        for values in (['User', 'x'], ['User', None], ['User', {'pk': 1}]):
+            with self.subTest(values=values), self.assertRaises(NotFound):
+                StandardCursorPagination().paginate_queryset(
+                    User.objects.order_by('name'), get_cursor_request({'v': values, 'r': False})
+                )
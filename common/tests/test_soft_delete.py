@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from django.db import connection
+from django.db.models import RestrictedError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from common.db.utils import manage_delete_dependency, stream_soft_delete
+from common.tests.models import Link, Node, Tag
+
+
+class StreamSoftDeleteTests(TestCase):
+
+    def get_max_nesting(self, depth):
+        """
+        Soft deletes a chain of depth nodes, returning the most SELECT keywords of one of its queries.
+        """
+        root = parent = Node.objects.create(name='root')
+        for level in range(1, depth):
+            parent = Node.objects.create(name=f'level {level}', parent=parent)
+        with CaptureQueriesContext(connection) as context:
+            total, counts = stream_soft_delete(Node.objects.filter(pk=root.pk), batch_size=2)
+        self.assertEqual(counts, {'common.Node': depth})
+        return max(query['sql'].upper().count('SELECT') for query in context.captured_queries)
+
+    def test_deep_cascade_runs_flat_queries(self):
+        # The subqueries do not nest deeper with the depth of the cascade
+        self.assertEqual(self.get_max_nesting(6), self.get_max_nesting(2))
+
+    def test_restricted_row_deleted_by_the_cascade(self):
+        node = Node.objects.create(name='node')
+        tag = Tag.objects.create(node=node)
+        Link.objects.create(node=node, tag=tag)
+        total, counts = stream_soft_delete(Node.objects.filter(pk=node.pk))
+        self.assertEqual(counts, {'common.Node': 1, 'common.Tag': 1, 'common.Link': 1})
+
+    def test_restricted_row_outside_the_cascade(self):
+        node = Node.objects.create(name='node')
+        Link.objects.create(node=node)
+        with self.assertRaises(RestrictedError):
+            stream_soft_delete(Node.objects.filter(pk=node.pk))
+        self.assertTrue(Node.objects.filter(pk=node.pk).exists())
+
+
+class ManageDeleteDependencyTests(TestCase):
+
+    def test_fast_delete_objects_grouped_by_model(self):
+        node = Node.objects.create(name='node')
+        tags = [Tag.objects.create(node=node) for _ in range(3)]
+        collector = SimpleNamespace(using='default', fast_deletes=[[*tags, node]], data={})
+        with CaptureQueriesContext(connection) as context:
+            total, counts = manage_delete_dependency(collector)
+        self.assertEqual(counts, {'common.Tag': 3, 'common.Node': 1})
+        updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
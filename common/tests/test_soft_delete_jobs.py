@@ -0,0 +1,52 @@
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+
+from common.db import jobs
+from common.db.jobs import dispatch_soft_delete
+from common.tasks import soft_delete_cascade
+from common.tests.models import Node
+
+
+class SoftDeleteJobTests(TestCase):
+
+    def dispatch(self, queryset):
+        """
+        Dispatches the soft delete of a queryset, returning the kwargs of the task message.
+        """
+        with mock.patch.object(jobs.soft_delete_cascade, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatch_soft_delete(queryset)
+        return apply_async.call_args.kwargs['kwargs']
+
+    def run_cascade(self, task_kwargs):
+        with mock.patch.object(soft_delete_cascade, 'update_state'):
+            return soft_delete_cascade.run(**task_kwargs)
+
+    def test_dispatches_sharing_a_timestamp_stay_apart(self):
+        first, second = Node.objects.create(name='first'), Node.objects.create(name='second')
+        first_child = Node.objects.create(name='first child', parent=first)
+        second_child = Node.objects.create(name='second child', parent=second)
+
+        now = timezone.now()
+        with mock.patch('common.db.utils.timezone.now', return_value=now):
+            first_kwargs = self.dispatch(Node.objects.filter(pk=first.pk))
+            self.dispatch(Node.objects.filter(pk=second.pk))
+
+        result = self.run_cascade(first_kwargs)
+        self.assertEqual(result['counts'], {'common.Node': 2})
+        self.assertTrue(Node.all_objects.get(pk=first_child.pk).is_deleted)
+        self.assertFalse(Node.all_objects.get(pk=second_child.pk).is_deleted)
+
+    def test_self_referencing_cascade_keeps_its_roots(self):
+        root = Node.objects.create(name='root')
+        child = Node.objects.create(name='child', parent=root)
+        Node.objects.create(name='grandchild', parent=child)
+
+        task_kwargs = self.dispatch(Node.objects.filter(pk=root.pk))
+        result = self.run_cascade(task_kwargs)
+
+        self.assertEqual(result['counts'], {'common.Node': 3})
+        self.assertFalse(Node.objects.exists())
+        root_deleted_at = Node.all_objects.get(pk=root.pk).deleted_at
+        self.assertEqual(list(Node.all_objects.filter(deleted_at=root_deleted_at)), [root])
@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from common.middleware.tenant_context import TenantContextMiddleware
+from common.rest_framework.generics import BaseAPIView
+from common.services.tenant_context import (VENDOR_HEADER, get_vendor, get_vendor_id, submit_with_context,
+                                            vendor_context)
+from common.tasks import archive_soft_deleted_rows
+
+
+def vendor_user(vendor_id):
+    return SimpleNamespace(is_authenticated=True, vendor_id=vendor_id)
+
+
+class VendorView(BaseAPIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response({'vendor': get_vendor_id()})
+
+
+class TenantContextTests(SimpleTestCase):
+
+    async def test_gathered_coroutines_keep_their_vendor(self):
+        async def scoped(vendor_id):
+            with vendor_context(vendor_id):
+                seen = []
+                for _ in range(3):
+                    # Hands the loop over to the other coroutine between reads
+                    await asyncio.sleep(0)
+                    seen.append(get_vendor_id())
+                return seen
+
+        self.assertEqual(await asyncio.gather(scoped(1), scoped(2)), [[1, 1, 1], [2, 2, 2]])
+        self.assertIsNone(get_vendor())
+
+    def test_middleware_does_not_leak_vendor_to_next_request_of_thread(self):
+        seen = []
+
+        def get_response(request):
+            seen.append(get_vendor_id())
+            return HttpResponse()
+
+        middleware = TenantContextMiddleware(get_response)
+        factory = RequestFactory()
+
+        def serve(user):
+            request = factory.get('/')
+            request.user = user
+            middleware(request)
+            return get_vendor_id()
+
+        # A single worker serves both requests in the same thread, like a WSGI worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            after_first = executor.submit(serve, vendor_user(1)).result()
+            after_second = executor.submit(serve, AnonymousUser()).result()
+
+        self.assertEqual(seen, [1, None])
+        self.assertIsNone(after_first)
+        self.assertIsNone(after_second)
+
+    def test_submit_with_context_on_reused_pool_thread(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with vendor_context(1):
+                scoped = submit_with_context(executor, get_vendor_id).result()
+            unscoped = submit_with_context(executor, get_vendor_id).result()
+            # The context of the caller is run in a copy, the pool thread keeps its own
+            plain = executor.submit(get_vendor_id).result()
+
+        self.assertEqual((scoped, unscoped, plain), (1, None, None))
+
+    def test_task_headers_round_trip_vendor(self):
+        headers = {}
+        with vendor_context(SimpleNamespace(pk=3)):
+            before_task_publish.send(sender=archive_soft_deleted_rows.name, body=((), {}, {}), headers=headers)
+        self.assertEqual(headers, {VENDOR_HEADER: 3})
+
+        for task_id, task_headers, expected in (('task-1', headers, 3), ('task-2', {}, None)):
+            archive_soft_deleted_rows.push_request(id=task_id, is_eager=False, **task_headers)
+            try:
+                task_prerun.send(sender=archive_soft_deleted_rows, task_id=task_id, task=archive_soft_deleted_rows,
+                                 args=(), kwargs={})
+                self.assertEqual(get_vendor(), expected)
+                task_postrun.send(sender=archive_soft_deleted_rows, task_id=task_id, task=archive_soft_deleted_rows,
+                                  args=(), kwargs={}, retval=None, state='SUCCESS')
+            finally:
+                archive_soft_deleted_rows.pop_request()
+            self.assertIsNone(get_vendor())
+
+    def test_view_scopes_request_to_vendor_of_authenticated_user(self):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=vendor_user(5))
+        # Bounds the request like TenantContextMiddleware does
+        with vendor_context(None):
+            response = VendorView.as_view()(request)
+        self.assertEqual(response.data, {'vendor': 5})
@@ -0,0 +1,46 @@
+from unittest import mock
+from django.db import models
+from django.test import TestCase
+from django.test.utils import isolate_apps
+from rest_framework.generics import ListAPIView
+
+from common.db import versions
+from common.db.models import TimestampModel
+from common.rest_framework.mixins import ResponseCacheMixin
+from common.tests.models import Link, Node, Tag
+
+
+class ModelVersionTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(versions, 'versioned_models', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save_node(self):
+        with mock.patch.object(versions, 'bump_model_version') as bump, self.captureOnCommitCallbacks(execute=True):
+            Node.objects.create(name='node')
+        return bump
+
+    def test_unregistered_model_is_not_bumped(self):
+        self.save_node().assert_not_called()
+
+    def test_cached_view_registers_its_models(self):
+        class NodeView(ResponseCacheMixin, ListAPIView):
+            queryset = Node.objects.all()
+            cache_dependencies = (Tag,)
+
+        self.assertTrue(versions.is_versioned_model(Node))
+        self.assertTrue(versions.is_versioned_model(Tag))
+        self.assertFalse(versions.is_versioned_model(Link))
+        self.save_node().assert_called_once_with(Node)
+
+    def test_read_version_registers_the_model(self):
+        versions.get_model_versions([Node])
+        self.save_node().assert_called_once_with(Node)
+
+    @isolate_apps('common')
+    def test_timestamp_models_are_registered(self):
+        class Entry(TimestampModel):
+            name = models.CharField(max_length=10)
+
+        self.assertTrue(versions.is_versioned_model(Entry))
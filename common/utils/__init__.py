@@ -1,2 +1,3 @@
 from common.db.utils import *
 from common.utils.media_file import *
+from common.utils.urls import *
@@ -0,0 +1,32 @@
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_url_patterns(urlconf=None):
+    """
+    Walks a URLconf, yielding every URL pattern with the routes and namespaces of its parent resolvers.
+    Args:
+        urlconf (str): The URLconf module (optional, defaults to ROOT_URLCONF).
+    Yields:
+        tuple: The full route, the namespaced name (or None) and the callback of each URL pattern.
+    """
+    def walk(patterns, route, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                child_namespace = namespace
+                if pattern.namespace:
+                    child_namespace = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+                yield from walk(pattern.url_patterns, route + str(pattern.pattern), child_namespace)
+            elif isinstance(pattern, URLPattern):
+                name = pattern.name
+                if name and namespace:
+                    name = f'{namespace}:{name}'
+                yield route + str(pattern.pattern), name, pattern.callback
+
+    yield from walk(get_resolver(urlconf).url_patterns, '', '')
+
+
+def get_view_class(callback):
+    """
+    Returns the class of a class-based view callback, or None for function views.
+    """
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)